@@ -173,6 +173,45 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATIC_DATA_DIR = BASE_DIR / "static_data"
+# Response cache shared by every worker. CACHE_BACKEND is "file" (default),
+# "redis" (any Redis-compatible server at CACHE_LOCATION) or "locmem".
+# Entries are keyed by dataset version, so nothing expires on a short TTL.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file").lower()
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+            "TIMEOUT": None,
+        }
+    }
+elif CACHE_BACKEND == "locmem":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "TIMEOUT": None,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / "cache")),
+            "TIMEOUT": None,
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+# Lets responses from replaced dataset versions age out of the cache.
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", str(7 * 24 * 60 * 60)))
+
+# Upper bound (bytes on disk) of parsed static_data files kept per process.
+STATIC_SNAPSHOT_CACHE_MAX_BYTES = int(
+    os.getenv("STATIC_SNAPSHOT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+)
+
+# Also write imports to the long-format prediction table and serve top
+# predictions from it. Backfill with manage.py rebuild_prediction_store first.
+UNIFIED_PREDICTION_STORE = os.getenv("UNIFIED_PREDICTION_STORE", "False").lower() == "true"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -0,0 +1,76 @@
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from map_coordinate.mapping import calculate_grid_bounds, calculate_grid_bounds_array
+
+
+def _synthetic_centers(count, seed):
+    # Scatter grid centroids over a Sarasota-sized box
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "center_latitude": rng.uniform(27.0, 27.5, count),
+            "center_longitude": rng.uniform(-82.7, -82.2, count),
+        }
+    )
+
+
+def _row_loop(df, grid_size_feet):
+    bounds_data = []
+    for _, row in df.iterrows():
+        bounds_data.append(
+            calculate_grid_bounds(
+                row["center_latitude"], row["center_longitude"], grid_size_feet
+            )
+        )
+    return pd.DataFrame(bounds_data)
+
+
+class Command(BaseCommand):
+    help = "Compare the iterrows() grid bounds loop with the vectorized version."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grids",
+            type=int,
+            default=100000,
+            help="Number of synthetic grids (default: 100000)",
+        )
+        parser.add_argument(
+            "--grid-size-feet",
+            type=float,
+            default=500,
+            help="Grid edge length in feet (default: 500)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        grid_size_feet = options["grid_size_feet"]
+        df = _synthetic_centers(options["grids"], options["seed"])
+
+        start = time.perf_counter()
+        looped = _row_loop(df, grid_size_feet)
+        loop_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized = calculate_grid_bounds_array(
+            df["center_latitude"].to_numpy(),
+            df["center_longitude"].to_numpy(),
+            grid_size_feet,
+        )
+        vector_seconds = time.perf_counter() - start
+
+        for column, values in vectorized.items():
+            if not np.allclose(looped[column].to_numpy(), values, rtol=0, atol=1e-12):
+                self.stderr.write(f"Mismatch in {column}")
+                return
+
+        self.stdout.write(f"Grids: {len(df)}")
+        self.stdout.write(f"  iterrows loop: {loop_seconds:.3f}s")
+        self.stdout.write(f"  vectorized: {vector_seconds:.4f}s")
+        self.stdout.write(
+            self.style.SUCCESS(f"  Speedup: {loop_seconds / vector_seconds:.0f}x")
+        )
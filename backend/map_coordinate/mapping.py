@@ -1,21 +1,68 @@
-from numpy import require
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import os
 import math
-from pandas._libs.hashtable import mode
+import time
+import hashlib
+
+GEOMETRY_COLUMNS = [
+    "grid_id",
+    "center_longitude",
+    "center_latitude",
+    "southwest_lat",
+    "southwest_lng",
+    "northeast_lat",
+    "northeast_lng",
+]
+
+# Enriched coordinate tables for the life of the process, keyed by
+# (path, mtime, size, grid size)
+_geometry_cache = {}
+_geometry_cache_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+
+COUNT_COLUMNS = {
+    "mlp": "Predicted_Crime_Count",
+    "lee": "Crime_T1",
+    "actual": "Actual_Crime_Count",
+}
+
+# Ranked outputs produced from one grid_ranking.csv of each model
+RANKING_OUTPUTS = {"mlp": ["mlp", "actual"], "lee": ["lee"]}
+
+# Columns that keep their float dtype in the mapped outputs
+FLOAT_COLUMNS = [
+    "center_latitude",
+    "center_longitude",
+    "southwest_lat",
+    "southwest_lng",
+    "northeast_lat",
+    "northeast_lng",
+    "northwest_lat",
+    "northwest_lng",
+    "southeast_lat",
+    "southeast_lng",
+]
 
 
 def get_extracted_data_model(
     csv_path: str, type_of_data: str, limit=100
 ) -> pd.DataFrame:
     df = pd.read_csv(csv_path)
-    if type_of_data == "mlp":
-        model = "Predicted_Crime_Count"
-    elif type_of_data == "lee":
-        model = "Crime_T1"
-    elif type_of_data == "actual":
-        model = "Actual_Crime_Count"
+    return extract_ranked_rows(df, type_of_data, limit)
+
+
+def read_ranking(model_path: str, model: str) -> pd.DataFrame:
+    # Only the columns needed for the ranked outputs of this model
+    columns = ["Rank", "grid_id"]
+    columns.extend(COUNT_COLUMNS[output] for output in RANKING_OUTPUTS[model])
+    columns.append("Target_Period")
+    return pd.read_csv(model_path, usecols=columns)
+
+
+def extract_ranked_rows(df: pd.DataFrame, type_of_data: str, limit=100) -> pd.DataFrame:
+    model = COUNT_COLUMNS[type_of_data]
     require_columns = ["Rank", "grid_id", model, "Target_Period"]
     result_df = df[require_columns].copy()
     if type_of_data == "actual":
@@ -51,7 +98,27 @@ def calculate_grid_bounds(
     }
 
 
-def getting_coordinate(csv_path: str) -> pd.DataFrame:
+def calculate_grid_bounds_array(
+    center_lat, center_lng, grid_size_feet: float = 500
+) -> dict:
+    # Same formula as calculate_grid_bounds, applied to whole arrays at once
+    FEET_PER_DEGREE_LAT = 366666
+    center_lat = np.asarray(center_lat, dtype="float64")
+    center_lng = np.asarray(center_lng, dtype="float64")
+    feet_per_degree_lng = FEET_PER_DEGREE_LAT * np.cos(np.radians(center_lat))
+
+    half_grid_lat = grid_size_feet / 2 / FEET_PER_DEGREE_LAT
+    half_grid_lng = grid_size_feet / 2 / feet_per_degree_lng
+
+    return {
+        "southwest_lat": center_lat - half_grid_lat,
+        "southwest_lng": center_lng - half_grid_lng,
+        "northeast_lat": center_lat + half_grid_lat,
+        "northeast_lng": center_lng + half_grid_lng,
+    }
+
+
+def getting_coordinate(csv_path: str, grid_size_feet: float = 500) -> pd.DataFrame:
     # lat = ycentroid
     # long = xcentroid
     df = pd.read_csv(csv_path)
@@ -66,97 +133,162 @@ def getting_coordinate(csv_path: str) -> pd.DataFrame:
         },
         inplace=True,
     )
-    bounds_data = []
-    for _, row in result_df.iterrows():
-        bounds = calculate_grid_bounds(
-            row["center_latitude"], row["center_longitude"], 500
+    bounds = calculate_grid_bounds_array(
+        result_df["center_latitude"].to_numpy(),
+        result_df["center_longitude"].to_numpy(),
+        grid_size_feet,
+    )
+    for column, values in bounds.items():
+        result_df[column] = values
+    return _add_leaflet_bounds(result_df)
+
+
+def _add_leaflet_bounds(df: pd.DataFrame) -> pd.DataFrame:
+    # For Leaflet, same shape as calculate_grid_bounds()["bounds"]
+    df["bounds"] = [
+        [southwest, northeast]
+        for southwest, northeast in zip(
+            zip(df["southwest_lat"].to_numpy(), df["southwest_lng"].to_numpy()),
+            zip(df["northeast_lat"].to_numpy(), df["northeast_lng"].to_numpy()),
         )
-        bounds_data.append(bounds)
+    ]
+    return df
 
-    # Convert to DataFrame and merge with original
-    bounds_df = pd.DataFrame(bounds_data)
 
-    # Merge bounds with coordinate data
-    result_df = pd.concat([result_df, bounds_df], axis=1)
-    return result_df
+def _geometry_sidecar_path(csv_path: Path, digest: str, grid_size_feet: float) -> Path:
+    return csv_path.with_name(
+        f"{csv_path.stem}.{digest[:16]}.{grid_size_feet:g}ft.geometry.npz"
+    )
+
+
+def _write_geometry_sidecar(csv_path: Path, sidecar: Path, df: pd.DataFrame):
+    # Written to a temp file first, parallel mapping workers may race here
+    tmp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as file:
+            np.savez(
+                file, **{column: df[column].to_numpy() for column in GEOMETRY_COLUMNS}
+            )
+        os.replace(tmp_path, sidecar)
+        for stale in csv_path.parent.glob(f"{csv_path.stem}.*.geometry.npz"):
+            if stale != sidecar:
+                stale.unlink(missing_ok=True)
+    except OSError:
+        # The cache is only an optimisation, a read-only directory is fine
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_coordinate_geometry(
+    csv_path: str, grid_size_feet: float = 500
+) -> pd.DataFrame:
+    """
+    Cached getting_coordinate(). The enriched table stays in memory while the
+    file's mtime and size are unchanged, and is persisted as a .npz sidecar
+    named after the file's content hash so new processes skip CSV parsing.
+    Returns a copy, callers are free to modify it.
+    """
+    path = Path(csv_path).resolve()
+    stat = path.stat()
+    memory_key = (str(path), stat.st_mtime_ns, stat.st_size, grid_size_feet)
+    cached = _geometry_cache.get(memory_key)
+    if cached is not None:
+        _geometry_cache_stats["memory_hits"] += 1
+        return cached.copy()
+
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    sidecar = _geometry_sidecar_path(path, digest, grid_size_feet)
+    result_df = None
+    if sidecar.exists():
+        try:
+            with np.load(sidecar) as arrays:
+                result_df = pd.DataFrame(
+                    {column: arrays[column] for column in GEOMETRY_COLUMNS}
+                )
+        except (OSError, KeyError, ValueError):
+            result_df = None
+
+    if result_df is not None:
+        _geometry_cache_stats["disk_hits"] += 1
+        result_df = _add_leaflet_bounds(result_df)
+    else:
+        _geometry_cache_stats["misses"] += 1
+        result_df = getting_coordinate(str(path), grid_size_feet)
+        _write_geometry_sidecar(path, sidecar, result_df)
+
+    _geometry_cache[memory_key] = result_df
+    return result_df.copy()
+
+
+def geometry_cache_stats() -> dict:
+    return dict(_geometry_cache_stats)
+
+
+def join_geometry(frames: list, df_coordinate: pd.DataFrame) -> list:
+    """
+    Inner join several ranked frames (Rank, grid_id, <count>, Target_Period)
+    against the coordinate table in one merge and split the result back into
+    one frame per input, each in its original row order.
+    """
+    stacked = pd.concat(
+        [
+            frame.set_axis(
+                ["Rank", "grid_id", "count", "Target_Period"], axis=1
+            ).assign(part=index)
+            for index, frame in enumerate(frames)
+        ],
+        ignore_index=True,
+    )
+    joined = pd.merge(stacked, df_coordinate, on="grid_id", how="inner")
+    parts = dict(tuple(joined.groupby("part", sort=False)))
+
+    results = []
+    for index, frame in enumerate(frames):
+        part = parts.get(index, joined.iloc[0:0]).drop(columns="part")
+        part = part.rename(columns={"count": frame.columns[2]})
+        results.append(part.reset_index(drop=True))
+    return results
+
+
+def _cast_count_columns(df: pd.DataFrame) -> pd.DataFrame:
+    for col in df.columns:
+        if df[col].dtype == "float64" and col not in FLOAT_COLUMNS:
+            df[col] = df[col].astype("int32")
+    return df
 
 
 def mapping_coordinate(
-    model_path: str, coordinate_data_path: str, model: str
+    model_path: str,
+    coordinate_data_path: str,
+    model: str,
+    grid_size_feet: float = 500,
+    output_dir: str = "processed_data/",
 ) -> pd.DataFrame:
     limit_rows = 100
-    output_path = Path("processed_data/")
+    output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     if model == "mlp":
-        df_crime_predicted_data = get_extracted_data_model(
-            model_path, model, limit_rows
-        )
-        df_predicted_coordinate = getting_coordinate(coordinate_data_path)
-        predicted_combined = pd.merge(
-            df_crime_predicted_data,  # Left dataframe
-            df_predicted_coordinate,  # Right dataframe
-            on="grid_id",  # Join key
-            how="inner",  # INNER JOIN: only rows with matching grid_id in both
+        # One parse of grid_ranking.csv and one geometry join feed both
+        # mapped_mlp.csv and mapped_actual.csv
+        df_ranking = read_ranking(model_path, model)
+        predicted_combined, actual_combined = join_geometry(
+            [
+                extract_ranked_rows(df_ranking, "mlp", limit_rows),
+                extract_ranked_rows(df_ranking, "actual", limit_rows),
+            ],
+            load_coordinate_geometry(coordinate_data_path, grid_size_feet),
         )
-
-        for col in ["Rank", "grid_id", "Target_Period", "Predicted_Crime_Count"]:
-            if (
-                col in predicted_combined.columns
-                and predicted_combined[col].dtype == "float64"
-            ):
-                predicted_combined[col] = predicted_combined[col].astype("int32")
-
-        # actual
-        df_crime_actual_data = get_extracted_data_model(
-            model_path, "actual", limit_rows
-        )
-
-        df_actual_coordinate = getting_coordinate(coordinate_data_path)
-        actual_combined = pd.merge(
-            df_crime_actual_data,  # Left dataframe
-            df_actual_coordinate,  # Right dataframe
-            on="grid_id",  # Join key
-            how="inner",  # INNER JOIN: only rows with matching grid_id in both
-        )
-
-        for df_combined in [predicted_combined, actual_combined]:
-            for col in df_combined.columns:
-                if df_combined[col].dtype == "float64" and col not in [
-                    "center_latitude",
-                    "center_longitude",
-                    "southwest_lat",
-                    "southwest_lng",
-                    "northeast_lat",
-                    "northeast_lng",
-                    "northwest_lat",
-                    "northwest_lng",
-                    "southeast_lat",
-                    "southeast_lng",
-                ]:
-                    df_combined[col] = df_combined[col].astype("int32")
+        _cast_count_columns(predicted_combined)
+        _cast_count_columns(actual_combined)
     else:
         df_crime_data = get_extracted_data_model(model_path, model, limit_rows)
-        df_coordinate = getting_coordinate(coordinate_data_path)
+        df_coordinate = load_coordinate_geometry(coordinate_data_path, grid_size_feet)
         combined = pd.merge(
             df_crime_data,  # Left dataframe
             df_coordinate,  # Right dataframe
             on="grid_id",  # Join key
             how="inner",  # INNER JOIN: only rows with matching grid_id in both
         )
-        for col in combined.columns:
-            if combined[col].dtype == "float64" and col not in [
-                "center_latitude",
-                "center_longitude",
-                "southwest_lat",
-                "southwest_lng",
-                "northeast_lat",
-                "northeast_lng",
-                "northwest_lat",
-                "northwest_lng",
-                "southeast_lat",
-                "southeast_lng",
-            ]:
-                combined[col] = combined[col].astype("int32")
+        _cast_count_columns(combined)
 
     if model == "lee":
         period = str(combined["Target_Period"].iloc[0])
@@ -179,3 +311,87 @@ def mapping_coordinate(
         return combined
     else:
         return predicted_combined
+
+
+def mapping_coordinates_batch(
+    jobs: list,
+    coordinate_data_path: str,
+    output_dir: str = "processed_data/",
+    grid_size_feet: float = 500,
+    limit_rows: int = 100,
+) -> list:
+    """
+    Map many grid_ranking.csv files with a single geometry join.
+    jobs is a list of (model, model_path) with model "mlp" or "lee". Ranked
+    rows of every file are stacked, joined once against the coordinate table
+    and written to output_dir/<period>/mapped_*.csv. When several files map
+    to the same output the later job wins, as with sequential calls.
+    Returns one error message (or None) per job.
+    """
+    errors = [None] * len(jobs)
+    frames = []
+    owners = []
+    for index, (model, model_path) in enumerate(jobs):
+        try:
+            df_ranking = read_ranking(model_path, model)
+            ranked = [
+                extract_ranked_rows(df_ranking, output, limit_rows)
+                for output in RANKING_OUTPUTS[model]
+            ]
+        except Exception as exc:
+            errors[index] = str(exc)
+            continue
+        frames.extend(ranked)
+        owners.extend((index, output) for output in RANKING_OUTPUTS[model])
+
+    if not frames:
+        return errors
+
+    joined = join_geometry(
+        frames, load_coordinate_geometry(coordinate_data_path, grid_size_feet)
+    )
+    parts_by_job = {}
+    for (index, output), df_combined in zip(owners, joined):
+        parts_by_job.setdefault(index, {})[output] = _cast_count_columns(df_combined)
+
+    outputs = {}
+    for index, parts in parts_by_job.items():
+        model = jobs[index][0]
+        if parts[model].empty:
+            errors[index] = "no ranked grid matches the coordinate table"
+            continue
+        period = str(parts[model]["Target_Period"].iloc[0])
+        for output, df_combined in parts.items():
+            outputs[(period, f"mapped_{output}.csv")] = df_combined
+
+    output_path = Path(output_dir)
+    for (period, csv_file), df_combined in outputs.items():
+        path = output_path / period / csv_file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df_combined.to_csv(path, index=False)
+    return errors
+
+
+def run_mapping_jobs(jobs: list, output_dir: str = "processed_data/") -> list:
+    """
+    Map (label, model_path, coordinate_data_path, model) jobs in order.
+    Used as a process pool task, so it returns plain
+    (model, error, seconds, geometry cache stats) tuples instead of DataFrames.
+    """
+    results = []
+    for label, model_path, coordinate_data_path, model in jobs:
+        stats_before = geometry_cache_stats()
+        start = time.perf_counter()
+        error = None
+        try:
+            mapping_coordinate(
+                model_path, coordinate_data_path, model=model, output_dir=output_dir
+            )
+        except Exception as exc:
+            error = f"{label} {model_path}: {exc}"
+        cache_stats = {
+            key: value - stats_before[key]
+            for key, value in geometry_cache_stats().items()
+        }
+        results.append((model, error, time.perf_counter() - start, cache_stats))
+    return results
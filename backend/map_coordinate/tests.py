@@ -1,3 +1,310 @@
-from django.test import TestCase
+import math
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from map_coordinate import mapping
+
+
+class MappingTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        mapping._geometry_cache.clear()
+        self.addCleanup(mapping._geometry_cache.clear)
+        self.coordinate_path = self._write_coordinates(
+            "coordinates.csv", [(index, -87.7 + index / 100) for index in range(1, 9)]
+        )
+
+    def _write_coordinates(self, name, grids):
+        path = self.directory / name
+        pd.DataFrame(
+            {
+                "gridid": [grid_id for grid_id, _ in grids],
+                "xcentroid": [lng for _, lng in grids],
+                "ycentroid": [41.8 + grid_id / 1000 for grid_id, _ in grids],
+                "other": ["x"] * len(grids),
+            }
+        ).to_csv(path, index=False)
+        return path
+
+    def _write_ranking(self, name, model, period, grid_ids):
+        path = self.directory / name / "grid_ranking.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        counts = [float(len(grid_ids) - index) for index in range(len(grid_ids))]
+        columns = {"Rank": range(1, len(grid_ids) + 1), "grid_id": grid_ids}
+        if model == "mlp":
+            columns["Predicted_Crime_Count"] = counts
+            # Actual counts in the reverse order, so mapped_actual is re-ranked
+            columns["Actual_Crime_Count"] = counts[::-1]
+        else:
+            columns["Crime_T1"] = counts
+        columns["Target_Period"] = [period] * len(grid_ids)
+        pd.DataFrame(columns).to_csv(path, index=False)
+        return path
+
+    def _read_outputs(self, output_dir):
+        return {
+            path.relative_to(output_dir).as_posix(): pd.read_csv(path)
+            for path in sorted(Path(output_dir).rglob("mapped_*.csv"))
+        }
+
+    def assertSameOutputs(self, expected_dir, actual_dir):
+        expected = self._read_outputs(expected_dir)
+        actual = self._read_outputs(actual_dir)
+        self.assertTrue(expected)
+        self.assertEqual(list(expected), list(actual))
+        for name, frame in expected.items():
+            pd.testing.assert_frame_equal(actual[name], frame, obj=name)
+
+
+class GridBoundsTests(SimpleTestCase):
+    def test_array_bounds_match_scalar_bounds(self):
+        rng = np.random.default_rng(7)
+        latitudes = rng.uniform(-80, 80, 200)
+        longitudes = rng.uniform(-180, 180, 200)
+
+        for grid_size in (500, 1320.5):
+            bounds = mapping.calculate_grid_bounds_array(
+                latitudes, longitudes, grid_size
+            )
+            for index, (lat, lng) in enumerate(zip(latitudes, longitudes)):
+                expected = mapping.calculate_grid_bounds(lat, lng, grid_size)
+                for column, values in bounds.items():
+                    self.assertTrue(
+                        math.isclose(
+                            values[index], expected[column], rel_tol=0, abs_tol=1e-12
+                        ),
+                        (column, lat, lng, grid_size),
+                    )
+
+    def test_getting_coordinate_bounds_match_scalar_bounds(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = directory / "coordinates.csv"
+        pd.DataFrame(
+            {"gridid": [1, 2], "xcentroid": [-87.6, -87.7], "ycentroid": [41.8, 41.9]}
+        ).to_csv(path, index=False)
+
+        df = mapping.getting_coordinate(str(path))
+
+        for row in df.itertuples():
+            expected = mapping.calculate_grid_bounds(
+                row.center_latitude, row.center_longitude
+            )
+            self.assertEqual(
+                [list(corner) for corner in row.bounds],
+                [list(corner) for corner in expected["bounds"]],
+            )
+
+
+class GeometrySidecarTests(MappingTestCase):
+    def _sidecars(self):
+        return sorted(self.directory.glob("coordinates.*.geometry.npz"))
+
+    def test_new_process_reads_sidecar_instead_of_csv(self):
+        stats_before = mapping.geometry_cache_stats()
+        first = mapping.load_coordinate_geometry(str(self.coordinate_path))
+        self.assertEqual(len(self._sidecars()), 1)
+
+        # A fresh process starts with an empty in-memory cache
+        mapping._geometry_cache.clear()
+        second = mapping.load_coordinate_geometry(str(self.coordinate_path))
+
+        stats = mapping.geometry_cache_stats()
+        self.assertEqual(stats["misses"] - stats_before["misses"], 1)
+        self.assertEqual(stats["disk_hits"] - stats_before["disk_hits"], 1)
+        pd.testing.assert_frame_equal(second, first)
+
+    def test_memory_cache_returns_copies(self):
+        first = mapping.load_coordinate_geometry(str(self.coordinate_path))
+        first["center_latitude"] = 0.0
+
+        second = mapping.load_coordinate_geometry(str(self.coordinate_path))
+
+        self.assertTrue((second["center_latitude"] > 41).all())
+
+    def test_changed_source_invalidates_sidecar(self):
+        mapping.load_coordinate_geometry(str(self.coordinate_path))
+        old_sidecars = self._sidecars()
+
+        self._write_coordinates("coordinates.csv", [(1, -87.5), (42, -87.4)])
+        stats_before = mapping.geometry_cache_stats()
+        df = mapping.load_coordinate_geometry(str(self.coordinate_path))
+
+        stats = mapping.geometry_cache_stats()
+        self.assertEqual(stats["misses"] - stats_before["misses"], 1)
+        self.assertEqual(stats["disk_hits"], stats_before["disk_hits"])
+        self.assertEqual(df["grid_id"].tolist(), [1, 42])
+        self.assertEqual(df["center_longitude"].tolist(), [-87.5, -87.4])
+        new_sidecars = self._sidecars()
+        self.assertEqual(len(new_sidecars), 1)
+        self.assertNotEqual(new_sidecars, old_sidecars)
+
+    def test_grid_size_gets_its_own_sidecar(self):
+        small = mapping.load_coordinate_geometry(str(self.coordinate_path), 500)
+        large = mapping.load_coordinate_geometry(str(self.coordinate_path), 1000)
+
+        self.assertTrue(
+            (large["northeast_lat"] - small["northeast_lat"] > 0).all(),
+        )
+
+    def test_corrupt_sidecar_is_rebuilt(self):
+        expected = mapping.load_coordinate_geometry(str(self.coordinate_path))
+        [sidecar] = self._sidecars()
+        sidecar.write_bytes(b"not a zip file")
+        mapping._geometry_cache.clear()
+
+        df = mapping.load_coordinate_geometry(str(self.coordinate_path))
+
+        pd.testing.assert_frame_equal(df, expected)
+        self.assertEqual(self._sidecars(), [sidecar])
+        with np.load(sidecar) as arrays:
+            self.assertEqual(list(arrays["grid_id"]), list(expected["grid_id"]))
+
+
+class MappingBatchTests(MappingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.jobs = [
+            ("mlp", self._write_ranking("mlp_a", "mlp", 202401, [3, 1, 99, 5, 2])),
+            ("mlp", self._write_ranking("mlp_b", "mlp", 202402, [8, 7, 6])),
+            ("lee", self._write_ranking("lee_a", "lee", 202401, [4, 2, 1, 98])),
+        ]
+
+    def test_batch_matches_per_file_mapping(self):
+        per_file_dir = self.directory / "per_file"
+        batch_dir = self.directory / "batch"
+        for model, model_path in self.jobs:
+            mapping.mapping_coordinate(
+                str(model_path),
+                str(self.coordinate_path),
+                model=model,
+                output_dir=str(per_file_dir),
+            )
+
+        errors = mapping.mapping_coordinates_batch(
+            [(model, str(model_path)) for model, model_path in self.jobs],
+            str(self.coordinate_path),
+            output_dir=str(batch_dir),
+        )
+
+        self.assertEqual(errors, [None, None, None])
+        self.assertEqual(
+            list(self._read_outputs(batch_dir)),
+            [
+                "202401/mapped_actual.csv",
+                "202401/mapped_lee.csv",
+                "202401/mapped_mlp.csv",
+                "202402/mapped_actual.csv",
+                "202402/mapped_mlp.csv",
+            ],
+        )
+        self.assertSameOutputs(per_file_dir, batch_dir)
+
+    def test_batch_reports_errors_per_job(self):
+        jobs = [(model, str(model_path)) for model, model_path in self.jobs]
+        jobs.insert(1, ("mlp", str(self.directory / "missing.csv")))
+        unmatched = self._write_ranking("lee_b", "lee", 202403, [500, 501])
+        jobs.append(("lee", str(unmatched)))
+
+        errors = mapping.mapping_coordinates_batch(
+            jobs, str(self.coordinate_path), output_dir=str(self.directory / "out")
+        )
+
+        self.assertEqual(errors[0], None)
+        self.assertIn("missing.csv", errors[1])
+        self.assertEqual(errors[2:4], [None, None])
+        self.assertEqual(errors[4], "no ranked grid matches the coordinate table")
+        self.assertFalse((self.directory / "out" / "202403").exists())
+
+
+class RunMappingJobsTests(MappingTestCase):
+    def _job_lists(self):
+        return [
+            [
+                ("MLP", str(model_path), str(self.coordinate_path), "mlp")
+                for model_path in (
+                    self._write_ranking("mlp_a", "mlp", 202401, [3, 1, 5]),
+                    self._write_ranking("mlp_b", "mlp", 202401, [2, 4]),
+                )
+            ],
+            [
+                (
+                    "Baseline",
+                    str(self._write_ranking("lee_a", "lee", 202401, [6, 7])),
+                    str(self.coordinate_path),
+                    "lee",
+                )
+            ],
+            [
+                (
+                    "MLP",
+                    str(self._write_ranking("mlp_c", "mlp", 202402, [8, 1])),
+                    str(self.coordinate_path),
+                    "mlp",
+                )
+            ],
+        ]
+
+    def test_worker_pool_matches_sequential_run(self):
+        job_lists = self._job_lists()
+        sequential_dir = self.directory / "sequential"
+        pooled_dir = self.directory / "pooled"
+
+        sequential = [
+            mapping.run_mapping_jobs(jobs, output_dir=str(sequential_dir))
+            for jobs in job_lists
+        ]
+        mapping._geometry_cache.clear()
+        map_jobs = partial(mapping.run_mapping_jobs, output_dir=str(pooled_dir))
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            pooled = list(executor.map(map_jobs, job_lists))
+
+        self.assertEqual(
+            [[(model, error) for model, error, _, _ in results] for results in pooled],
+            [
+                [(model, error) for model, error, _, _ in results]
+                for results in sequential
+            ],
+        )
+        for results in pooled:
+            for _, _, seconds, cache_stats in results:
+                self.assertGreaterEqual(seconds, 0)
+                self.assertEqual(sum(cache_stats.values()), 1)
+        # The later job of a group wins, as in the sequential run
+        self.assertEqual(
+            pd.read_csv(pooled_dir / "202401" / "mapped_mlp.csv")["grid_id"].tolist(),
+            [2, 4],
+        )
+        self.assertSameOutputs(sequential_dir, pooled_dir)
+
+    def test_errors_are_reported_per_job(self):
+        jobs = [
+            (
+                "MLP",
+                str(self.directory / "missing.csv"),
+                str(self.coordinate_path),
+                "mlp",
+            ),
+            (
+                "Baseline",
+                str(self._write_ranking("lee_a", "lee", 202401, [6, 7])),
+                str(self.coordinate_path),
+                "lee",
+            ),
+        ]
+
+        results = mapping.run_mapping_jobs(jobs, output_dir=str(self.directory / "out"))
+
+        self.assertEqual([model for model, _, _, _ in results], ["mlp", "lee"])
+        self.assertTrue(results[0][1].startswith("MLP "))
+        self.assertIn("missing.csv", results[0][1])
+        self.assertIsNone(results[1][1])
+        self.assertTrue((self.directory / "out" / "202401" / "mapped_lee.csv").exists())
@@ -0,0 +1,130 @@
+# MLP vs baseline comparison shared by build_static_data, the metrics importer
+# and get_metrics_by_period. "values" dicts use the ModelComparison field names.
+
+COMPARISON_FIELDS = [
+    "mlp_pei",
+    "mlp_accuracy",
+    "baseline_pei",
+    "baseline_accuracy",
+    "pei_winner",
+    "pei_difference",
+    "accuracy_winner",
+    "accuracy_difference",
+]
+
+MODEL_PRESENTATION = {
+    "MLP": {
+        "prefix": "mlp",
+        "model_display": "MLP Predictions",
+        "color": "#4ECDC4",
+        "icon": "🧠",
+    },
+    "Baseline": {
+        "prefix": "baseline",
+        "model_display": "Baseline Predictions",
+        "color": "#FFD166",
+        "icon": "📊",
+    },
+}
+
+
+def comparison_model(model_name):
+    """Map a summary_table model name onto "MLP" / "Baseline", or None."""
+    name = (model_name or "").lower()
+    if "mlp" in name:
+        return "MLP"
+    if "lee" in name:
+        return "Baseline"
+    return None
+
+
+def compare_models(values):
+    """
+    Winners and differences for values holding mlp_pei, mlp_accuracy,
+    baseline_pei and baseline_accuracy. Ties go to the baseline.
+    Empty when either model is missing.
+    """
+    if values.get("mlp_pei") is None or values.get("baseline_pei") is None:
+        return {
+            "pei_winner": "",
+            "pei_difference": None,
+            "accuracy_winner": "",
+            "accuracy_difference": None,
+        }
+    return {
+        "pei_winner": (
+            "MLP" if values["mlp_pei"] > values["baseline_pei"] else "Baseline"
+        ),
+        "pei_difference": round(abs(values["mlp_pei"] - values["baseline_pei"]), 2),
+        "accuracy_winner": (
+            "MLP"
+            if values["mlp_accuracy"] > values["baseline_accuracy"]
+            else "Baseline"
+        ),
+        "accuracy_difference": round(
+            abs(values["mlp_accuracy"] - values["baseline_accuracy"]), 2
+        ),
+    }
+
+
+def comparison_values(rows):
+    """
+    Comparison values for one period from (model name, pei, accuracy) rows.
+    When several names map to the same model the first by name wins.
+    """
+    values = {}
+    for model_name, pei_percent, accuracy in sorted(rows, key=lambda row: row[0]):
+        model = comparison_model(model_name)
+        if model is None:
+            continue
+        prefix = MODEL_PRESENTATION[model]["prefix"]
+        values.setdefault(f"{prefix}_pei", pei_percent)
+        values.setdefault(f"{prefix}_accuracy", accuracy)
+    values.update(compare_models(values))
+    return values
+
+
+def metrics_payload(period, values=None):
+    """Build the metrics-by-period response body from comparison values."""
+    values = values or {}
+    metrics_data = []
+    for model, presentation in MODEL_PRESENTATION.items():
+        prefix = presentation["prefix"]
+        if values.get(f"{prefix}_pei") is None:
+            continue
+        metrics_data.append(
+            {
+                "model": model,
+                "model_display": presentation["model_display"],
+                "pei_percent": values[f"{prefix}_pei"],
+                "accuracy": values[f"{prefix}_accuracy"],
+                "target_period": period,
+                "color": presentation["color"],
+                "icon": presentation["icon"],
+            }
+        )
+
+    comparison = None
+    if len(metrics_data) == 2:
+        comparison = {
+            "pei": {
+                "winner": values["pei_winner"],
+                "difference": values["pei_difference"],
+                "mlp_value": values["mlp_pei"],
+                "baseline_value": values["baseline_pei"],
+            },
+            "accuracy": {
+                "winner": values["accuracy_winner"],
+                "difference": values["accuracy_difference"],
+                "mlp_value": values["mlp_accuracy"],
+                "baseline_value": values["baseline_accuracy"],
+            },
+        }
+
+    return {
+        "success": True,
+        "period": period,
+        "metrics": metrics_data,
+        "comparison": comparison,
+        "count": len(metrics_data),
+    }
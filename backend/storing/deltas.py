@@ -0,0 +1,104 @@
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+
+from .processing import PREDICTION_IMPORT_SPECS
+from .response_cache import DEFAULT_RESPONSE_TIMEOUT, get_dataset_version
+
+DELTA_COLUMNS = [
+    "grid_id",
+    "from_count",
+    "to_count",
+    "count_change",
+    "from_rank",
+    "to_rank",
+    "rank_change",
+]
+
+
+def _movers_cache_key(record_type, from_period, to_period, limit):
+    version = get_dataset_version()
+    return (
+        f"storing:rank-movers:{version}:{record_type}:{from_period}:{to_period}:"
+        f"{limit}"
+    )
+
+
+def compute_rank_deltas(record_type, from_period, to_period):
+    """
+    Rank and count changes of every grid between two periods, from a single
+    query over both rankings. rank_change is positive when a grid moved up
+    (towards rank 1). Grids missing from one period keep NaN in its columns.
+    """
+    spec = PREDICTION_IMPORT_SPECS[record_type]
+    rows = (
+        spec["model"]
+        .objects.filter(target_period__in=[from_period, to_period])
+        .values_list("grid_id", "target_period", spec["count_field"], "rank")
+        .order_by()
+    )
+    frame = pd.DataFrame.from_records(
+        list(rows), columns=["grid_id", "period", "count", "rank"]
+    )
+    # NULL ranks (or counts) leave object columns of None; NaN subtracts cleanly
+    frame[["count", "rank"]] = frame[["count", "rank"]].apply(
+        pd.to_numeric, errors="coerce"
+    )
+
+    def side(period, prefix):
+        return (
+            frame.loc[frame["period"] == period, ["grid_id", "count", "rank"]]
+            .set_index("grid_id")
+            .add_prefix(prefix)
+        )
+
+    deltas = side(from_period, "from_").join(side(to_period, "to_"), how="outer")
+    deltas["count_change"] = deltas["to_count"] - deltas["from_count"]
+    deltas["rank_change"] = deltas["from_rank"] - deltas["to_rank"]
+    return deltas.reset_index()[DELTA_COLUMNS]
+
+
+def _records(frame, integer_counts):
+    columns = ["from_rank", "to_rank", "rank_change"]
+    if integer_counts:
+        columns += ["from_count", "to_count", "count_change"]
+    frame = frame.astype(dict.fromkeys(columns, "Int64"))
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict("records")
+
+
+def _top_movers(record_type, from_period, to_period, limit):
+    deltas = compute_rank_deltas(record_type, from_period, to_period)
+    ranked = deltas.dropna(subset=["from_rank", "to_rank"])
+    risers = ranked[ranked["rank_change"] > 0].sort_values(
+        ["rank_change", "to_rank"], ascending=[False, True]
+    )
+    fallers = ranked[ranked["rank_change"] < 0].sort_values(
+        ["rank_change", "to_rank"], ascending=[True, True]
+    )
+    # Baseline counts are floats, actual and MLP counts integers
+    integer_counts = record_type != "baseline"
+    return {
+        "risers": _records(risers.head(limit), integer_counts),
+        "fallers": _records(fallers.head(limit), integer_counts),
+        "compared": len(ranked),
+    }
+
+
+def top_movers(record_type, from_period, to_period, limit):
+    """
+    The limit grids that rose and fell furthest in rank between two periods.
+    Only grids ranked in both periods are compared; ties go to the grid with
+    the better rank in to_period. The result (not the DataFrame behind it)
+    is cached per model, period pair and limit for the dataset version.
+    """
+    key = _movers_cache_key(record_type, from_period, to_period, limit)
+    movers = cache.get(key)
+    if movers is None:
+        movers = _top_movers(record_type, from_period, to_period, limit)
+        cache.set(
+            key,
+            movers,
+            getattr(settings, "RESPONSE_CACHE_TIMEOUT", DEFAULT_RESPONSE_TIMEOUT),
+        )
+    return movers
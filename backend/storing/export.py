@@ -0,0 +1,91 @@
+import csv
+import io
+
+from django.db.models import Q
+
+from .processing import PREDICTION_IMPORT_SPECS
+from .serializers import (
+    ACTUAL_CRIME_VALUES,
+    BASELINE_PREDICTION_VALUES,
+    MLP_PREDICTION_VALUES,
+)
+from .static_cache import encode_json
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+PREDICTION_VALUES = {
+    "actual": ACTUAL_CRIME_VALUES,
+    "mlp": MLP_PREDICTION_VALUES,
+    "baseline": BASELINE_PREDICTION_VALUES,
+}
+
+
+def _keyset_chunks(queryset, lookups, keys, chunk_size):
+    """
+    Yield value tuples in chunks of chunk_size, each chunk its own query that
+    resumes after the last (rank, id) / (id,) key seen. Unlike iterator(),
+    memory stays bounded on MySQL, whose driver buffers whole result sets.
+    """
+    last = None
+    while True:
+        chunk_queryset = queryset
+        if last is not None:
+            if len(keys) == 2:
+                chunk_queryset = chunk_queryset.filter(
+                    Q(rank__gt=last[0]) | Q(rank=last[0], id__gt=last[1])
+                )
+            else:
+                chunk_queryset = chunk_queryset.filter(id__gt=last[0])
+        rows = list(
+            chunk_queryset.order_by(*keys).values_list(*lookups, *keys)[:chunk_size]
+        )
+        if not rows:
+            return
+        yield [row[: len(lookups)] for row in rows]
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1][len(lookups) :]
+
+
+def iter_ranking_chunks(record_type, periods, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Full rankings of record_type for each period in rank order, as lists of
+    at most chunk_size tuples in PREDICTION_VALUES[record_type].fields order.
+    Rows without a rank follow the ranked ones.
+    """
+    model = PREDICTION_IMPORT_SPECS[record_type]["model"]
+    lookups = PREDICTION_VALUES[record_type].lookups
+    for period in periods:
+        rows = model.objects.filter(target_period=period)
+        for ranked_rows, keys in (
+            (rows.filter(rank__isnull=False), ("rank", "id")),
+            (rows.filter(rank__isnull=True), ("id",)),
+        ):
+            yield from _keyset_chunks(ranked_rows, lookups, keys, chunk_size)
+
+
+def stream_export(record_type, periods, export_format):
+    """
+    NDJSON or CSV bytes for a StreamingHttpResponse, one piece per database
+    chunk so the first bytes go out after the first query.
+    """
+    fields = PREDICTION_VALUES[record_type].fields
+    chunks = iter_ranking_chunks(record_type, periods)
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for rows in chunks:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    else:
+        for rows in chunks:
+            yield b"".join(encode_json(dict(zip(fields, row))) + b"\n" for row in rows)
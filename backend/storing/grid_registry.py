@@ -0,0 +1,65 @@
+from django.db import transaction
+
+from .models import CrimeGrid
+from .processing import DEFAULT_BULK_BATCH_SIZE, GRID_GEOMETRY_FIELDS, _bulk_upsert
+
+
+class GridRegistry:
+    """
+    In-memory map of grid_id -> geometry tuple for every CrimeGrid row.
+
+    Loaded once per pipeline run and shared by every import, so a grid is
+    only written when it is new or its geometry actually changed.
+    """
+
+    def __init__(self):
+        self._geometry = None
+        self.stats = {"hits": 0, "misses": 0, "changed": 0}
+
+    def load(self):
+        rows = CrimeGrid.objects.values_list("grid_id", *GRID_GEOMETRY_FIELDS)
+        self._geometry = {row[0]: row[1:] for row in rows.iterator()}
+        return self
+
+    def sync(self, grids, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """
+        Write new and changed grids in one batched upsert.
+        grids are dicts from CrimeDataProcessor.parse_grid_row.
+        Returns the number of grids created.
+        """
+        if self._geometry is None:
+            self.load()
+
+        pending = {}
+        created = 0
+        for grid in grids:
+            grid_id = grid["grid_id"]
+            geometry = tuple(grid[field] for field in GRID_GEOMETRY_FIELDS)
+            known = self._geometry.get(grid_id)
+            if known == geometry:
+                self.stats["hits"] += 1
+                continue
+            if known is None and grid_id not in pending:
+                self.stats["misses"] += 1
+                created += 1
+            else:
+                self.stats["changed"] += 1
+            pending[grid_id] = geometry
+
+        if pending:
+            _bulk_upsert(
+                CrimeGrid,
+                [
+                    CrimeGrid(
+                        grid_id=grid_id, **dict(zip(GRID_GEOMETRY_FIELDS, geometry))
+                    )
+                    for grid_id, geometry in pending.items()
+                ],
+                unique_fields=["grid_id"],
+                update_fields=GRID_GEOMETRY_FIELDS + ["updated_at"],
+                batch_size=batch_size,
+            )
+            # Only remember the grids once they are committed, so a rolled
+            # back import does not hide grids that were never written
+            transaction.on_commit(lambda: self._geometry.update(pending))
+        return created
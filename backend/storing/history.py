@@ -0,0 +1,46 @@
+from django.db.models import FloatField, IntegerField, Value
+from django.db.models.functions import Cast
+
+from .processing import PREDICTION_IMPORT_SPECS
+
+SERIES = ["actual", "mlp", "baseline"]
+EMPTY_PERIOD = {
+    f"{series}_{field}": None for series in SERIES for field in ("count", "rank")
+}
+
+
+def _series_queryset(series, grid_ids):
+    spec = PREDICTION_IMPORT_SPECS[series]
+    # Same column types in every branch so the UNION is valid on all backends
+    return (
+        spec["model"]
+        .objects.filter(grid_id__in=grid_ids)
+        .annotate(
+            series=Value(SERIES.index(series), output_field=IntegerField()),
+            count=Cast(spec["count_field"], FloatField()),
+        )
+        .values_list("grid_id", "target_period", "series", "count", "rank")
+        .order_by()
+    )
+
+
+def grid_history(grid_ids):
+    """
+    Actual, MLP and baseline counts and ranks per period for each grid, read
+    with a single UNION ALL over the (grid, target_period, rank, count)
+    covering indexes. Returns {grid_id: [period entry, ...]} in period order.
+    Missing series are None.
+    """
+    first, *rest = [_series_queryset(series, grid_ids) for series in SERIES]
+    rows = first.union(*rest, all=True).order_by("grid_id", "target_period")
+
+    history = {grid_id: {} for grid_id in grid_ids}
+    for grid_id, period, series_index, count, rank in rows:
+        series = SERIES[series_index]
+        entry = history[grid_id].get(period)
+        if entry is None:
+            entry = history[grid_id][period] = {"period": period, **EMPTY_PERIOD}
+        # Actual and MLP counts are stored as integers
+        entry[f"{series}_count"] = count if series == "baseline" else int(count)
+        entry[f"{series}_rank"] = rank
+    return {grid_id: list(periods.values()) for grid_id, periods in history.items()}
@@ -0,0 +1,98 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from storing.processing import DEFAULT_BULK_BATCH_SIZE, CrimeDataProcessor
+
+ROW_IMPORTERS = {
+    "actual": CrimeDataProcessor.import_actual_crime_csv,
+    "mlp": CrimeDataProcessor.import_mlp_predictions_csv,
+    "baseline": CrimeDataProcessor.import_baseline_predictions_csv,
+}
+
+PROCESSED_FILENAMES = {
+    "actual": "mapped_actual.csv",
+    "mlp": "mapped_mlp.csv",
+    "baseline": "mapped_lee.csv",
+}
+
+
+def _timed_import(run):
+    """Run an import inside a transaction that is always rolled back."""
+    with transaction.atomic():
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        transaction.set_rollback(True)
+    return result, elapsed
+
+
+def _rows_per_second(rows, elapsed):
+    return rows / elapsed if elapsed > 0 else 0.0
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of the per-row and bulk importers on processed CSVs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processed-dir",
+            default="processed_data",
+            help="Directory containing processed data (default: processed_data)",
+        )
+        parser.add_argument(
+            "--record-type",
+            choices=sorted(PROCESSED_FILENAMES),
+            default="mlp",
+            help="Which mapped file to import (default: mlp)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BULK_BATCH_SIZE,
+            help=f"Rows per upsert statement (default: {DEFAULT_BULK_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        processed_dir = (Path(settings.BASE_DIR) / options["processed_dir"]).resolve()
+        record_type = options["record_type"]
+        batch_size = options["batch_size"]
+
+        csv_paths = sorted(processed_dir.rglob(PROCESSED_FILENAMES[record_type]))
+        if not csv_paths:
+            self.stderr.write(f"No processed {record_type} files in {processed_dir}")
+            return
+
+        totals = {"rows": 0, "row_seconds": 0.0, "bulk_seconds": 0.0}
+        for csv_path in csv_paths:
+            row_result, row_seconds = _timed_import(
+                lambda: ROW_IMPORTERS[record_type](str(csv_path))
+            )
+            bulk_result, bulk_seconds = _timed_import(
+                lambda: CrimeDataProcessor.bulk_import_csv(
+                    str(csv_path), record_type, batch_size=batch_size
+                )
+            )
+            rows = row_result["total_rows"]
+            totals["rows"] += rows
+            totals["row_seconds"] += row_seconds
+            totals["bulk_seconds"] += bulk_seconds
+
+            self.stdout.write(
+                f"{csv_path}: {rows} rows | "
+                f"per-row {_rows_per_second(rows, row_seconds):.0f} rows/s | "
+                f"bulk {_rows_per_second(bulk_result['total_rows'], bulk_seconds):.0f} rows/s"
+            )
+
+        row_rate = _rows_per_second(totals["rows"], totals["row_seconds"])
+        bulk_rate = _rows_per_second(totals["rows"], totals["bulk_seconds"])
+        speedup = bulk_rate / row_rate if row_rate else 0.0
+        self.stdout.write("Benchmark summary (all writes rolled back):")
+        self.stdout.write(f"  Files: {len(csv_paths)}")
+        self.stdout.write(f"  Rows: {totals['rows']}")
+        self.stdout.write(f"  Per-row import: {row_rate:.0f} rows/s")
+        self.stdout.write(f"  Bulk import (batch {batch_size}): {bulk_rate:.0f} rows/s")
+        self.stdout.write(self.style.SUCCESS(f"  Speedup: {speedup:.1f}x"))
@@ -0,0 +1,105 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from storing.models import ActualCrime, CrimeGrid
+from storing.processing import DEFAULT_BULK_BATCH_SIZE
+from storing.serializers import ACTUAL_CRIME_VALUES, ActualCrimeSerializer
+
+# Far outside real data so the synthetic rows never mix with imported ones
+BENCHMARK_PERIOD = 299912
+BENCHMARK_GRID_OFFSET = 900_000_000
+
+
+def _seed_rows(count):
+    grids = [
+        CrimeGrid(
+            grid_id=BENCHMARK_GRID_OFFSET + index,
+            center_longitude=-82.5 + index * 1e-6,
+            center_latitude=27.3 + index * 1e-6,
+            southwest_lat=27.3,
+            southwest_lng=-82.5,
+            northeast_lat=27.4,
+            northeast_lng=-82.4,
+        )
+        for index in range(count)
+    ]
+    CrimeGrid.objects.bulk_create(grids, batch_size=DEFAULT_BULK_BATCH_SIZE)
+    ActualCrime.objects.bulk_create(
+        [
+            ActualCrime(
+                grid_id=grid.grid_id,
+                target_period=BENCHMARK_PERIOD,
+                actual_crime_count=index % 50,
+                rank=index + 1,
+            )
+            for index, grid in enumerate(grids)
+        ],
+        batch_size=DEFAULT_BULK_BATCH_SIZE,
+    )
+
+
+def _best_of(repeat, run):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-row cost of the DRF prediction serializers and the "
+        "values_list fast path on synthetic rows (all writes rolled back)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limits",
+            default="20,1000,100000",
+            help="Comma separated row counts to serialize (default: 20,1000,100000)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per measurement, the fastest is reported (default: 3)",
+        )
+
+    def handle(self, *args, **options):
+        limits = sorted(int(value) for value in options["limits"].split(",") if value)
+        repeat = max(1, options["repeat"])
+
+        with transaction.atomic():
+            _seed_rows(limits[-1])
+            queryset = ActualCrime.objects.filter(
+                target_period=BENCHMARK_PERIOD
+            ).order_by("rank")
+
+            self.stdout.write("Per-row serialization cost (query included):")
+            for limit in limits:
+                drf_rows, drf_seconds = _best_of(
+                    repeat,
+                    lambda: ActualCrimeSerializer(
+                        queryset.select_related("grid")[:limit], many=True
+                    ).data,
+                )
+                fast_rows, fast_seconds = _best_of(
+                    repeat, lambda: ACTUAL_CRIME_VALUES.serialize(queryset[:limit])
+                )
+                if [dict(row) for row in drf_rows] != fast_rows:
+                    self.stderr.write(f"  limit {limit}: outputs differ")
+
+                drf_per_row = drf_seconds / len(drf_rows) * 1e6
+                fast_per_row = fast_seconds / len(fast_rows) * 1e6
+                self.stdout.write(
+                    f"  limit {limit}: DRF {drf_per_row:.1f} us/row "
+                    f"({drf_seconds * 1000:.1f} ms) | values_list "
+                    f"{fast_per_row:.1f} us/row ({fast_seconds * 1000:.1f} ms) | "
+                    f"{drf_seconds / fast_seconds:.1f}x"
+                )
+            transaction.set_rollback(True)
@@ -3,8 +3,14 @@ import json
 from pathlib import Path
 
 from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
+from storing.comparison import comparison_values
+from storing.comparison import metrics_payload as build_metrics_payload
+from storing.response_cache import bump_dataset_version
+from storing.static_cache import COMPRESSED_SUFFIXES, COMPRESSORS, encode_json
+
 
 def _safe_int(value):
     if value is None or value == "":
@@ -72,19 +78,60 @@ class Command(BaseCommand):
             default=str(Path(settings.BASE_DIR) / "static_data"),
             help="Directory where static JSON files will be written.",
         )
+        parser.add_argument(
+            "--processed-dir",
+            default=str(Path(settings.BASE_DIR) / "processed_data"),
+            help="Directory containing processed mapped_*.csv files.",
+        )
+        parser.add_argument(
+            "--data-dir",
+            default=str(Path(settings.BASE_DIR) / "data"),
+            help="Directory searched for summary_table.csv metric files.",
+        )
         parser.add_argument(
             "--limit",
             type=int,
             default=20,
             help="Maximum number of rows per model.",
         )
+        parser.add_argument(
+            "--no-warm",
+            action="store_true",
+            help="Do not preload the response cache after writing the files.",
+        )
+
+    def _write_payload(self, output_path, payload):
+        """
+        Write the readable JSON file plus compact and precompressed variants
+        (name.min.json, name.min.json.gz and name.min.json.br)
+        and report how much smaller each variant is.
+        """
+        pretty = json.dumps(payload, indent=2).encode("utf-8")
+        output_path.write_bytes(pretty)
+
+        compact = encode_json(payload)
+        min_path = output_path.with_suffix(".min.json")
+        min_path.write_bytes(compact)
+        sizes = [("min", len(compact))]
+        for encoding, suffix in COMPRESSED_SUFFIXES.items():
+            body = COMPRESSORS[encoding](compact)
+            Path(f"{min_path}{suffix}").write_bytes(body)
+            sizes.append((encoding, len(body)))
+
+        report = ", ".join(
+            f"{name} {size} B (-{100 - 100 * size / len(pretty):.0f}%)"
+            for name, size in sizes
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {output_path} ({len(pretty)} B; {report})")
+        )
 
     def handle(self, *args, **options):
         output_dir = Path(options["output_dir"])
         output_dir.mkdir(parents=True, exist_ok=True)
         limit = options["limit"]
 
-        processed_root = Path(settings.BASE_DIR) / "processed_data"
+        processed_root = Path(options["processed_dir"])
         period_dirs = [
             path
             for path in processed_root.iterdir()
@@ -131,13 +178,10 @@ class Command(BaseCommand):
             }
 
             output_path = output_dir / f"top_predictions_{period}.json"
-            output_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-            self.stdout.write(self.style.SUCCESS(f"Wrote {output_path}"))
+            self._write_payload(output_path, payload)
 
         metrics_by_period = {}
-        metrics_sources = list(
-            (Path(settings.BASE_DIR) / "data").glob("**/summary_table.csv")
-        )
+        metrics_sources = list(Path(options["data_dir"]).glob("**/summary_table.csv"))
         for csv_path in metrics_sources:
             for row in _parse_summary_table(csv_path):
                 period = row["target_period"]
@@ -147,97 +191,13 @@ class Command(BaseCommand):
                 metrics_by_period[period]["models"][row["model"]] = row
 
         for period, data in metrics_by_period.items():
-            models = data["models"]
-            metrics_data = []
-
-            mlp_row = next(
-                (row for name, row in models.items() if "mlp" in name.lower()),
-                None,
+            values = comparison_values(
+                (name, row["pei_percent"], row["accuracy_percent"])
+                for name, row in data["models"].items()
             )
-            baseline_row = next(
-                (row for name, row in models.items() if "lee" in name.lower()),
-                None,
-            )
-
-            if mlp_row:
-                metrics_data.append(
-                    {
-                        "model": "MLP",
-                        "model_display": "MLP Predictions",
-                        "pei_percent": mlp_row["pei_percent"],
-                        "accuracy": mlp_row["accuracy_percent"],
-                        "target_period": period,
-                        "color": "#4ECDC4",
-                        "icon": "🧠",
-                    }
-                )
-
-            if baseline_row:
-                metrics_data.append(
-                    {
-                        "model": "Baseline",
-                        "model_display": "Baseline Predictions",
-                        "pei_percent": baseline_row["pei_percent"],
-                        "accuracy": baseline_row["accuracy_percent"],
-                        "target_period": period,
-                        "color": "#FFD166",
-                        "icon": "📊",
-                    }
-                )
-
-            comparison = None
-            if len(metrics_data) == 2:
-                mlp_data = (
-                    metrics_data[0]
-                    if metrics_data[0]["model"] == "MLP"
-                    else metrics_data[1]
-                )
-                baseline_data = (
-                    metrics_data[0]
-                    if metrics_data[0]["model"] == "Baseline"
-                    else metrics_data[1]
-                )
-                pei_winner = (
-                    "MLP"
-                    if mlp_data["pei_percent"] > baseline_data["pei_percent"]
-                    else "Baseline"
-                )
-                pei_difference = abs(
-                    mlp_data["pei_percent"] - baseline_data["pei_percent"]
-                )
-                accuracy_winner = (
-                    "MLP"
-                    if mlp_data["accuracy"] > baseline_data["accuracy"]
-                    else "Baseline"
-                )
-                accuracy_difference = abs(
-                    mlp_data["accuracy"] - baseline_data["accuracy"]
-                )
-                comparison = {
-                    "pei": {
-                        "winner": pei_winner,
-                        "difference": round(pei_difference, 2),
-                        "mlp_value": mlp_data["pei_percent"],
-                        "baseline_value": baseline_data["pei_percent"],
-                    },
-                    "accuracy": {
-                        "winner": accuracy_winner,
-                        "difference": round(accuracy_difference, 2),
-                        "mlp_value": mlp_data["accuracy"],
-                        "baseline_value": baseline_data["accuracy"],
-                    },
-                }
-
-            metrics_payload = {
-                "success": True,
-                "period": period,
-                "metrics": metrics_data,
-                "comparison": comparison,
-                "count": len(metrics_data),
-            }
+            metrics_payload = build_metrics_payload(period, values)
             output_path = output_dir / f"metrics_{period}.json"
-            output_path.write_text(json.dumps(metrics_payload, indent=2), encoding="utf-8")
-            self.stdout.write(self.style.SUCCESS(f"Wrote {output_path}"))
+            self._write_payload(output_path, metrics_payload)
 
         available_periods = sorted(metrics_by_period.keys())
         periods_detail = []
@@ -257,7 +217,9 @@ class Command(BaseCommand):
             "count": len(available_periods),
         }
         available_path = output_dir / "available_periods.json"
-        available_path.write_text(
-            json.dumps(available_payload, indent=2), encoding="utf-8"
-        )
-        self.stdout.write(self.style.SUCCESS(f"Wrote {available_path}"))
+        self._write_payload(available_path, available_payload)
+
+        # Cached API responses were built from the previous files
+        bump_dataset_version()
+        if not options["no_warm"]:
+            call_command("warm_response_cache", stdout=self.stdout)
@@ -0,0 +1,188 @@
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+FEET_PER_DEGREE_LAT = 366666
+GRID_SIZE_FEET = 500
+ORIGIN_LAT = 27.25
+ORIGIN_LNG = -82.6
+MODELS = ("mlp", "baseline")
+
+
+def _periods(start_period, count):
+    year, month = divmod(start_period, 100)
+    periods = []
+    for _ in range(count):
+        periods.append(year * 100 + month)
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return periods
+
+
+def _coordinate_frame(grid_count):
+    # Square lattice of 500ft cells, same columns as coordinate/coordinate.csv
+    side = math.ceil(math.sqrt(grid_count))
+    index = np.arange(grid_count)
+    lat_step = GRID_SIZE_FEET / FEET_PER_DEGREE_LAT
+    lng_step = GRID_SIZE_FEET / (
+        FEET_PER_DEGREE_LAT * math.cos(math.radians(ORIGIN_LAT))
+    )
+    return pd.DataFrame(
+        {
+            "gridid": index + 1,
+            "shape_leng": 2000.0,
+            "shape_area": 250000.0,
+            "xcentroid": ORIGIN_LNG + (index % side) * lng_step,
+            "ycentroid": ORIGIN_LAT + (index // side) * lat_step,
+        }
+    )
+
+
+def _summary_frame(model_name, period, rng):
+    return pd.DataFrame(
+        [
+            {
+                "dataset": "Synthetic_all",
+                "model": model_name,
+                "temporal": "Monthly",
+                "grid_size": "500m",
+                "tie_breaking": "Grid Id",
+                "target_periods": period,
+                "period": "1 Month",
+                "pei_percent": round(rng.uniform(50, 90), 1),
+                "accuracy_percent": round(rng.uniform(20, 60), 1),
+            }
+        ]
+    )
+
+
+def _mlp_ranking(grid_ids, actual, hotspot, period, rng):
+    predicted = hotspot * rng.lognormal(0, 0.25, len(grid_ids))
+    order = np.argsort(-predicted, kind="stable")
+    return pd.DataFrame(
+        {
+            "Rank": np.arange(1, len(grid_ids) + 1),
+            "grid_id": grid_ids[order],
+            "Predicted_Crime_Count": predicted[order],
+            "Actual_Crime_Count": actual[order],
+            "Target_Period": period,
+            "Is_Highlighted": np.arange(len(grid_ids)) < 20,
+        }
+    )
+
+
+def _baseline_ranking(grid_ids, previous, before_previous, period):
+    # Lee-style naive ranking from the two previous months
+    score = previous + 0.5 * before_previous
+    atp_score = score / score.max() if score.max() else score.astype(float)
+    order = np.lexsort((grid_ids, -score))
+    return pd.DataFrame(
+        {
+            "Rank": np.arange(1, len(grid_ids) + 1),
+            "grid_id": grid_ids[order],
+            "ATP_Score": atp_score[order],
+            "Crime_T1": previous[order],
+            "Crime_T2": before_previous[order],
+            "Best_Neighbor_Rank": np.arange(1, len(grid_ids) + 1),
+            "Target_Period": period,
+            "Is_Highlighted": np.arange(len(grid_ids)) < 20,
+        }
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic coordinate.csv / grid_ranking.csv / "
+        "summary_table.csv tree in the real on-disk layout."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            default="synthetic_data",
+            help="Root of the generated tree (default: synthetic_data)",
+        )
+        parser.add_argument(
+            "--grids", type=int, default=10000, help="Number of grids (default: 10000)"
+        )
+        parser.add_argument(
+            "--periods", type=int, default=12, help="Number of periods (default: 12)"
+        )
+        parser.add_argument(
+            "--start-period",
+            type=int,
+            default=202301,
+            help="First period, YYYYMM (default: 202301)",
+        )
+        parser.add_argument(
+            "--models",
+            default=",".join(MODELS),
+            help="Comma separated models to generate (default: mlp,baseline)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        root = Path(options["output_dir"]).resolve()
+        models = [model.strip() for model in options["models"].split(",") if model]
+        unknown = set(models) - set(MODELS)
+        if unknown:
+            raise CommandError(f"Unknown models: {', '.join(sorted(unknown))}")
+
+        rng = np.random.default_rng(options["seed"])
+        coordinates = _coordinate_frame(options["grids"])
+        coordinate_path = root / "coordinate" / "coordinate.csv"
+        coordinate_path.parent.mkdir(parents=True, exist_ok=True)
+        coordinates.to_csv(coordinate_path, index=False)
+
+        grid_ids = coordinates["gridid"].to_numpy()
+        # Stable per-grid crime rate so rankings look alike across periods
+        hotspot = rng.gamma(0.5, 2.0, len(grid_ids))
+        history = [rng.poisson(hotspot), rng.poisson(hotspot)]
+        periods = _periods(options["start_period"], options["periods"])
+
+        for period in periods:
+            actual = rng.poisson(hotspot)
+            run_name = f"synthetic_all_monthly_500_grid-id_{options['seed']}_{period}"
+
+            if "mlp" in models:
+                run_dir = root / "data" / "mlp" / "results" / run_name
+                run_dir.mkdir(parents=True, exist_ok=True)
+                _mlp_ranking(grid_ids, actual, hotspot, period, rng).to_csv(
+                    run_dir / "grid_ranking.csv", index=False
+                )
+                _summary_frame("MLP", period, rng).to_csv(
+                    run_dir / "summary_table.csv", index=False
+                )
+
+            if "baseline" in models:
+                run_dir = root / "data" / "baseline" / run_name
+                run_dir.mkdir(parents=True, exist_ok=True)
+                _baseline_ranking(grid_ids, history[-1], history[-2], period).to_csv(
+                    run_dir / "grid_ranking.csv", index=False
+                )
+                _summary_frame("Lee Algorithm", period, rng).to_csv(
+                    run_dir / "summary_table.csv", index=False
+                )
+
+            history.append(actual)
+
+        dataset = {
+            "grids": len(grid_ids),
+            "periods": periods,
+            "models": models,
+            "seed": options["seed"],
+        }
+        (root / "dataset.json").write_text(
+            json.dumps(dataset, indent=2), encoding="utf-8"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(grid_ids)} grids x {len(periods)} periods "
+                f"({', '.join(models)}) to {root}"
+            )
+        )
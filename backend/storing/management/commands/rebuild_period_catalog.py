@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from storing.processing import PeriodCatalogProcessor
+
+
+class Command(BaseCommand):
+    help = "Recompute the period catalog from the prediction and metric tables."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = PeriodCatalogProcessor.refresh()
+        self.stdout.write(self.style.SUCCESS(f"Period catalog rebuilt: {rows} periods"))
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from storing.processing import (
+    DEFAULT_BULK_BATCH_SIZE,
+    PREDICTION_IMPORT_SPECS,
+    UnifiedPredictionProcessor,
+)
+from storing.models import Prediction
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the actual, MLP and baseline tables into the unified prediction "
+        "table. Run before enabling UNIFIED_PREDICTION_STORE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models",
+            nargs="+",
+            choices=list(PREDICTION_IMPORT_SPECS),
+            default=list(PREDICTION_IMPORT_SPECS),
+            help="Source tables to copy (default: all)",
+        )
+        parser.add_argument(
+            "--periods",
+            nargs="+",
+            type=int,
+            help="Only rebuild these YYYYMM periods (default: all)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BULK_BATCH_SIZE,
+            help="Rows per bulk insert",
+        )
+
+    def _periods(self, record_type):
+        # Mirrored periods whose source rows are gone are cleared as well
+        source = PREDICTION_IMPORT_SPECS[record_type]["model"].objects
+        mirrored = Prediction.objects.filter(model=record_type)
+        return sorted(
+            set(source.values_list("target_period", flat=True).distinct())
+            | set(mirrored.values_list("target_period", flat=True).distinct())
+        )
+
+    def handle(self, *args, **options):
+        for record_type in options["models"]:
+            rows = 0
+            for period in options["periods"] or self._periods(record_type):
+                # One transaction per period keeps each delete and copy short
+                with transaction.atomic():
+                    rows += UnifiedPredictionProcessor.sync(
+                        record_type, [period], options["batch_size"]
+                    )
+            self.stdout.write(
+                self.style.SUCCESS(f"{record_type}: {rows} prediction rows written")
+            )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from storing.processing import DEFAULT_BULK_BATCH_SIZE, TopPredictionProcessor
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the denormalized top prediction read model from the actual, "
+        "MLP and baseline tables, or verify it with --check."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--periods",
+            nargs="+",
+            type=int,
+            help="Only rebuild or check these YYYYMM periods (default: all)",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Compare per-period checksums against the normalized tables "
+            "instead of rebuilding; fails when they differ",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BULK_BATCH_SIZE,
+            help="Rows per bulk insert",
+        )
+
+    def handle(self, *args, **options):
+        periods = options["periods"]
+
+        if options["check"]:
+            mismatched = TopPredictionProcessor.check(periods)
+            if mismatched:
+                for period, model in mismatched:
+                    self.stderr.write(f"{period} {model}: checksum mismatch")
+                raise CommandError(
+                    f"Top predictions out of date for {len(mismatched)} "
+                    "period/model pairs, run rebuild_top_predictions"
+                )
+            self.stdout.write(self.style.SUCCESS("Top predictions are consistent"))
+            return
+
+        with transaction.atomic():
+            rows = TopPredictionProcessor.refresh(
+                periods, batch_size=options["batch_size"]
+            )
+        self.stdout.write(self.style.SUCCESS(f"Top predictions rebuilt: {rows} rows"))
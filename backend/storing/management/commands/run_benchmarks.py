@@ -0,0 +1,267 @@
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from map_coordinate.mapping import mapping_coordinates_batch, run_mapping_jobs
+from storing.processing import DEFAULT_BULK_BATCH_SIZE, CrimeDataProcessor
+
+STAGES = ("mapping", "import", "static")
+
+ROW_IMPORTERS = {
+    "actual": CrimeDataProcessor.import_actual_crime_csv,
+    "mlp": CrimeDataProcessor.import_mlp_predictions_csv,
+    "baseline": CrimeDataProcessor.import_baseline_predictions_csv,
+}
+
+PROCESSED_FILENAMES = {
+    "actual": "mapped_actual.csv",
+    "mlp": "mapped_mlp.csv",
+    "baseline": "mapped_lee.csv",
+}
+
+
+def _count_rows(paths):
+    total = 0
+    for path in paths:
+        with open(path, "rb") as file:
+            total += max(sum(1 for _ in file) - 1, 0)
+    return total
+
+
+def _process_max_rss_mb():
+    # High-water mark of the whole process, it never goes down between
+    # stages. ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def _measure(run, rows, trace_memory):
+    """
+    Time run() and collect its throughput. Only peak_traced_mb is specific to
+    the stage; process_max_rss_mb includes every earlier stage.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    result = {
+        "seconds": round(seconds, 4),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else 0.0,
+        "process_max_rss_mb": _process_max_rss_mb(),
+    }
+    if trace_memory:
+        result["peak_traced_mb"] = round(
+            tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1
+        )
+        tracemalloc.stop()
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the mapping, import and static build stages against a data tree "
+        "(see generate_synthetic_data) and write the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--root",
+            default="synthetic_data",
+            help="Tree with coordinate/, data/ and processed_data/ (default: synthetic_data)",
+        )
+        parser.add_argument(
+            "--stages",
+            default=",".join(STAGES),
+            help="Comma separated stages to run (default: mapping,import,static)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Where to write the JSON results (default: <root>/benchmark_results.json)",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Previous results JSON to print per-stage speedups against",
+        )
+        parser.add_argument("--label", default="", help="Free-form run label")
+        parser.add_argument(
+            "--batch-mapping",
+            action="store_true",
+            help="Map every ranking file with one geometry join",
+        )
+        parser.add_argument(
+            "--import-mode",
+            choices=["row", "bulk", "stream"],
+            default="bulk",
+            help="Importer to time (default: bulk)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BULK_BATCH_SIZE,
+            help=f"Rows per upsert statement (default: {DEFAULT_BULK_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Also report per-stage tracemalloc peaks (slows every stage down)",
+        )
+
+    def _mapping(self, root, processed_dir, batch_mapping):
+        data_dir = root / "data"
+        coordinate_path = str(root / "coordinate" / "coordinate.csv")
+        jobs = [
+            ("MLP", str(path), coordinate_path, "mlp")
+            for path in sorted((data_dir / "mlp" / "results").rglob("grid_ranking.csv"))
+        ]
+        jobs.extend(
+            ("Baseline", str(path), coordinate_path, "lee")
+            for path in sorted((data_dir / "baseline").rglob("grid_ranking.csv"))
+        )
+        if not jobs:
+            raise CommandError(f"No grid_ranking.csv files under {data_dir}")
+
+        def run():
+            if batch_mapping:
+                errors = mapping_coordinates_batch(
+                    [(model, path) for _, path, _, model in jobs],
+                    coordinate_path,
+                    output_dir=str(processed_dir),
+                )
+            else:
+                results = run_mapping_jobs(jobs, output_dir=str(processed_dir))
+                errors = [error for _, error, _, _ in results]
+            errors = [error for error in errors if error]
+            if errors:
+                raise CommandError(f"Mapping failed: {errors[0]}")
+
+        return run, _count_rows(path for _, path, _, _ in jobs)
+
+    def _import(self, processed_dir, import_mode, batch_size):
+        files = [
+            (record_type, path)
+            for record_type, filename in PROCESSED_FILENAMES.items()
+            for path in sorted(processed_dir.rglob(filename))
+        ]
+        if not files:
+            raise CommandError(f"No mapped CSV files under {processed_dir}")
+
+        def run():
+            # Always rolled back so repeated runs time the same inserts
+            with transaction.atomic():
+                for record_type, path in files:
+                    if import_mode == "bulk":
+                        CrimeDataProcessor.bulk_import_csv(
+                            str(path), record_type, batch_size=batch_size
+                        )
+                    elif import_mode == "stream":
+                        CrimeDataProcessor.stream_import_csv(
+                            str(path), record_type, batch_size=batch_size
+                        )
+                    else:
+                        ROW_IMPORTERS[record_type](str(path))
+                transaction.set_rollback(True)
+
+        return run, _count_rows(path for _, path in files)
+
+    def _static(self, root, processed_dir):
+        def run():
+            call_command(
+                "build_static_data",
+                output_dir=str(root / "static_data"),
+                processed_dir=str(processed_dir),
+                data_dir=str(root / "data"),
+                stdout=StringIO(),
+            )
+
+        return run, _count_rows(processed_dir.rglob("mapped_*.csv"))
+
+    def handle(self, *args, **options):
+        root = (Path(settings.BASE_DIR) / options["root"]).resolve()
+        processed_dir = root / "processed_data"
+        stages = [stage.strip() for stage in options["stages"].split(",") if stage]
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise CommandError(f"Unknown stages: {', '.join(sorted(unknown))}")
+        if not root.exists():
+            raise CommandError(f"Benchmark root not found: {root}")
+
+        dataset_path = root / "dataset.json"
+        results = {
+            "label": options["label"],
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "dataset": (
+                json.loads(dataset_path.read_text(encoding="utf-8"))
+                if dataset_path.exists()
+                else {}
+            ),
+            "options": {
+                "batch_mapping": options["batch_mapping"],
+                "import_mode": options["import_mode"],
+                "batch_size": options["batch_size"],
+            },
+            "stages": {},
+        }
+
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            if stage == "mapping":
+                run, rows = self._mapping(root, processed_dir, options["batch_mapping"])
+            elif stage == "import":
+                run, rows = self._import(
+                    processed_dir, options["import_mode"], options["batch_size"]
+                )
+            else:
+                run, rows = self._static(root, processed_dir)
+
+            stage_result = _measure(run, rows, options["trace_memory"])
+            results["stages"][stage] = stage_result
+            self.stdout.write(
+                f"{stage}: {stage_result['seconds']:.2f}s | {rows} rows | "
+                f"{stage_result['rows_per_second']:.0f} rows/s | "
+                f"process max RSS so far {stage_result['process_max_rss_mb']} MB"
+                + (
+                    f" | stage peak traced {stage_result['peak_traced_mb']} MB"
+                    if "peak_traced_mb" in stage_result
+                    else ""
+                )
+            )
+
+        if options["compare"]:
+            previous = json.loads(Path(options["compare"]).read_text(encoding="utf-8"))
+            self.stdout.write(f"Compared with {options['compare']}:")
+            for stage, current in results["stages"].items():
+                before = previous.get("stages", {}).get(stage)
+                if not before or not current["seconds"]:
+                    continue
+                self.stdout.write(
+                    f"  {stage}: {before['seconds']:.2f}s -> {current['seconds']:.2f}s "
+                    f"({before['seconds'] / current['seconds']:.2f}x)"
+                )
+
+        output_path = Path(options["output"] or root / "benchmark_results.json")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote benchmark results to {output_path}")
+        )
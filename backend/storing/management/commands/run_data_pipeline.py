@@ -1,12 +1,52 @@
 import csv
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.migrations.recorder import MigrationRecorder
 
-from map_coordinate.mapping import mapping_coordinate
-from storing.processing import CrimeDataProcessor, MetricDataProcessor
+from map_coordinate.mapping import (
+    geometry_cache_stats,
+    mapping_coordinates_batch,
+    run_mapping_jobs,
+)
+from storing.grid_registry import GridRegistry
+from storing.manifest import PipelineManifest
+from storing.processing import (
+    DEFAULT_BULK_BATCH_SIZE,
+    DEFAULT_STREAM_CHUNK_SIZE,
+    CrimeDataProcessor,
+    MetricDataProcessor,
+)
+from storing.models import PeriodCatalog
+
+# (record type, processed filename, label, per-row importer)
+PREDICTION_IMPORTS = [
+    (
+        "actual",
+        "mapped_actual.csv",
+        "Actual",
+        CrimeDataProcessor.import_actual_crime_csv,
+    ),
+    ("mlp", "mapped_mlp.csv", "MLP", CrimeDataProcessor.import_mlp_predictions_csv),
+    (
+        "baseline",
+        "mapped_lee.csv",
+        "Baseline",
+        CrimeDataProcessor.import_baseline_predictions_csv,
+    ),
+]
+
+MAPPED_OUTPUTS = {
+    "mlp": ["mapped_mlp.csv", "mapped_actual.csv"],
+    "lee": ["mapped_lee.csv"],
+}
 
 
 def _read_target_period(csv_path):
@@ -21,11 +61,31 @@ def _read_target_period(csv_path):
         return None
 
 
-def _mapped_outputs_exist(processed_dir, period, filenames):
+def _mapped_output_paths(processed_dir, period, model):
     if not period:
-        return False
+        return []
     period_dir = processed_dir / str(period)
-    return all((period_dir / filename).exists() for filename in filenames)
+    return [period_dir / filename for filename in MAPPED_OUTPUTS[model]]
+
+
+def _database_identity():
+    """
+    The database imports are written to: its connection settings plus when
+    the storing app was first migrated there, so a database recreated under
+    the same name counts as a different target.
+    """
+    db = connection.settings_dict
+    applied = (
+        MigrationRecorder(connection)
+        .migration_qs.filter(app="storing")
+        .order_by("applied")
+        .values_list("applied", flat=True)
+        .first()
+    )
+    return (
+        f"{connection.vendor}://{db.get('HOST') or ''}:{db.get('PORT') or ''}/"
+        f"{db['NAME']}@{applied.isoformat() if applied else ''}"
+    )
 
 
 def _relative_source_name(path, base_dir):
@@ -57,13 +117,93 @@ class Command(BaseCommand):
         parser.add_argument(
             "--force",
             action="store_true",
-            help="Re-run mapping even if processed outputs already exist",
+            help="Re-run every stage even if its inputs are unchanged",
+        )
+        parser.add_argument(
+            "--manifest",
+            default="processed_data/.pipeline_manifest.json",
+            help="Content-hash manifest used to skip unchanged stages "
+            "(default: processed_data/.pipeline_manifest.json)",
+        )
+        parser.add_argument(
+            "--build-static",
+            action="store_true",
+            help="Rebuild static_data JSON when processed data or metrics changed",
         )
         parser.add_argument(
             "--skip-mapping",
             action="store_true",
             help="Skip mapping step and only import processed data",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes for the mapping step (default: 1)",
+        )
+        parser.add_argument(
+            "--batch-mapping",
+            action="store_true",
+            help="Map every pending ranking file with one geometry join "
+            "in this process (ignores --workers)",
+        )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Import processed files with batched upserts instead of per-row writes",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BULK_BATCH_SIZE,
+            help=f"Rows per upsert statement in --bulk mode (default: {DEFAULT_BULK_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Import in committed chunks with resumable checkpoints",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_STREAM_CHUNK_SIZE,
+            help=f"Rows per transaction in --stream mode (default: {DEFAULT_STREAM_CHUNK_SIZE})",
+        )
+        parser.add_argument(
+            "--no-warm",
+            action="store_true",
+            help="Do not preload the response cache when data changed",
+        )
+
+    def _map_in_batch(self, job_lists, coordinate_path, processed_dir):
+        """
+        Run every job through mapping_coordinates_batch and reshape the errors
+        into the per-group results run_mapping_jobs would have returned.
+        """
+        flat_jobs = [job for jobs in job_lists for job in jobs]
+        stats_before = geometry_cache_stats()
+        errors = mapping_coordinates_batch(
+            [(model, model_path) for _, model_path, _, model in flat_jobs],
+            str(coordinate_path),
+            output_dir=str(processed_dir),
+        )
+        cache_stats = {
+            key: value - stats_before[key]
+            for key, value in geometry_cache_stats().items()
+        }
+
+        error_iter = iter(errors)
+        group_results = []
+        for jobs in job_lists:
+            results = []
+            for label, model_path, _, model in jobs:
+                error = next(error_iter)
+                if error:
+                    error = f"{label} {model_path}: {error}"
+                results.append((model, error, 0.0, cache_stats))
+                cache_stats = {}
+            group_results.append(results)
+        return group_results
 
     def handle(self, *args, **options):
         base_dir = Path(settings.BASE_DIR)
@@ -72,6 +212,14 @@ class Command(BaseCommand):
         coordinate_path = (base_dir / options["coordinate_path"]).resolve()
         force = options["force"]
         skip_mapping = options["skip_mapping"]
+        workers = max(1, options["workers"])
+        batch_mapping = options["batch_mapping"]
+        bulk = options["bulk"]
+        batch_size = options["batch_size"]
+        stream = options["stream"]
+        chunk_size = options["chunk_size"]
+        build_static = options["build_static"]
+        manifest = PipelineManifest(base_dir / options["manifest"])
 
         if not data_dir.exists():
             self.stderr.write(f"Data directory not found: {data_dir}")
@@ -90,6 +238,9 @@ class Command(BaseCommand):
             "baseline_skipped": 0,
             "mapping_errors": [],
         }
+        mapping_timing = {"wall_seconds": 0.0, "job_seconds": 0.0}
+        geometry_cache = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        pending_groups = []
 
         if not skip_mapping:
             mlp_results_dir = data_dir / "mlp" / "results"
@@ -98,91 +249,142 @@ class Command(BaseCommand):
             mlp_files = list(mlp_results_dir.rglob("grid_ranking.csv"))
             baseline_files = list(baseline_results_dir.rglob("grid_ranking.csv"))
 
-            for csv_path in sorted(mlp_files):
-                period = _read_target_period(csv_path)
-                outputs_exist = _mapped_outputs_exist(
-                    processed_dir, period, ["mapped_mlp.csv", "mapped_actual.csv"]
-                )
-                if outputs_exist and not force:
-                    mapping_summary["mlp_skipped"] += 1
-                    continue
-                try:
-                    mapping_coordinate(
-                        str(csv_path), str(coordinate_path), model="mlp"
+            # Jobs writing the same period/model output share a group and run
+            # in sorted order, so the final files do not depend on scheduling.
+            job_groups = {}
+            for model, label, csv_paths in (
+                ("mlp", "MLP", mlp_files),
+                ("lee", "Baseline", baseline_files),
+            ):
+                for csv_path in sorted(csv_paths):
+                    period = _read_target_period(csv_path)
+                    group = job_groups.setdefault(
+                        (model, period or str(csv_path)),
+                        {"model": model, "period": period, "jobs": []},
                     )
-                    mapping_summary["mlp_mapped"] += 1
-                except Exception as exc:
-                    mapping_summary["mapping_errors"].append(
-                        f"MLP {csv_path}: {exc}"
+                    group["jobs"].append(
+                        (label, str(csv_path), str(coordinate_path), model)
                     )
 
-            for csv_path in sorted(baseline_files):
-                period = _read_target_period(csv_path)
-                outputs_exist = _mapped_outputs_exist(
-                    processed_dir, period, ["mapped_lee.csv"]
+            for key, group in job_groups.items():
+                group["manifest_key"] = ":".join(key)
+                group["inputs"] = [job[1] for job in group["jobs"]]
+                group["inputs"].append(str(coordinate_path))
+                group["outputs"] = _mapped_output_paths(
+                    processed_dir, group["period"], group["model"]
                 )
-                if outputs_exist and not force:
-                    mapping_summary["baseline_skipped"] += 1
-                    continue
-                try:
-                    mapping_coordinate(
-                        str(csv_path), str(coordinate_path), model="lee"
+                if (
+                    not force
+                    and group["outputs"]
+                    and manifest.is_fresh(
+                        "mapping",
+                        group["manifest_key"],
+                        group["inputs"],
+                        group["outputs"],
                     )
-                    mapping_summary["baseline_mapped"] += 1
-                except Exception as exc:
-                    mapping_summary["mapping_errors"].append(
-                        f"Baseline {csv_path}: {exc}"
+                ):
+                    skipped_key = (
+                        "mlp_skipped" if group["model"] == "mlp" else "baseline_skipped"
+                    )
+                    mapping_summary[skipped_key] += len(group["jobs"])
+                    continue
+                pending_groups.append(group)
+
+            mapping_start = time.perf_counter()
+            job_lists = [group["jobs"] for group in pending_groups]
+            map_jobs = partial(run_mapping_jobs, output_dir=str(processed_dir))
+            if batch_mapping:
+                group_results = self._map_in_batch(
+                    job_lists, coordinate_path, processed_dir
+                )
+            elif workers > 1 and len(job_lists) > 1:
+                # Forked workers must not share the parent's DB connections
+                connections.close_all()
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    group_results = list(executor.map(map_jobs, job_lists))
+            else:
+                group_results = [map_jobs(jobs) for jobs in job_lists]
+            mapping_timing["wall_seconds"] = time.perf_counter() - mapping_start
+
+            for group, results in zip(pending_groups, group_results):
+                group_failed = False
+                for model, error, seconds, cache_stats in results:
+                    mapping_timing["job_seconds"] += seconds
+                    for key, value in cache_stats.items():
+                        geometry_cache[key] += value
+                    if error:
+                        group_failed = True
+                        mapping_summary["mapping_errors"].append(error)
+                    elif model == "mlp":
+                        mapping_summary["mlp_mapped"] += 1
+                    else:
+                        mapping_summary["baseline_mapped"] += 1
+                if not group_failed and group["outputs"]:
+                    manifest.record(
+                        "mapping",
+                        group["manifest_key"],
+                        group["inputs"],
+                        group["outputs"],
                     )
+            manifest.save()
 
         import_summary = {
             "actual": [],
             "mlp": [],
             "baseline": [],
             "metrics": [],
+            "imports_skipped": 0,
             "import_errors": [],
         }
+        # Loaded lazily, so a run where every file is unchanged never reads it
+        grid_registry = GridRegistry()
+        # Import entries only count for the database they were written to,
+        # and nothing is skipped while that database holds no data at all
+        database = _database_identity()
+        skip_unchanged = not force and PeriodCatalog.objects.exists()
 
-        for actual_path in sorted(processed_dir.rglob("mapped_actual.csv")):
-            try:
-                result = CrimeDataProcessor.import_actual_crime_csv(
-                    str(actual_path),
-                    source_name=_relative_source_name(actual_path, base_dir),
-                )
-                import_summary["actual"].append(
-                    {"file": str(actual_path), "result": result}
-                )
-            except Exception as exc:
-                import_summary["import_errors"].append(
-                    f"Actual {actual_path}: {exc}"
-                )
-
-        for mlp_path in sorted(processed_dir.rglob("mapped_mlp.csv")):
-            try:
-                result = CrimeDataProcessor.import_mlp_predictions_csv(
-                    str(mlp_path),
-                    source_name=_relative_source_name(mlp_path, base_dir),
-                )
-                import_summary["mlp"].append(
-                    {"file": str(mlp_path), "result": result}
-                )
-            except Exception as exc:
-                import_summary["import_errors"].append(
-                    f"MLP {mlp_path}: {exc}"
-                )
-
-        for baseline_path in sorted(processed_dir.rglob("mapped_lee.csv")):
-            try:
-                result = CrimeDataProcessor.import_baseline_predictions_csv(
-                    str(baseline_path),
-                    source_name=_relative_source_name(baseline_path, base_dir),
-                )
-                import_summary["baseline"].append(
-                    {"file": str(baseline_path), "result": result}
-                )
-            except Exception as exc:
-                import_summary["import_errors"].append(
-                    f"Baseline {baseline_path}: {exc}"
-                )
+        for record_type, filename, label, importer in PREDICTION_IMPORTS:
+            for csv_path in sorted(processed_dir.rglob(filename)):
+                source_name = _relative_source_name(csv_path, base_dir)
+                manifest_key = f"{record_type}:{source_name}"
+                if skip_unchanged and manifest.is_fresh(
+                    "import", manifest_key, [csv_path], target=database
+                ):
+                    import_summary["imports_skipped"] += 1
+                    continue
+                try:
+                    if stream:
+                        result = CrimeDataProcessor.stream_import_csv(
+                            str(csv_path),
+                            record_type,
+                            source_name=source_name,
+                            chunk_size=chunk_size,
+                            batch_size=batch_size,
+                            grid_registry=grid_registry,
+                            restart=force,
+                        )
+                    elif bulk:
+                        result = CrimeDataProcessor.bulk_import_csv(
+                            str(csv_path),
+                            record_type,
+                            source_name=source_name,
+                            batch_size=batch_size,
+                            grid_registry=grid_registry,
+                        )
+                    else:
+                        result = importer(
+                            str(csv_path),
+                            source_name=source_name,
+                            grid_registry=grid_registry,
+                        )
+                    import_summary[record_type].append(
+                        {"file": str(csv_path), "result": result}
+                    )
+                    manifest.record("import", manifest_key, [csv_path], target=database)
+                except Exception as exc:
+                    import_summary["import_errors"].append(
+                        f"{label} {csv_path}: {exc}"
+                    )
 
         metrics_files = []
         metrics_files.extend(
@@ -191,16 +393,60 @@ class Command(BaseCommand):
         metrics_files.extend((data_dir / "baseline").rglob("summary_table.csv"))
 
         for metric_path in sorted(metrics_files):
+            manifest_key = f"metrics:{_relative_source_name(metric_path, base_dir)}"
+            if skip_unchanged and manifest.is_fresh(
+                "import", manifest_key, [metric_path], target=database
+            ):
+                import_summary["imports_skipped"] += 1
+                continue
             try:
                 result = MetricDataProcessor.import_metrics_csv(str(metric_path))
                 import_summary["metrics"].append(
                     {"file": str(metric_path), "result": result}
                 )
+                manifest.record("import", manifest_key, [metric_path], target=database)
             except Exception as exc:
                 import_summary["import_errors"].append(
                     f"Metric {metric_path}: {exc}"
                 )
 
+        manifest.save()
+
+        static_status = None
+        if build_static:
+            static_dir = Path(settings.STATIC_DATA_DIR)
+            static_inputs = sorted(processed_dir.rglob("mapped_*.csv"))
+            static_inputs.extend(sorted(data_dir.glob("**/summary_table.csv")))
+            static_outputs = sorted(static_dir.glob("*.json"))
+            if (
+                not force
+                and static_outputs
+                and manifest.is_fresh(
+                    "static", "static_data", static_inputs, static_outputs
+                )
+            ):
+                static_status = "unchanged"
+            else:
+                try:
+                    call_command(
+                        "build_static_data",
+                        output_dir=str(static_dir),
+                        processed_dir=str(processed_dir),
+                        data_dir=str(data_dir),
+                        no_warm=True,
+                    )
+                    manifest.record(
+                        "static",
+                        "static_data",
+                        static_inputs,
+                        sorted(static_dir.glob("*.json")),
+                    )
+                    manifest.save()
+                    static_status = "rebuilt"
+                except Exception as exc:
+                    import_summary["import_errors"].append(f"Static data: {exc}")
+                    static_status = "failed"
+
         self.stdout.write("Mapping summary:")
         self.stdout.write(f"  MLP mapped: {mapping_summary['mlp_mapped']}")
         self.stdout.write(f"  Baseline mapped: {mapping_summary['baseline_mapped']}")
@@ -208,6 +454,28 @@ class Command(BaseCommand):
         self.stdout.write(
             f"  Baseline skipped: {mapping_summary['baseline_skipped']}"
         )
+        if pending_groups:
+            mode = "batch" if batch_mapping else f"{workers} worker(s)"
+            self.stdout.write(
+                f"  Mapping wall time ({mode}): "
+                f"{mapping_timing['wall_seconds']:.2f}s"
+            )
+            if not batch_mapping:
+                # Time spent inside the jobs, not a separate --workers 1 run
+                self.stdout.write(
+                    f"  Sum of job times: {mapping_timing['job_seconds']:.2f}s"
+                )
+            if not batch_mapping and workers > 1:
+                self.stdout.write(
+                    f"  Sum of job times / wall time: "
+                    f"{mapping_timing['job_seconds'] / mapping_timing['wall_seconds']:.1f}x"
+                    " (run with --workers 1 for a real serial baseline)"
+                )
+            self.stdout.write(
+                f"  Geometry cache: {geometry_cache['memory_hits']} memory hits, "
+                f"{geometry_cache['disk_hits']} disk hits, "
+                f"{geometry_cache['misses']} misses"
+            )
 
         if mapping_summary["mapping_errors"]:
             self.stdout.write("Mapping errors:")
@@ -219,6 +487,22 @@ class Command(BaseCommand):
         self.stdout.write(f"  MLP files: {len(import_summary['mlp'])}")
         self.stdout.write(f"  Baseline files: {len(import_summary['baseline'])}")
         self.stdout.write(f"  Metric files: {len(import_summary['metrics'])}")
+        self.stdout.write(
+            f"  Files skipped (unchanged): {import_summary['imports_skipped']}"
+        )
+        self.stdout.write(f"  Grid cache hits: {grid_registry.stats['hits']}")
+        self.stdout.write(f"  Grid cache misses: {grid_registry.stats['misses']}")
+        self.stdout.write(f"  Grids changed: {grid_registry.stats['changed']}")
+
+        if static_status:
+            self.stdout.write(f"Static data: {static_status}")
+
+        data_changed = static_status == "rebuilt" or any(
+            import_summary[key] for key in ("actual", "mlp", "baseline", "metrics")
+        )
+        if data_changed and not options["no_warm"]:
+            # Imports and build_static_data already moved the dataset version
+            call_command("warm_response_cache", stdout=self.stdout)
 
         if import_summary["import_errors"]:
             self.stdout.write("Import errors:")
@@ -0,0 +1,74 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from storing import views
+from storing.models import MetricData
+from storing.response_cache import bump_dataset_version, get_dataset_version
+from storing.static_cache import COMPRESSORS
+
+
+def _periods_from_response(response):
+    try:
+        payload = json.loads(response.content)
+    except (TypeError, ValueError):
+        return []
+    return payload.get("periods", []) if payload.get("success") else []
+
+
+class Command(BaseCommand):
+    help = (
+        "Preload the shared response cache with the available periods and every "
+        "period's top predictions and metrics for the current dataset version."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bump",
+            action="store_true",
+            help="Start a new dataset version before warming",
+        )
+
+    def handle(self, *args, **options):
+        if options["bump"]:
+            bump_dataset_version()
+
+        factory = RequestFactory()
+        response = views.get_available_periods(factory.get("/api/get_all_metrics/"))
+        periods = _periods_from_response(response)
+        if not periods:
+            periods = sorted(
+                set(MetricData.objects.values_list("target_period", flat=True))
+            )
+
+        requests = [("/api/get_all_metrics/", {}, views.get_available_periods)]
+        for period in periods:
+            requests.append(
+                ("/api/top-predictions/", {"period": period}, views.get_top_predictions)
+            )
+            requests.append(
+                (
+                    "/api/metrics-by-period/",
+                    {"period": period},
+                    views.get_metrics_by_period,
+                )
+            )
+
+        warmed = 0
+        failed = []
+        # Each negotiated response encoding is cached separately
+        for encoding in ["identity", *COMPRESSORS]:
+            for path, params, view in requests:
+                request = factory.get(path, params, HTTP_ACCEPT_ENCODING=encoding)
+                if view(request).status_code == 200:
+                    warmed += 1
+                else:
+                    failed.append(f"{path} {params} ({encoding})")
+
+        self.stdout.write(
+            f"Warmed {warmed} responses for {len(periods)} periods "
+            f"(dataset version {get_dataset_version()})"
+        )
+        for request_path in failed:
+            self.stderr.write(f"  Failed: {request_path}")
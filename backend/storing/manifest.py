@@ -0,0 +1,82 @@
+import json
+import os
+from pathlib import Path
+
+from .processing import file_sha256
+
+
+class PipelineManifest:
+    """
+    Content hashes of every pipeline input and output, persisted as JSON.
+
+    A stage entry is fresh when its inputs still hash to what was recorded
+    and its outputs were not changed or removed since the stage last ran.
+    File hashes are reused while size and mtime are unchanged, so checking
+    an untouched archive does not re-read it.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.data = {"version": self.VERSION, "files": {}, "stages": {}}
+        if self.path.exists():
+            try:
+                loaded = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+                loaded = None
+            if isinstance(loaded, dict) and loaded.get("version") == self.VERSION:
+                self.data = loaded
+
+    def file_hash(self, path):
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = str(path.resolve())
+        cached = self.data["files"].get(key)
+        if (
+            cached
+            and cached["size"] == stat.st_size
+            and cached["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return cached["sha256"]
+        digest = file_sha256(path)
+        self.data["files"][key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+        }
+        return digest
+
+    def _fingerprint(self, paths):
+        return {str(Path(path).resolve()): self.file_hash(path) for path in paths}
+
+    def is_fresh(self, stage, key, inputs, outputs=(), target=None):
+        """
+        target identifies where the stage wrote besides its output files
+        (e.g. the database an import went to); an entry recorded for another
+        target is stale.
+        """
+        entry = self.data["stages"].get(stage, {}).get(key)
+        if not entry:
+            return False
+        if entry.get("target") != target:
+            return False
+        if entry["inputs"] != self._fingerprint(inputs):
+            return False
+        return entry["outputs"] == self._fingerprint(outputs)
+
+    def record(self, stage, key, inputs, outputs=(), target=None):
+        self.data["stages"].setdefault(stage, {})[key] = {
+            "inputs": self._fingerprint(inputs),
+            "outputs": self._fingerprint(outputs),
+            "target": target,
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storing', '0003_actualcrime_actual_pred_target__992aaa_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_file', models.CharField(max_length=255, unique=True)),
+                ('file_hash', models.CharField(help_text='SHA-256 of the file', max_length=64)),
+                ('byte_offset', models.BigIntegerField(default=0)),
+                ('rows_done', models.IntegerField(default=0)),
+                ('completed', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Import Checkpoint',
+                'verbose_name_plural': 'Import Checkpoints',
+                'db_table': 'import_checkpoint',
+            },
+        ),
+    ]
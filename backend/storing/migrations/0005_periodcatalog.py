@@ -0,0 +1,72 @@
+# Generated by Django 6.0 on 2026-10-18 01:00
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def build_period_catalog(apps, schema_editor):
+    PeriodCatalog = apps.get_model("storing", "PeriodCatalog")
+    MetricData = apps.get_model("storing", "MetricData")
+    entries = {}
+    for field, model_name in (
+        ("actual_rows", "ActualCrime"),
+        ("mlp_rows", "MLPPrediction"),
+        ("baseline_rows", "BaselinePrediction"),
+    ):
+        model = apps.get_model("storing", model_name)
+        counts = (
+            model.objects.values_list("target_period")
+            .annotate(rows=Count("id"))
+            .order_by()
+        )
+        for period, rows in counts:
+            entries.setdefault(period, {})[field] = rows
+    for period, name in MetricData.objects.values_list("target_period", "model"):
+        entries.setdefault(period, {}).setdefault("available_models", []).append(name)
+
+    now = timezone.now()
+    PeriodCatalog.objects.bulk_create(
+        [
+            PeriodCatalog(
+                period=period,
+                available_models=sorted(set(entry.get("available_models", []))),
+                actual_rows=entry.get("actual_rows", 0),
+                mlp_rows=entry.get("mlp_rows", 0),
+                baseline_rows=entry.get("baseline_rows", 0),
+                metric_rows=len(entry.get("available_models", [])),
+                last_imported_at=now,
+            )
+            for period, entry in entries.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storing', '0004_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodCatalog',
+            fields=[
+                ('period', models.IntegerField(help_text='YearMonth format: YYYYMM', primary_key=True, serialize=False)),
+                ('available_models', models.JSONField(default=list, help_text='Model names with metrics for this period')),
+                ('actual_rows', models.IntegerField(default=0)),
+                ('mlp_rows', models.IntegerField(default=0)),
+                ('baseline_rows', models.IntegerField(default=0)),
+                ('metric_rows', models.IntegerField(default=0)),
+                ('last_imported_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Period Catalog Entry',
+                'verbose_name_plural': 'Period Catalog',
+                'db_table': 'period_catalog',
+                'ordering': ['period'],
+            },
+        ),
+        migrations.RunPython(build_period_catalog, migrations.RunPython.noop),
+    ]
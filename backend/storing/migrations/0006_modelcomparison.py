@@ -0,0 +1,95 @@
+# Generated by Django 6.0 on 2026-10-18 01:02
+
+from django.db import migrations, models
+
+
+def comparison_values(rows):
+    """
+    Frozen copy of storing.comparison.comparison_values as of this migration:
+    MLP vs baseline values for one period from (model name, pei, accuracy)
+    rows. The first row by name wins when several map to the same model.
+    """
+    values = {}
+    for model_name, pei_percent, accuracy in sorted(rows, key=lambda row: row[0]):
+        name = (model_name or "").lower()
+        if "mlp" in name:
+            prefix = "mlp"
+        elif "lee" in name:
+            prefix = "baseline"
+        else:
+            continue
+        values.setdefault(f"{prefix}_pei", pei_percent)
+        values.setdefault(f"{prefix}_accuracy", accuracy)
+
+    if values.get("mlp_pei") is None or values.get("baseline_pei") is None:
+        values.update(
+            pei_winner="",
+            pei_difference=None,
+            accuracy_winner="",
+            accuracy_difference=None,
+        )
+        return values
+
+    # Ties go to the baseline
+    values.update(
+        pei_winner="MLP" if values["mlp_pei"] > values["baseline_pei"] else "Baseline",
+        pei_difference=round(abs(values["mlp_pei"] - values["baseline_pei"]), 2),
+        accuracy_winner=(
+            "MLP"
+            if values["mlp_accuracy"] > values["baseline_accuracy"]
+            else "Baseline"
+        ),
+        accuracy_difference=round(
+            abs(values["mlp_accuracy"] - values["baseline_accuracy"]), 2
+        ),
+    )
+    return values
+
+
+def build_model_comparisons(apps, schema_editor):
+    MetricData = apps.get_model("storing", "MetricData")
+    ModelComparison = apps.get_model("storing", "ModelComparison")
+    rows_by_period = {}
+    for period, *row in MetricData.objects.values_list(
+        "target_period", "model", "pei_percent", "accuracy"
+    ):
+        rows_by_period.setdefault(period, []).append(row)
+    ModelComparison.objects.bulk_create(
+        [
+            ModelComparison(period=period, **comparison_values(rows))
+            for period, rows in rows_by_period.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storing', '0005_periodcatalog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelComparison',
+            fields=[
+                ('period', models.IntegerField(help_text='YearMonth format: YYYYMM', primary_key=True, serialize=False)),
+                ('mlp_pei', models.FloatField(blank=True, null=True)),
+                ('mlp_accuracy', models.FloatField(blank=True, null=True)),
+                ('baseline_pei', models.FloatField(blank=True, null=True)),
+                ('baseline_accuracy', models.FloatField(blank=True, null=True)),
+                ('pei_winner', models.CharField(blank=True, max_length=16)),
+                ('pei_difference', models.FloatField(blank=True, null=True)),
+                ('accuracy_winner', models.CharField(blank=True, max_length=16)),
+                ('accuracy_difference', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Model Comparison',
+                'verbose_name_plural': 'Model Comparisons',
+                'db_table': 'model_comparison',
+                'ordering': ['period'],
+            },
+        ),
+        migrations.RunPython(build_model_comparisons, migrations.RunPython.noop),
+    ]
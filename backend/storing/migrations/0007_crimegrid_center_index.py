@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storing', '0006_modelcomparison'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='crimegrid',
+            index=models.Index(fields=['center_latitude', 'center_longitude'], name='crime_grids_center__b1a4fb_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-18 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storing', '0007_crimegrid_center_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='actualcrime',
+            index=models.Index(fields=['grid', 'target_period', 'rank', 'actual_crime_count'], name='actual_pred_grid_id_2c71c5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='baselineprediction',
+            index=models.Index(fields=['grid', 'target_period', 'rank', 'baseline_predicted_count'], name='baseline_pr_grid_id_9dfe7e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mlpprediction',
+            index=models.Index(fields=['grid', 'target_period', 'rank', 'mlp_crime_count'], name='mlp_predict_grid_id_d96d20_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 01:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storing', '0008_grid_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Prediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Prediction source, e.g. actual, mlp or baseline', max_length=32)),
+                ('target_period', models.IntegerField(help_text='YearMonth format: YYYYMM')),
+                ('count', models.FloatField(help_text='Actual or predicted crime count')),
+                ('rank', models.IntegerField(blank=True, help_text='Rank of the grid for this model and period', null=True)),
+                ('source_file', models.CharField(blank=True, max_length=255)),
+                ('grid', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='predictions', to='storing.crimegrid')),
+            ],
+            options={
+                'verbose_name': 'Prediction',
+                'verbose_name_plural': 'Predictions',
+                'db_table': 'prediction',
+                'indexes': [models.Index(fields=['target_period', 'rank', 'model', 'grid', 'count'], name='prediction_target__062082_idx')],
+                'unique_together': {('model', 'grid', 'target_period')},
+            },
+        ),
+    ]
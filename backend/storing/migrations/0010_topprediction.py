@@ -0,0 +1,78 @@
+# Generated by Django 6.0 on 2026-10-18 01:12
+
+from django.db import migrations, models
+
+GRID_GEOMETRY_FIELDS = [
+    "center_longitude",
+    "center_latitude",
+    "southwest_lat",
+    "southwest_lng",
+    "northeast_lat",
+    "northeast_lng",
+]
+SOURCES = [
+    ("actual", "ActualCrime", "actual_crime_count"),
+    ("mlp", "MLPPrediction", "mlp_crime_count"),
+    ("baseline", "BaselinePrediction", "baseline_predicted_count"),
+]
+
+
+def build_top_predictions(apps, schema_editor):
+    TopPrediction = apps.get_model("storing", "TopPrediction")
+    rows = []
+    for model_name, source, count_field in SOURCES:
+        # TOP_PREDICTION_DEPTH when this migration was written
+        queryset = apps.get_model("storing", source).objects.filter(rank__lte=20)
+        for period, rank, grid_id, count, *geometry in queryset.values_list(
+            "target_period",
+            "rank",
+            "grid_id",
+            count_field,
+            *(f"grid__{field}" for field in GRID_GEOMETRY_FIELDS),
+        ).order_by():
+            rows.append(
+                TopPrediction(
+                    period=period,
+                    model=model_name,
+                    rank=rank,
+                    grid_id=grid_id,
+                    count=count,
+                    **dict(zip(GRID_GEOMETRY_FIELDS, geometry)),
+                )
+            )
+    TopPrediction.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storing', '0009_prediction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopPrediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.IntegerField(help_text='YearMonth format: YYYYMM')),
+                ('model', models.CharField(help_text='actual, mlp or baseline', max_length=32)),
+                ('rank', models.IntegerField()),
+                ('grid_id', models.IntegerField()),
+                ('count', models.FloatField(help_text='Actual or predicted crime count')),
+                ('center_longitude', models.FloatField()),
+                ('center_latitude', models.FloatField()),
+                ('southwest_lat', models.FloatField()),
+                ('southwest_lng', models.FloatField()),
+                ('northeast_lat', models.FloatField()),
+                ('northeast_lng', models.FloatField()),
+            ],
+            options={
+                'verbose_name': 'Top Prediction',
+                'verbose_name_plural': 'Top Predictions',
+                'db_table': 'top_prediction',
+                'indexes': [models.Index(fields=['period', 'rank', 'model'], name='top_predict_period_fd11fa_idx')],
+                'unique_together': {('period', 'model', 'grid_id')},
+            },
+        ),
+        migrations.RunPython(build_top_predictions, migrations.RunPython.noop),
+    ]
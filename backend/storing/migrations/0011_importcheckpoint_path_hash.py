@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-18 02:05
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_source_paths(apps, schema_editor):
+    ImportCheckpoint = apps.get_model("storing", "ImportCheckpoint")
+    for checkpoint in ImportCheckpoint.objects.all():
+        checkpoint.path_hash = hashlib.sha256(
+            checkpoint.source_file.encode("utf-8")
+        ).hexdigest()
+        checkpoint.save(update_fields=["path_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("storing", "0010_topprediction"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importcheckpoint",
+            name="path_hash",
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(hash_source_paths, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="importcheckpoint",
+            name="path_hash",
+            field=models.CharField(
+                help_text="SHA-256 of source_file", max_length=64, unique=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="importcheckpoint",
+            name="source_file",
+            field=models.TextField(help_text="Absolute path of the imported file"),
+        ),
+    ]
@@ -29,6 +29,10 @@ class CrimeGrid(models.Model):
         verbose_name = "Crime Grid"
         verbose_name_plural = "Crime Grids"
         ordering = ["grid_id"]
+        indexes = [
+            # Tile lookups filter on grid centers
+            models.Index(fields=["center_latitude", "center_longitude"]),
+        ]
 
     def __str__(self):
         return f"Grid {self.grid_id}"
@@ -71,6 +75,8 @@ class ActualCrime(models.Model):
         unique_together = [["grid", "target_period"]]  # One record per grid per period
         indexes = [
             models.Index(fields=["target_period", "rank"]),
+            # Covers grid history lookups without touching the table
+            models.Index(fields=["grid", "target_period", "rank", "actual_crime_count"]),
         ]
 
     def __str__(self):
@@ -113,6 +119,8 @@ class MLPPrediction(models.Model):
         unique_together = [["grid", "target_period"]]
         indexes = [
             models.Index(fields=["target_period", "rank"]),
+            # Covers grid history lookups without touching the table
+            models.Index(fields=["grid", "target_period", "rank", "mlp_crime_count"]),
         ]
 
     def __str__(self):
@@ -150,12 +158,82 @@ class BaselinePrediction(models.Model):
         unique_together = [["grid", "target_period"]]  # Can have multiple methods
         indexes = [
             models.Index(fields=["target_period", "rank"]),
+            # Covers grid history lookups without touching the table
+            models.Index(fields=["grid", "target_period", "rank", "baseline_predicted_count"]),
         ]
 
     def __str__(self):
         return f"Grid {self.grid.grid_id} - {self.target_period}: {self.actual_crime_count} crimes"
 
 
+class Prediction(models.Model):
+    """
+    Long-format copy of the actual, MLP and baseline tables with the model
+    as a column. Optional: only filled when UNIFIED_PREDICTION_STORE is on
+    or by the rebuild_prediction_store command.
+    """
+
+    model = models.CharField(
+        max_length=32, help_text="Prediction source, e.g. actual, mlp or baseline"
+    )
+    grid = models.ForeignKey(
+        CrimeGrid, on_delete=models.CASCADE, related_name="predictions"
+    )
+    target_period = models.IntegerField(help_text="YearMonth format: YYYYMM")
+    count = models.FloatField(help_text="Actual or predicted crime count")
+    rank = models.IntegerField(
+        null=True, blank=True, help_text="Rank of the grid for this model and period"
+    )
+    source_file = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        db_table = "prediction"
+        verbose_name = "Prediction"
+        verbose_name_plural = "Predictions"
+        unique_together = [["model", "grid", "target_period"]]
+        indexes = [
+            # One range scan covers the top ranks of every model in a period
+            models.Index(fields=["target_period", "rank", "model", "grid", "count"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model} - Grid {self.grid_id} - {self.target_period}: {self.count}"
+
+
+class TopPrediction(models.Model):
+    """
+    Read model for top-predictions: the best ranked rows of each model and
+    period with the grid geometry copied in, so serving needs no join.
+    Refreshed by the importers from the normalized tables.
+    """
+
+    period = models.IntegerField(help_text="YearMonth format: YYYYMM")
+    model = models.CharField(max_length=32, help_text="actual, mlp or baseline")
+    rank = models.IntegerField()
+    grid_id = models.IntegerField()
+    count = models.FloatField(help_text="Actual or predicted crime count")
+
+    # Copied from CrimeGrid
+    center_longitude = models.FloatField()
+    center_latitude = models.FloatField()
+    southwest_lat = models.FloatField()
+    southwest_lng = models.FloatField()
+    northeast_lat = models.FloatField()
+    northeast_lng = models.FloatField()
+
+    class Meta:
+        db_table = "top_prediction"
+        verbose_name = "Top Prediction"
+        verbose_name_plural = "Top Predictions"
+        unique_together = [["period", "model", "grid_id"]]
+        indexes = [
+            models.Index(fields=["period", "rank", "model"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model} - {self.period} #{self.rank}: Grid {self.grid_id}"
+
+
 class MetricData(models.Model):
     model = models.CharField(max_length=255, blank=True)
     target_period = models.IntegerField(help_text="YearMonth format: YYYYMM")
@@ -170,3 +248,82 @@ class MetricData(models.Model):
 
     def __str__(self):
         return f"{self.model} - {self.pei_percent} - {self.accuracy} - {self.target_period}"
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Progress of a streaming import, committed together with each chunk
+    so an interrupted run can resume from the last committed row
+    """
+
+    source_file = models.TextField(help_text="Absolute path of the imported file")
+    path_hash = models.CharField(
+        max_length=64, unique=True, help_text="SHA-256 of source_file"
+    )
+    file_hash = models.CharField(max_length=64, help_text="SHA-256 of the file")
+    byte_offset = models.BigIntegerField(default=0)
+    rows_done = models.IntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "import_checkpoint"
+        verbose_name = "Import Checkpoint"
+        verbose_name_plural = "Import Checkpoints"
+
+    def __str__(self):
+        return f"{self.source_file} - row {self.rows_done}"
+
+
+class PeriodCatalog(models.Model):
+    """
+    One row per target period with the models and row counts available for it.
+    Kept up to date by the importers so listing periods is a single read.
+    """
+
+    period = models.IntegerField(primary_key=True, help_text="YearMonth format: YYYYMM")
+    available_models = models.JSONField(
+        default=list, help_text="Model names with metrics for this period"
+    )
+    actual_rows = models.IntegerField(default=0)
+    mlp_rows = models.IntegerField(default=0)
+    baseline_rows = models.IntegerField(default=0)
+    metric_rows = models.IntegerField(default=0)
+    last_imported_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "period_catalog"
+        verbose_name = "Period Catalog Entry"
+        verbose_name_plural = "Period Catalog"
+        ordering = ["period"]
+
+    def __str__(self):
+        return f"{self.period} - {', '.join(self.available_models)}"
+
+
+class ModelComparison(models.Model):
+    """
+    MLP vs baseline metrics for one period, computed when metrics are imported
+    (see storing.comparison). Model values are null when that model has no
+    metrics for the period; winners and differences need both.
+    """
+
+    period = models.IntegerField(primary_key=True, help_text="YearMonth format: YYYYMM")
+    mlp_pei = models.FloatField(null=True, blank=True)
+    mlp_accuracy = models.FloatField(null=True, blank=True)
+    baseline_pei = models.FloatField(null=True, blank=True)
+    baseline_accuracy = models.FloatField(null=True, blank=True)
+    pei_winner = models.CharField(max_length=16, blank=True)
+    pei_difference = models.FloatField(null=True, blank=True)
+    accuracy_winner = models.CharField(max_length=16, blank=True)
+    accuracy_difference = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "model_comparison"
+        verbose_name = "Model Comparison"
+        verbose_name_plural = "Model Comparisons"
+        ordering = ["period"]
+
+    def __str__(self):
+        return f"{self.period} - PEI: {self.pei_winner or 'n/a'}"
@@ -0,0 +1,204 @@
+from collections import defaultdict
+
+from .export import PREDICTION_VALUES
+from .models import Prediction, TopPrediction
+from .processing import (
+    PREDICTION_IMPORT_SPECS,
+    TOP_PREDICTION_DEPTH,
+    UnifiedPredictionProcessor,
+)
+
+GRID_VALUE_FIELDS = [
+    "grid_id",
+    "center_longitude",
+    "center_latitude",
+    "southwest_lat",
+    "southwest_lng",
+    "northeast_lat",
+    "northeast_lng",
+]
+PREDICTION_LOOKUPS = [
+    "grid_id",
+    *(f"grid__{field}" for field in GRID_VALUE_FIELDS[1:]),
+    "target_period",
+    "model",
+    "count",
+    "rank",
+]
+
+
+def _count_field(model):
+    spec = PREDICTION_IMPORT_SPECS.get(model)
+    return spec["count_field"] if spec else "predicted_count"
+
+
+def _group_rows(rows, limit):
+    """
+    Group (grid values..., period, model, count, rank) tuples by period,
+    keeping the first limit rows of each model.
+    """
+    grouped = defaultdict(dict)
+    for *grid_values, period, model, count, rank in rows:
+        model_rows = grouped[period].setdefault(model, [])
+        if len(model_rows) >= limit:
+            continue  # Ties at the limit rank
+        # Actual and MLP counts are stored as integers in their own tables
+        if model in ("actual", "mlp"):
+            count = int(count)
+        row = dict(zip(GRID_VALUE_FIELDS, grid_values))
+        row["target_period"] = period
+        row[_count_field(model)] = count
+        row["rank"] = rank
+        model_rows.append(row)
+    return grouped
+
+
+def unified_ranked_queryset(periods, limit):
+    """
+    Prediction rows ranked 1..limit of every model in periods, a range read
+    on the (target_period, rank, ...) covering index.
+    """
+    return (
+        Prediction.objects.filter(target_period__in=periods, rank__lte=limit)
+        .order_by("target_period", "model", "rank")
+        .values_list(*PREDICTION_LOOKUPS)
+    )
+
+
+def unified_unranked_queryset(period, model, limit):
+    """At most limit unranked Prediction rows of one model in one period"""
+    return (
+        Prediction.objects.filter(target_period=period, model=model, rank=None)
+        .order_by("grid_id")
+        .values_list(*PREDICTION_LOOKUPS)[:limit]
+    )
+
+
+def table_ranked_queryset(model, periods, limit):
+    """
+    Rows ranked 1..limit of periods in model's own table, as tuples in
+    PREDICTION_VALUES[model].fields order
+    """
+    return (
+        PREDICTION_IMPORT_SPECS[model]["model"]
+        .objects.filter(target_period__in=periods, rank__lte=limit)
+        .order_by("target_period", "rank")
+        .values_list(*PREDICTION_VALUES[model].lookups)
+    )
+
+
+def table_unranked_queryset(model, period, limit):
+    """At most limit unranked rows of one period in model's own table"""
+    return (
+        PREDICTION_IMPORT_SPECS[model]["model"]
+        .objects.filter(target_period=period, rank=None)
+        .order_by("pk")
+        .values_list(*PREDICTION_VALUES[model].lookups)[:limit]
+    )
+
+
+def read_model_queryset(periods, limit):
+    """TopPrediction rows ranked 1..limit of periods, with no grid join"""
+    return (
+        TopPrediction.objects.filter(period__in=periods, rank__lte=limit)
+        .order_by("period", "model", "rank")
+        .values_list(*GRID_VALUE_FIELDS, "period", "model", "count", "rank")
+    )
+
+
+def _shortfalls(grouped, periods, models, limit):
+    """(period, model, missing rows) of every model with fewer than limit rows"""
+    for period in periods:
+        for model in models:
+            missing = limit - len(grouped.get(period, {}).get(model, []))
+            if missing > 0:
+                yield period, model, missing
+
+
+def top_predictions(periods, limit, models=None):
+    """
+    Rows ranked 1..limit of each model in models (all of them by default)
+    for each period from the unified Prediction table. Returns {period: {model: [row, ...]}} with rows shaped
+    like the per-table serializers (actual_crime_count, mlp_crime_count,
+    baseline_predicted_count; predicted_count otherwise).
+
+    Ranked rows come from one range read. Only a model left with fewer than
+    limit rows in a period is topped up with unranked rows, one bounded query
+    each, so fully ranked periods cost a single query.
+    """
+    grouped = _group_rows(unified_ranked_queryset(periods, limit), limit)
+    for period, model, missing in list(
+        _shortfalls(grouped, periods, models or PREDICTION_VALUES, limit)
+    ):
+        unranked = _group_rows(unified_unranked_queryset(period, model, missing), limit)
+        if unranked:
+            grouped[period].setdefault(model, []).extend(unranked[period][model])
+    return grouped
+
+
+def table_top_predictions(periods, limit, models=None):
+    """
+    Same result as top_predictions, read from the actual, MLP and baseline
+    tables with one range read per model plus the same bounded top-ups.
+    """
+    models = models or list(PREDICTION_VALUES)
+    grouped = defaultdict(dict)
+    for model in models:
+        fields = PREDICTION_VALUES[model].fields
+        for values in table_ranked_queryset(model, periods, limit):
+            row = dict(zip(fields, values))
+            model_rows = grouped[row["target_period"]].setdefault(model, [])
+            if len(model_rows) < limit:
+                model_rows.append(row)
+    for period, model, missing in list(_shortfalls(grouped, periods, models, limit)):
+        fields = PREDICTION_VALUES[model].fields
+        rows = [
+            dict(zip(fields, values))
+            for values in table_unranked_queryset(model, period, missing)
+        ]
+        if rows:
+            grouped[period].setdefault(model, []).extend(rows)
+    return grouped
+
+
+def denormalized_top_predictions(periods, limit):
+    """
+    Same result as top_predictions, read from the TopPrediction read model
+    with one range scan and no grid join. limit must not exceed
+    TOP_PREDICTION_DEPTH.
+    """
+    return _group_rows(read_model_queryset(periods, limit), limit)
+
+
+def ranked_top_predictions(periods, limit):
+    """
+    Top predictions of every model for each period, {period: {model: rows}}.
+    Served from the TopPrediction read model when limit fits its depth. A
+    model with no read model rows in a period (its ranks are all NULL, or the
+    read model was not rebuilt) is read from the unified table when
+    UNIFIED_PREDICTION_STORE is on, else from its own table.
+    """
+    grouped = defaultdict(dict)
+    if limit <= TOP_PREDICTION_DEPTH:
+        grouped.update(denormalized_top_predictions(periods, limit))
+
+    missing = defaultdict(list)
+    for period in periods:
+        for model in PREDICTION_VALUES:
+            if model not in grouped[period]:
+                missing[model].append(period)
+    if not missing:
+        return grouped
+
+    fallback_periods = sorted(
+        {period for values in missing.values() for period in values}
+    )
+    if UnifiedPredictionProcessor.enabled():
+        fallback = top_predictions(fallback_periods, limit, list(missing))
+    else:
+        fallback = table_top_predictions(fallback_periods, limit, list(missing))
+    for model, model_periods in missing.items():
+        for period in model_periods:
+            if model in fallback.get(period, {}):
+                grouped[period][model] = fallback[period][model]
+    return grouped
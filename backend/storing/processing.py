@@ -1,8 +1,12 @@
 # processing.py
 import csv
+import hashlib
 import os
 from datetime import datetime
-from django.db import transaction
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist
 from .models import (
     CrimeGrid,
@@ -10,7 +14,103 @@ from .models import (
     MLPPrediction,
     BaselinePrediction,
     MetricData,
+    ImportCheckpoint,
+    PeriodCatalog,
+    ModelComparison,
+    Prediction,
+    TopPrediction,
 )
+from .comparison import COMPARISON_FIELDS, comparison_values
+from .response_cache import bump_dataset_version
+
+DEFAULT_BULK_BATCH_SIZE = 1000
+DEFAULT_STREAM_CHUNK_SIZE = 5000
+# Ranks per model and period kept in TopPrediction
+TOP_PREDICTION_DEPTH = 20
+
+GRID_GEOMETRY_FIELDS = [
+    "center_longitude",
+    "center_latitude",
+    "southwest_lat",
+    "southwest_lng",
+    "northeast_lat",
+    "northeast_lng",
+]
+
+# How each mapped_*.csv maps onto its prediction table
+PREDICTION_IMPORT_SPECS = {
+    "actual": {
+        "model": ActualCrime,
+        "count_field": "actual_crime_count",
+        "csv_column": "Actual_Crime_Count",
+    },
+    "mlp": {
+        "model": MLPPrediction,
+        "count_field": "mlp_crime_count",
+        "csv_column": "Predicted_Crime_Count",
+    },
+    "baseline": {
+        "model": BaselinePrediction,
+        "count_field": "baseline_predicted_count",
+        "csv_column": "Crime_T1",
+    },
+}
+
+
+def _chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def file_sha256(file_path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def checkpoint_key(path):
+    """Fixed-length ImportCheckpoint key for an absolute file path"""
+    return hashlib.sha256(path.encode("utf-8")).hexdigest()
+
+
+def _iter_csv_from_offset(file, byte_offset):
+    """
+    Yield (row dict, end byte offset) from a binary CSV file, starting at
+    byte_offset (0 means right after the header). csv.reader pulls one line
+    at a time, so the offset after each row is where the next row starts.
+    """
+    header = next(csv.reader([file.readline().decode("utf-8-sig")]))
+    if byte_offset:
+        file.seek(byte_offset)
+    position = file.tell()
+
+    def lines():
+        nonlocal position
+        for raw in iter(file.readline, b""):
+            position += len(raw)
+            yield raw.decode("utf-8")
+
+    for values in csv.reader(lines()):
+        if values:
+            yield dict(zip(header, values)), position
+
+
+def _bulk_upsert(model, objects, unique_fields, update_fields, batch_size):
+    """
+    INSERT ... ON DUPLICATE KEY UPDATE on MySQL (ON CONFLICT elsewhere).
+    MySQL resolves the conflict target itself and rejects unique_fields.
+    """
+    if not connection.features.supports_update_conflicts_with_target:
+        unique_fields = None
+    model.objects.bulk_create(
+        objects,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
 
 
 class CrimeDataProcessor:
@@ -37,9 +137,36 @@ class CrimeDataProcessor:
         )
         return grid, created
 
+    @staticmethod
+    def resolve_grid(grid_data, grid_registry=None):
+        """
+        Return (grid_id, created) for a CSV row. With a GridRegistry the grid
+        was already written by sync_registry_grids, so nothing is queried.
+        """
+        if grid_registry is not None:
+            return int(grid_data["grid_id"]), False
+        grid, created = CrimeDataProcessor.get_or_create_grid(grid_data)
+        return grid.grid_id, created
+
+    @staticmethod
+    def sync_registry_grids(rows, grid_registry):
+        """
+        Write the grids of raw CSV rows through grid_registry in one batched
+        upsert. Returns the number of grids created. Unparseable rows are
+        skipped here and reported by the per-row loop.
+        """
+        grids = {}
+        for row in rows:
+            try:
+                grid = CrimeDataProcessor.parse_grid_row(row)
+            except (ValueError, KeyError):
+                continue
+            grids[grid["grid_id"]] = grid
+        return grid_registry.sync(grids.values())
+
     @staticmethod
     @transaction.atomic
-    def import_actual_crime_csv(file_path, source_name=""):
+    def import_actual_crime_csv(file_path, source_name="", grid_registry=None):
         """
         Import actual crime CSV with structure:
         Rank,grid_id,Actual_Crime_Count,Target_Period,center_longitude,center_latitude,...
@@ -51,12 +178,20 @@ class CrimeDataProcessor:
             "records_updated": 0,
             "errors": [],
         }
+        touched_periods = set()
+        touched_records = {}
 
         try:
             with open(file_path, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
+                rows = csv.DictReader(file)
+                if grid_registry is not None:
+                    # Writing the grids up front needs every row in memory
+                    rows = list(rows)
+                    log_data["grids_created"] += CrimeDataProcessor.sync_registry_grids(
+                        rows, grid_registry
+                    )
 
-                for row_num, row in enumerate(reader, 1):
+                for row_num, row in enumerate(rows, 1):
                     try:
                         # Parse target period
                         target_period = CrimeDataProcessor.parse_target_period(
@@ -64,13 +199,15 @@ class CrimeDataProcessor:
                         )
 
                         # Get or create grid
-                        grid, grid_created = CrimeDataProcessor.get_or_create_grid(row)
+                        grid_id, grid_created = CrimeDataProcessor.resolve_grid(
+                            row, grid_registry
+                        )
                         if grid_created:
                             log_data["grids_created"] += 1
 
                         # Create or update actual crime record
                         actual_crime, created = ActualCrime.objects.update_or_create(
-                            grid=grid,
+                            grid_id=grid_id,
                             target_period=target_period,
                             defaults={
                                 "actual_crime_count": int(row["Actual_Crime_Count"]),
@@ -80,6 +217,8 @@ class CrimeDataProcessor:
                             },
                         )
 
+                        touched_periods.add(target_period)
+                        touched_records[(grid_id, target_period)] = actual_crime
                         if created:
                             log_data["records_created"] += 1
                         else:
@@ -91,6 +230,13 @@ class CrimeDataProcessor:
 
                     log_data["total_rows"] = row_num
 
+            if UnifiedPredictionProcessor.enabled():
+                UnifiedPredictionProcessor.upsert_instances(
+                    "actual", touched_records.values()
+                )
+            TopPredictionProcessor.refresh(touched_periods, ["actual"])
+            PeriodCatalogProcessor.refresh(touched_periods)
+            transaction.on_commit(bump_dataset_version)
             return log_data
 
         except Exception as e:
@@ -98,7 +244,7 @@ class CrimeDataProcessor:
             raise
 
     @staticmethod
-    def import_mlp_predictions_csv(file_path, source_name=""):
+    def import_mlp_predictions_csv(file_path, source_name="", grid_registry=None):
         """
         Import MLP predictions CSV
         Expected columns: grid_id,target_period,predicted_count,confidence_score
@@ -110,12 +256,20 @@ class CrimeDataProcessor:
             "records_updated": 0,
             "errors": [],
         }
+        touched_periods = set()
+        touched_records = {}
 
         try:
             with open(file_path, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
+                rows = csv.DictReader(file)
+                if grid_registry is not None:
+                    # Writing the grids up front needs every row in memory
+                    rows = list(rows)
+                    log_data["grids_created"] += CrimeDataProcessor.sync_registry_grids(
+                        rows, grid_registry
+                    )
 
-                for row_num, row in enumerate(reader, 1):
+                for row_num, row in enumerate(rows, 1):
                     try:
                         # Parse target period
                         target_period = CrimeDataProcessor.parse_target_period(
@@ -123,13 +277,15 @@ class CrimeDataProcessor:
                         )
 
                         # Get or create grid
-                        grid, grid_created = CrimeDataProcessor.get_or_create_grid(row)
+                        grid_id, grid_created = CrimeDataProcessor.resolve_grid(
+                            row, grid_registry
+                        )
                         if grid_created:
                             log_data["grids_created"] += 1
 
                         # Create or update actual crime record
                         mlp_crime, created = MLPPrediction.objects.update_or_create(
-                            grid=grid,
+                            grid_id=grid_id,
                             target_period=target_period,
                             defaults={
                                 "mlp_crime_count": int(row["Predicted_Crime_Count"]),
@@ -139,6 +295,8 @@ class CrimeDataProcessor:
                             },
                         )
 
+                        touched_periods.add(target_period)
+                        touched_records[(grid_id, target_period)] = mlp_crime
                         if created:
                             log_data["records_created"] += 1
                         else:
@@ -150,6 +308,13 @@ class CrimeDataProcessor:
 
                     log_data["total_rows"] = row_num
 
+            if UnifiedPredictionProcessor.enabled():
+                UnifiedPredictionProcessor.upsert_instances(
+                    "mlp", touched_records.values()
+                )
+            TopPredictionProcessor.refresh(touched_periods, ["mlp"])
+            PeriodCatalogProcessor.refresh(touched_periods)
+            transaction.on_commit(bump_dataset_version)
             return log_data
 
         except Exception as e:
@@ -157,7 +322,7 @@ class CrimeDataProcessor:
             raise
 
     @staticmethod
-    def import_baseline_predictions_csv(file_path, source_name=""):
+    def import_baseline_predictions_csv(file_path, source_name="", grid_registry=None):
         """
         Import baseline predictions CSV
         Expected columns: grid_id,target_period,baseline_predicted_count
@@ -170,12 +335,20 @@ class CrimeDataProcessor:
             "records_updated": 0,
             "errors": [],
         }
+        touched_periods = set()
+        touched_records = {}
 
         try:
             with open(file_path, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
+                rows = csv.DictReader(file)
+                if grid_registry is not None:
+                    # Writing the grids up front needs every row in memory
+                    rows = list(rows)
+                    log_data["grids_created"] += CrimeDataProcessor.sync_registry_grids(
+                        rows, grid_registry
+                    )
 
-                for row_num, row in enumerate(reader, 1):
+                for row_num, row in enumerate(rows, 1):
                     try:
                         # Parse target period
                         target_period = CrimeDataProcessor.parse_target_period(
@@ -183,14 +356,16 @@ class CrimeDataProcessor:
                         )
 
                         # Get or create grid
-                        grid, grid_created = CrimeDataProcessor.get_or_create_grid(row)
+                        grid_id, grid_created = CrimeDataProcessor.resolve_grid(
+                            row, grid_registry
+                        )
                         if grid_created:
                             log_data["grids_created"] += 1
 
                         # Create or update actual crime record
                         baseline_crime, created = (
                             BaselinePrediction.objects.update_or_create(
-                                grid=grid,
+                                grid_id=grid_id,
                                 target_period=target_period,
                                 defaults={
                                     "baseline_predicted_count": int(row["Crime_T1"]),
@@ -203,6 +378,8 @@ class CrimeDataProcessor:
                             )
                         )
 
+                        touched_periods.add(target_period)
+                        touched_records[(grid_id, target_period)] = baseline_crime
                         if created:
                             log_data["records_created"] += 1
                         else:
@@ -214,6 +391,288 @@ class CrimeDataProcessor:
 
                     log_data["total_rows"] = row_num
 
+            if UnifiedPredictionProcessor.enabled():
+                UnifiedPredictionProcessor.upsert_instances(
+                    "baseline", touched_records.values()
+                )
+            TopPredictionProcessor.refresh(touched_periods, ["baseline"])
+            PeriodCatalogProcessor.refresh(touched_periods)
+            transaction.on_commit(bump_dataset_version)
+            return log_data
+
+        except Exception as e:
+            log_data["errors"].append(f"File error: {str(e)}")
+            raise
+
+    @staticmethod
+    def parse_grid_row(row):
+        """Extract grid id and geometry from a mapped CSV row"""
+        grid = {"grid_id": int(row["grid_id"])}
+        for field in GRID_GEOMETRY_FIELDS:
+            grid[field] = float(row[field])
+        return grid
+
+    @staticmethod
+    def parse_prediction_row(row, record_type, source_file):
+        """Split a mapped CSV row into (grid dict, prediction record dict)"""
+        spec = PREDICTION_IMPORT_SPECS[record_type]
+        grid = CrimeDataProcessor.parse_grid_row(row)
+        record = {
+            "grid_id": grid["grid_id"],
+            "target_period": CrimeDataProcessor.parse_target_period(
+                row["Target_Period"]
+            ),
+            spec["count_field"]: int(row[spec["csv_column"]]),
+            "rank": int(row["Rank"]) if row.get("Rank") else None,
+            "source_file": source_file,
+        }
+        return grid, record
+
+    @staticmethod
+    def write_batch(record_type, grids, records, batch_size, grid_registry=None):
+        """
+        Upsert parsed grids and records (dicts keyed by grid / record key).
+        Returns (grids_created, records_created, records_updated).
+        """
+        if grid_registry is not None:
+            grids_created = grid_registry.sync(grids.values(), batch_size)
+        else:
+            grids_created = CrimeDataProcessor.bulk_upsert_grids(
+                grids.values(), batch_size
+            )
+        created, updated = CrimeDataProcessor.bulk_upsert_records(
+            record_type, records.values(), batch_size
+        )
+        if UnifiedPredictionProcessor.enabled():
+            UnifiedPredictionProcessor.upsert_records(
+                record_type, records.values(), batch_size
+            )
+        TopPredictionProcessor.sync_geometry(grids.values())
+        TopPredictionProcessor.refresh(
+            {key[1] for key in records}, [record_type], batch_size
+        )
+        return grids_created, created, updated
+
+    @staticmethod
+    def bulk_upsert_grids(grids, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """Upsert grid dicts in batches, returns the number of new grids"""
+        grids = list(grids)
+        created = 0
+        for batch in _chunked(grids, batch_size):
+            batch_ids = [grid["grid_id"] for grid in batch]
+            existing = set(
+                CrimeGrid.objects.filter(grid_id__in=batch_ids).values_list(
+                    "grid_id", flat=True
+                )
+            )
+            created += len(set(batch_ids) - existing)
+            _bulk_upsert(
+                CrimeGrid,
+                [CrimeGrid(**grid) for grid in batch],
+                unique_fields=["grid_id"],
+                update_fields=GRID_GEOMETRY_FIELDS + ["updated_at"],
+                batch_size=batch_size,
+            )
+        return created
+
+    @staticmethod
+    def bulk_upsert_records(record_type, records, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """
+        Upsert prediction dicts (grid_id, target_period, count, rank, source_file)
+        in batches. Returns (created, updated).
+        """
+        spec = PREDICTION_IMPORT_SPECS[record_type]
+        model = spec["model"]
+        records = list(records)
+        created = 0
+        for batch in _chunked(records, batch_size):
+            keys = {(record["grid_id"], record["target_period"]) for record in batch}
+            existing = set(
+                model.objects.filter(
+                    grid_id__in={grid_id for grid_id, _ in keys},
+                    target_period__in={period for _, period in keys},
+                ).values_list("grid_id", "target_period")
+            )
+            created += len(keys - existing)
+            _bulk_upsert(
+                model,
+                [model(**record) for record in batch],
+                unique_fields=["grid", "target_period"],
+                update_fields=[spec["count_field"], "rank", "source_file"],
+                batch_size=batch_size,
+            )
+        return created, len(records) - created
+
+    @staticmethod
+    def bulk_import_csv(
+        file_path,
+        record_type,
+        source_name="",
+        batch_size=DEFAULT_BULK_BATCH_SIZE,
+        grid_registry=None,
+    ):
+        """
+        Set-based alternative to the import_*_csv methods.
+        record_type is one of "actual", "mlp" or "baseline". The whole file is
+        parsed first, then grids and records are written in batched upserts of
+        batch_size rows. Returns the same log_data counters.
+        With a GridRegistry only new or changed grids are written.
+        """
+        log_data = {
+            "total_rows": 0,
+            "grids_created": 0,
+            "records_created": 0,
+            "records_updated": 0,
+            "errors": [],
+        }
+        source_file = source_name or os.path.basename(file_path)
+        grids = {}
+        records = {}
+        valid_rows = 0
+
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                reader = csv.DictReader(file)
+
+                for row_num, row in enumerate(reader, 1):
+                    try:
+                        grid, record = CrimeDataProcessor.parse_prediction_row(
+                            row, record_type, source_file
+                        )
+                    except (ValueError, KeyError) as e:
+                        log_data["errors"].append(f"Row {row_num}: {str(e)}")
+                        continue
+
+                    grids[grid["grid_id"]] = grid
+                    records[(grid["grid_id"], record["target_period"])] = record
+                    valid_rows += 1
+                    log_data["total_rows"] = row_num
+
+            with transaction.atomic():
+                grids_created, created, updated = CrimeDataProcessor.write_batch(
+                    record_type, grids, records, batch_size, grid_registry
+                )
+                PeriodCatalogProcessor.refresh({key[1] for key in records})
+
+            log_data["grids_created"] = grids_created
+
+            # Repeated keys in one file count as updates, like the per-row path
+            log_data["records_created"] = created
+            log_data["records_updated"] = updated + valid_rows - len(records)
+            transaction.on_commit(bump_dataset_version)
+            return log_data
+
+        except Exception as e:
+            log_data["errors"].append(f"File error: {str(e)}")
+            raise
+
+    @staticmethod
+    def stream_import_csv(
+        file_path,
+        record_type,
+        source_name="",
+        chunk_size=DEFAULT_STREAM_CHUNK_SIZE,
+        batch_size=DEFAULT_BULK_BATCH_SIZE,
+        grid_registry=None,
+        restart=False,
+    ):
+        """
+        Chunked variant of bulk_import_csv with bounded memory.
+        Each chunk of chunk_size rows is committed in its own transaction
+        together with an ImportCheckpoint, so a crashed import resumes from
+        the last committed row as long as the file hash is unchanged.
+        Checkpoints are keyed by absolute path; a file whose checkpoint is
+        completed for the same hash is not read again unless restart is set.
+        """
+        log_data = {
+            "total_rows": 0,
+            "grids_created": 0,
+            "records_created": 0,
+            "records_updated": 0,
+            "errors": [],
+            "chunks": 0,
+            "resumed_from_row": 0,
+        }
+        source_file = source_name or os.path.basename(file_path)
+
+        try:
+            file_hash = file_sha256(file_path)
+            # Not source_file: every period has its own mapped_mlp.csv. The
+            # path is hashed so any length fits the unique key
+            source_path = os.path.abspath(file_path)
+            checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+                path_hash=checkpoint_key(source_path),
+                defaults={"source_file": source_path, "file_hash": file_hash},
+            )
+            unchanged = checkpoint.file_hash == file_hash
+            if unchanged and checkpoint.completed and not restart:
+                log_data["total_rows"] = checkpoint.rows_done
+                log_data["already_imported"] = True
+                return log_data
+            if not unchanged or checkpoint.completed:
+                checkpoint.file_hash = file_hash
+                checkpoint.byte_offset = 0
+                checkpoint.rows_done = 0
+                checkpoint.completed = False
+                checkpoint.save()
+
+            row_num = checkpoint.rows_done
+            log_data["resumed_from_row"] = row_num
+            log_data["total_rows"] = row_num
+            # Periods written by an earlier, interrupted run are unknown here,
+            # so a resumed import refreshes the whole catalog
+            touched_periods = set() if row_num == 0 else None
+
+            def commit_chunk(grids, records, valid_rows, byte_offset):
+                with transaction.atomic():
+                    grids_created, created, updated = CrimeDataProcessor.write_batch(
+                        record_type, grids, records, batch_size, grid_registry
+                    )
+                    ImportCheckpoint.objects.filter(pk=checkpoint.pk).update(
+                        byte_offset=byte_offset, rows_done=row_num
+                    )
+                if touched_periods is not None:
+                    touched_periods.update(key[1] for key in records)
+                log_data["grids_created"] += grids_created
+                log_data["records_created"] += created
+                log_data["records_updated"] += updated + valid_rows - len(records)
+                log_data["chunks"] += 1
+
+            with open(file_path, "rb") as file:
+                grids, records, valid_rows, pending = {}, {}, 0, 0
+
+                for row, byte_offset in _iter_csv_from_offset(
+                    file, checkpoint.byte_offset
+                ):
+                    row_num += 1
+                    pending += 1
+                    try:
+                        grid, record = CrimeDataProcessor.parse_prediction_row(
+                            row, record_type, source_file
+                        )
+                    except (ValueError, KeyError) as e:
+                        log_data["errors"].append(f"Row {row_num}: {str(e)}")
+                    else:
+                        grids[grid["grid_id"]] = grid
+                        records[(grid["grid_id"], record["target_period"])] = record
+                        valid_rows += 1
+                        log_data["total_rows"] = row_num
+
+                    if pending == chunk_size:
+                        commit_chunk(grids, records, valid_rows, byte_offset)
+                        grids, records, valid_rows, pending = {}, {}, 0, 0
+
+                # The catalog is refreshed once, with the last chunk
+                with transaction.atomic():
+                    if pending:
+                        commit_chunk(grids, records, valid_rows, byte_offset)
+                    PeriodCatalogProcessor.refresh(touched_periods)
+                    ImportCheckpoint.objects.filter(pk=checkpoint.pk).update(
+                        completed=True
+                    )
+
+            # One new dataset version per import, not per committed chunk
+            transaction.on_commit(bump_dataset_version)
             return log_data
 
         except Exception as e:
@@ -239,6 +698,7 @@ class MetricDataProcessor:
             "records_updated": 0,
             "errors": [],
         }
+        touched_periods = set()
 
         try:
             with open(file_path, "r", encoding="utf-8") as file:
@@ -276,6 +736,7 @@ class MetricDataProcessor:
                             },
                         )
 
+                        touched_periods.add(target_period)
                         if created:
                             log_data["records_created"] += 1
                         else:
@@ -287,8 +748,318 @@ class MetricDataProcessor:
 
                     log_data["total_rows"] = row_num
 
+            MetricDataProcessor.refresh_comparisons(touched_periods)
+            PeriodCatalogProcessor.refresh(touched_periods)
+            transaction.on_commit(bump_dataset_version)
             return log_data
 
         except Exception as e:
             log_data["errors"].append(f"File error: {str(e)}")
             raise
+
+    @staticmethod
+    def refresh_comparisons(periods=None, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """
+        Recompute the ModelComparison rows of the given periods (every period
+        when None) from MetricData. Returns the number of rows written.
+        """
+        metrics = MetricData.objects.all()
+        comparisons = ModelComparison.objects.all()
+        if periods is not None:
+            periods = set(periods)
+            if not periods:
+                return 0
+            metrics = metrics.filter(target_period__in=periods)
+            comparisons = comparisons.filter(period__in=periods)
+
+        rows_by_period = {}
+        for period, *row in metrics.values_list(
+            "target_period", "model", "pei_percent", "accuracy"
+        ):
+            rows_by_period.setdefault(period, []).append(row)
+
+        rows = [
+            ModelComparison(period=period, **comparison_values(period_rows))
+            for period, period_rows in rows_by_period.items()
+        ]
+
+        comparisons.exclude(period__in=list(rows_by_period)).delete()
+        _bulk_upsert(
+            ModelComparison,
+            rows,
+            ["period"],
+            [*COMPARISON_FIELDS, "updated_at"],
+            batch_size,
+        )
+        return len(rows)
+
+
+class PeriodCatalogProcessor:
+    COUNT_FIELDS = [
+        ("actual_rows", ActualCrime),
+        ("mlp_rows", MLPPrediction),
+        ("baseline_rows", BaselinePrediction),
+    ]
+
+    @staticmethod
+    def refresh(periods=None, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """
+        Recompute the PeriodCatalog rows of the given periods (every period
+        when None) with one grouped count per table, and drop catalog rows
+        whose period no longer has any data. Returns the number of rows written.
+        """
+        if periods is not None:
+            periods = set(periods)
+            if not periods:
+                return 0
+
+        def scoped(model):
+            queryset = model.objects.all()
+            if periods is not None:
+                queryset = queryset.filter(target_period__in=periods)
+            return queryset
+
+        entries = {}
+        for field, model in PeriodCatalogProcessor.COUNT_FIELDS:
+            counts = (
+                scoped(model)
+                .values_list("target_period")
+                .annotate(rows=Count("id"))
+                .order_by()
+            )
+            for period, rows in counts:
+                entries.setdefault(period, {})[field] = rows
+        for period, model_name in scoped(MetricData).values_list(
+            "target_period", "model"
+        ):
+            entry = entries.setdefault(period, {})
+            entry.setdefault("available_models", []).append(model_name)
+
+        now = timezone.now()
+        rows = []
+        for period, entry in entries.items():
+            models_in_period = sorted(set(entry.get("available_models", [])))
+            rows.append(
+                PeriodCatalog(
+                    period=period,
+                    available_models=models_in_period,
+                    actual_rows=entry.get("actual_rows", 0),
+                    mlp_rows=entry.get("mlp_rows", 0),
+                    baseline_rows=entry.get("baseline_rows", 0),
+                    metric_rows=len(entry.get("available_models", [])),
+                    last_imported_at=now,
+                )
+            )
+
+        stale = PeriodCatalog.objects.exclude(period__in=list(entries))
+        if periods is not None:
+            stale = stale.filter(period__in=periods)
+        stale.delete()
+        _bulk_upsert(
+            PeriodCatalog,
+            rows,
+            ["period"],
+            [
+                "available_models",
+                "actual_rows",
+                "mlp_rows",
+                "baseline_rows",
+                "metric_rows",
+                "last_imported_at",
+            ],
+            batch_size,
+        )
+        return len(rows)
+
+
+class UnifiedPredictionProcessor:
+    @staticmethod
+    def enabled():
+        return getattr(settings, "UNIFIED_PREDICTION_STORE", False)
+
+    @staticmethod
+    def upsert_records(record_type, records, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """Mirror prediction record dicts of record_type into Prediction"""
+        count_field = PREDICTION_IMPORT_SPECS[record_type]["count_field"]
+        rows = [
+            Prediction(
+                model=record_type,
+                grid_id=record["grid_id"],
+                target_period=record["target_period"],
+                count=record[count_field],
+                rank=record["rank"],
+                source_file=record["source_file"],
+            )
+            for record in records
+        ]
+        _bulk_upsert(
+            Prediction,
+            rows,
+            ["model", "grid", "target_period"],
+            ["count", "rank", "source_file"],
+            batch_size,
+        )
+        return len(rows)
+
+    @staticmethod
+    def upsert_instances(record_type, instances, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """Mirror saved record_type source model instances into Prediction"""
+        count_field = PREDICTION_IMPORT_SPECS[record_type]["count_field"]
+        records = [
+            {
+                "grid_id": instance.grid_id,
+                "target_period": instance.target_period,
+                count_field: getattr(instance, count_field),
+                "rank": instance.rank,
+                "source_file": instance.source_file,
+            }
+            for instance in instances
+        ]
+        return UnifiedPredictionProcessor.upsert_records(
+            record_type, records, batch_size
+        )
+
+    @staticmethod
+    def sync(record_type, periods=None, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """
+        Replace the Prediction rows of record_type for the given periods
+        (every period when None) with a copy of its source table, one period
+        at a time. Returns the number of rows written.
+        """
+        spec = PREDICTION_IMPORT_SPECS[record_type]
+        source = spec["model"].objects.all()
+        mirrored = Prediction.objects.filter(model=record_type)
+        if periods is not None:
+            periods = set(periods)
+            source = source.filter(target_period__in=periods)
+            mirrored = mirrored.filter(target_period__in=periods)
+        mirrored.delete()
+
+        written = 0
+        fields = ["grid_id", "target_period", spec["count_field"], "rank"]
+        periods = (
+            source.values_list("target_period", flat=True)
+            .order_by("target_period")
+            .distinct()
+        )
+        for period in periods:
+            records = (
+                source.filter(target_period=period)
+                .values(*fields, "source_file")
+                .order_by()
+            )
+            written += UnifiedPredictionProcessor.upsert_records(
+                record_type, records, batch_size
+            )
+        return written
+
+
+class TopPredictionProcessor:
+    FIELDS = ["period", "model", "rank", "grid_id", "count", *GRID_GEOMETRY_FIELDS]
+
+    @staticmethod
+    def expected_rows(periods=None, models=None):
+        """
+        TopPrediction rows as tuples in FIELDS order, built from the
+        normalized tables: ranks 1..TOP_PREDICTION_DEPTH of each model with
+        the grid geometry joined in. Unranked rows are left out; readers fall
+        back to the normalized tables for a model with no rows in a period.
+        """
+        rows = []
+        for model_name in models or PREDICTION_IMPORT_SPECS:
+            spec = PREDICTION_IMPORT_SPECS[model_name]
+            queryset = spec["model"].objects.filter(rank__lte=TOP_PREDICTION_DEPTH)
+            if periods is not None:
+                queryset = queryset.filter(target_period__in=periods)
+            for period, rank, grid_id, count, *geometry in queryset.values_list(
+                "target_period",
+                "rank",
+                "grid_id",
+                spec["count_field"],
+                *(f"grid__{field}" for field in GRID_GEOMETRY_FIELDS),
+            ).order_by():
+                rows.append(
+                    (period, model_name, rank, grid_id, float(count), *geometry)
+                )
+        return rows
+
+    @staticmethod
+    def refresh(periods=None, models=None, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """
+        Rebuild the TopPrediction rows of the given periods and models (all
+        when None). Returns the number of rows written.
+        """
+        if periods is not None:
+            periods = set(periods)
+            if not periods:
+                return 0
+
+        rows = TopPredictionProcessor.expected_rows(periods, models)
+        stale = TopPrediction.objects.all()
+        if periods is not None:
+            stale = stale.filter(period__in=periods)
+        if models is not None:
+            stale = stale.filter(model__in=models)
+
+        with transaction.atomic():
+            stale.delete()
+            TopPrediction.objects.bulk_create(
+                [
+                    TopPrediction(**dict(zip(TopPredictionProcessor.FIELDS, row)))
+                    for row in rows
+                ],
+                batch_size=batch_size,
+            )
+        return len(rows)
+
+    @staticmethod
+    def sync_geometry(grids):
+        """
+        Copy the geometry of grid dicts onto their TopPrediction rows where it
+        changed. Geometry rarely moves, so this is normally a single read.
+        """
+        grids = {grid["grid_id"]: grid for grid in grids}
+        moved = {
+            grid_id
+            for grid_id, *geometry in TopPrediction.objects.filter(
+                grid_id__in=list(grids)
+            ).values_list("grid_id", *GRID_GEOMETRY_FIELDS)
+            if geometry != [grids[grid_id][field] for field in GRID_GEOMETRY_FIELDS]
+        }
+        for grid_id in moved:
+            TopPrediction.objects.filter(grid_id=grid_id).update(
+                **{field: grids[grid_id][field] for field in GRID_GEOMETRY_FIELDS}
+            )
+        return len(moved)
+
+    @staticmethod
+    def checksums(rows):
+        """SHA-256 over the sorted rows of each (period, model)"""
+        grouped = {}
+        for row in rows:
+            grouped.setdefault((row[0], row[1]), []).append(row)
+        return {
+            key: hashlib.sha256(repr(sorted(group)).encode("utf-8")).hexdigest()
+            for key, group in grouped.items()
+        }
+
+    @staticmethod
+    def check(periods=None):
+        """
+        Compare TopPrediction with the normalized tables. Returns the sorted
+        (period, model) pairs whose rows differ or are missing on either side.
+        """
+        stored = TopPrediction.objects.all()
+        if periods is not None:
+            stored = stored.filter(period__in=periods)
+        expected = TopPredictionProcessor.checksums(
+            TopPredictionProcessor.expected_rows(periods)
+        )
+        actual = TopPredictionProcessor.checksums(
+            stored.values_list(*TopPredictionProcessor.FIELDS).order_by()
+        )
+        return sorted(
+            key
+            for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        )
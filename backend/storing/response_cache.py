@@ -0,0 +1,100 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .static_cache import negotiate_encoding
+
+DATASET_VERSION_KEY = "storing:dataset-version"
+DEFAULT_RESPONSE_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def get_dataset_version():
+    """
+    Current dataset version token, shared by every worker through the cache.
+    Created lazily so a cleared cache starts a fresh version.
+    """
+    version = cache.get(DATASET_VERSION_KEY)
+    if version is None:
+        cache.add(DATASET_VERSION_KEY, str(time.time_ns()), timeout=None)
+        version = cache.get(DATASET_VERSION_KEY)
+    return version
+
+
+def bump_dataset_version():
+    """Invalidate every cached response by moving to a new dataset version."""
+    version = str(time.time_ns())
+    cache.set(DATASET_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def response_cache_key(prefix, request, version=None, defaults=None):
+    defaults = defaults or {}
+    # Parameters left at their default share the entry of the bare request,
+    # so ?period=X and ?period=X&limit=20 hit what warm_response_cache stored
+    params = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+        if defaults.get(key) != value
+    )
+    # Path arguments (e.g. tile coordinates) and each negotiated encoding
+    # get their own entries
+    params.append(("path", request.path))
+    params.append(("encoding", negotiate_encoding(request)))
+    digest = hashlib.md5(repr(params).encode("utf-8")).hexdigest()
+    return f"storing:{prefix}:{version or get_dataset_version()}:{digest}"
+
+
+def cache_response(prefix, defaults=None):
+    """
+    Replacement for cache_page that keys GET responses by dataset version
+    instead of a fixed TTL. defaults maps query parameters to the string
+    value the view assumes when they are missing. Only successful JSON responses are stored, as
+    (content type, content encoding, body) so any cache backend can hold them.
+    Entries expire after RESPONSE_CACHE_TIMEOUT only to let old versions age out.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method != "GET":
+                return view_func(request, *args, **kwargs)
+
+            key = response_cache_key(prefix, request, defaults=defaults)
+            cached = cache.get(key)
+            if cached is not None:
+                content_type, content_encoding, body = cached
+                response = HttpResponse(body, content_type=content_type)
+                if content_encoding:
+                    response["Content-Encoding"] = content_encoding
+                patch_vary_headers(response, ("Accept-Encoding",))
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+            content_type = response.get("Content-Type", "")
+            if response.status_code == 200 and content_type.startswith(
+                "application/json"
+            ):
+                cache.set(
+                    key,
+                    (
+                        content_type,
+                        response.get("Content-Encoding"),
+                        response.content,
+                    ),
+                    getattr(
+                        settings, "RESPONSE_CACHE_TIMEOUT", DEFAULT_RESPONSE_TIMEOUT
+                    ),
+                )
+            return response
+
+        return wrapped
+
+    return decorator
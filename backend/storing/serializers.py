@@ -113,3 +113,31 @@ class SimpleMetricSerializer(serializers.ModelSerializer):
     class Meta:
         model = MetricData
         fields = ["id", "model", "target_period", "pei_percent", "accuracy"]
+
+
+class ValuesListSerializer:
+    """
+    Read-only fast path for the flat prediction shapes above.
+
+    Builds the same dicts as serializer_class(queryset, many=True).data, but
+    pulls plain tuples with values_list across the grid join instead of
+    resolving every source="grid.*" field through model instances.
+    """
+
+    def __init__(self, serializer_class):
+        declared = serializer_class._declared_fields
+        self.fields = list(serializer_class.Meta.fields)
+        self.lookups = []
+        for name in self.fields:
+            field = declared.get(name)
+            source = field.source if field is not None and field.source else name
+            self.lookups.append(source.replace(".", "__"))
+
+    def serialize(self, queryset):
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in queryset.values_list(*self.lookups)]
+
+
+ACTUAL_CRIME_VALUES = ValuesListSerializer(ActualCrimeSerializer)
+MLP_PREDICTION_VALUES = ValuesListSerializer(MLPPredictionSerializer)
+BASELINE_PREDICTION_VALUES = ValuesListSerializer(BaselinePredictionSerializer)
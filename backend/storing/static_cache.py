@@ -0,0 +1,213 @@
+import copy
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import brotli
+from django.conf import settings
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+JSON_CONTENT_TYPE = "application/json"
+
+
+def static_data_dir():
+    return Path(
+        getattr(settings, "STATIC_DATA_DIR", Path(settings.BASE_DIR) / "static_data")
+    )
+
+
+def encode_json(payload):
+    """Encode payload the way DRF's JSONRenderer does with its default settings."""
+    text = json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    )
+    # Same escaping DRF applies so the body is also valid JavaScript
+    text = text.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+    return text.encode("utf-8")
+
+
+def gzip_compress(body):
+    # mtime=0 keeps the output byte-identical across builds
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def brotli_compress(body):
+    return brotli.compress(body, quality=11)
+
+
+# Preferred first when a client accepts several
+COMPRESSORS = {"br": brotli_compress, "gzip": gzip_compress}
+
+COMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def negotiate_encoding(request):
+    """Return the best encoding in COMPRESSORS the client accepts, or None."""
+    accepted = {}
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        token, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+    for encoding in COMPRESSORS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def _read_precompressed(filename, body, encoding):
+    """
+    Return the name.min.json.<gz|br> bytes written by build_static_data when
+    name.min.json holds exactly body, so the response needs no compression.
+    """
+    min_path = static_data_dir() / Path(filename).with_suffix(".min.json")
+    try:
+        if min_path.read_bytes() != body:
+            return None
+        return Path(f"{min_path}{COMPRESSED_SUFFIXES[encoding]}").read_bytes()
+    except OSError:
+        return None
+
+
+class _Snapshot:
+    __slots__ = ("version", "payload", "encoded", "weight")
+
+    def __init__(self, version, payload):
+        self.version = version
+        self.payload = payload
+        self.encoded = {}
+        self.weight = version[1]
+
+
+class StaticSnapshotCache:
+    """
+    Per-process LRU of parsed static_data JSON files.
+
+    Each entry is keyed by filename and remembers the (mtime_ns, size) it was
+    parsed from, so a file rewritten by build_static_data is re-read on the
+    next lookup. Encoded response bodies derived from a file are stored on its
+    entry and dropped with it. The cache is bounded by the total size of the
+    files and bodies it holds. get() always returns a deep copy that callers
+    can mutate freely.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _limit(self):
+        if self.max_bytes is not None:
+            return self.max_bytes
+        return getattr(settings, "STATIC_SNAPSHOT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry.weight
+
+    def _evict(self):
+        limit = self._limit()
+        while self._bytes > limit and self._entries:
+            self._discard(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _lookup(self, filename):
+        path = static_data_dir() / filename
+        key = str(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            with self._lock:
+                self._discard(key)
+            return None, None
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.version == version:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return key, entry
+
+        try:
+            with path.open("r", encoding="utf-8") as file:
+                payload = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return None, None
+
+        entry = _Snapshot(version, payload)
+        with self._lock:
+            self.stats["misses"] += 1
+            self._discard(key)
+            self._entries[key] = entry
+            self._bytes += entry.weight
+            self._evict()
+        return key, entry
+
+    def get(self, filename):
+        """Return a private copy of the parsed file, or None if unreadable."""
+        _, entry = self._lookup(filename)
+        if entry is None:
+            return None
+        return copy.deepcopy(entry.payload)
+
+    def _remember(self, key, entry, slot, body):
+        with self._lock:
+            if self._entries.get(key) is entry and slot not in entry.encoded:
+                entry.encoded[slot] = body
+                entry.weight += len(body)
+                self._bytes += len(body)
+                self._evict()
+
+    def get_encoded(self, filename, variant=None, transform=None, encoding=None):
+        """
+        Return the JSON body for (filename, variant), or None.
+
+        transform receives a private copy of the parsed payload and returns
+        what should be encoded. With an encoding from COMPRESSORS the body is
+        compressed as well. Both steps run once per file version, variant and
+        encoding. A falsy payload yields None so callers can fall back to the
+        database.
+        """
+        key, entry = self._lookup(filename)
+        if entry is None:
+            return None
+        body = entry.encoded.get((variant, encoding))
+        if body is not None:
+            return body
+
+        body = entry.encoded.get((variant, None))
+        if body is None:
+            payload = copy.deepcopy(entry.payload)
+            if transform is not None and payload:
+                payload = transform(payload)
+            if not payload:
+                return None
+            body = encode_json(payload)
+            self._remember(key, entry, (variant, None), body)
+        if encoding is None:
+            return body
+
+        compressed = _read_precompressed(filename, body, encoding)
+        if compressed is None:
+            compressed = COMPRESSORS[encoding](body)
+        self._remember(key, entry, (variant, encoding), compressed)
+        return compressed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+static_snapshots = StaticSnapshotCache()
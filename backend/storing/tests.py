@@ -1,3 +1,1395 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import brotli
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .deltas import _movers_cache_key, compute_rank_deltas, top_movers
+from .grid_registry import GridRegistry
+from .history import _series_queryset
+from .manifest import PipelineManifest
+from .models import (
+    CrimeGrid,
+    ActualCrime,
+    MLPPrediction,
+    BaselinePrediction,
+    ImportCheckpoint,
+    MetricData,
+    PeriodCatalog,
+    Prediction,
+    TopPrediction,
+)
+from .prediction_store import (
+    read_model_queryset,
+    table_ranked_queryset,
+    table_top_predictions,
+    table_unranked_queryset,
+    top_predictions,
+    unified_ranked_queryset,
+    unified_unranked_queryset,
+)
+from .processing import (
+    GRID_GEOMETRY_FIELDS,
+    CrimeDataProcessor,
+    MetricDataProcessor,
+    PeriodCatalogProcessor,
+    TopPredictionProcessor,
+    UnifiedPredictionProcessor,
+)
+from .response_cache import response_cache_key
+from .static_cache import (
+    COMPRESSED_SUFFIXES,
+    StaticSnapshotCache,
+    encode_json,
+    static_snapshots,
+)
+from .tiles import GRID_DETAIL_MIN_ZOOM, build_tile
+
+# Seeded city: a GRID_SIZE x GRID_SIZE block of grids over Chicago with a
+# full ranking of every model for each period
+GRID_SIZE = 20
+PERIODS = [202301, 202302, 202303, 202304, 202305, 202306]
+WEST, SOUTH, EAST, NORTH = -87.94, 41.64, -87.52, 42.02
+
+# Maximum queries per endpoint on the database path (no static_data files,
+# cold response cache)
+QUERY_BUDGETS = {
+    "top-predictions": 1,
+    "top-predictions-batch": 1,
+    "metrics-by-period": 1,
+    "available-periods": 1,
+    "metric-get": 1,
+    "grid-history": 1,
+    "movers": 3,
+    "tile-aggregated": 1,
+    "tile-detail": 1,
+    "export": 2,
+    "export-range": 2 * len(PERIODS),
+}
+
+# Median wall time per request in milliseconds, only checked with
+# STORING_PERF_TESTS=1 as shared CI runners are too noisy for them. Scale all
+# of them with STORING_PERF_BUDGET_SCALE on slow build machines.
+LATENCY_BUDGETS_MS = {
+    "top-predictions": 50,
+    "top-predictions-batch": 100,
+    "metrics-by-period": 30,
+    "available-periods": 30,
+    "metric-get": 50,
+    "grid-history": 100,
+    "movers": 300,
+    "tile-aggregated": 300,
+    "tile-detail": 150,
+    "export": 300,
+    "export-range": 1000,
+}
+LATENCY_SCALE = float(os.getenv("STORING_PERF_BUDGET_SCALE", "1"))
+LATENCY_RUNS = 5
+
+# When set, EXPLAIN output of the key queries is written here as <name>.txt
+EXPLAIN_DIR = os.getenv("STORING_EXPLAIN_DIR")
+
+
+def _tile(z, longitude, latitude):
+    tiles = 2**z
+    x = int((longitude + 180.0) / 360.0 * tiles)
+    lat = math.radians(latitude)
+    y = int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * tiles)
+    return f"{z}/{x}/{y}"
+
+
+def _grid_center(grid_id):
+    row, column = divmod(grid_id - 1, GRID_SIZE)
+    return (
+        WEST + (column + 0.5) * (EAST - WEST) / GRID_SIZE,
+        SOUTH + (row + 0.5) * (NORTH - SOUTH) / GRID_SIZE,
+    )
+
+
+CENTER = ((WEST + EAST) / 2, (SOUTH + NORTH) / 2)
+ENDPOINTS = {
+    "top-predictions": "/api/top-predictions/?period=202303",
+    "top-predictions-batch": "/api/top-predictions/batch/?start=202301&end=202306",
+    "metrics-by-period": "/api/metrics-by-period/?period=202303",
+    "available-periods": "/api/get_all_metrics/",
+    "metric-get": "/api/metric-get/",
+    "grid-history": "/api/grid-history/?grids=1,57,210,399",
+    "movers": "/api/movers/?from=202302&to=202303&limit=10",
+    "tile-aggregated": f"/api/tiles/mlp/202303/{_tile(10, *CENTER)}/",
+    "tile-detail": f"/api/tiles/mlp/202303/{_tile(15, *_grid_center(210))}/",
+    "export": "/api/export/?model=mlp&period=202303",
+    "export-range": "/api/export/?model=baseline&start=202301&end=202306",
+}
+
+# Not wrapped in cache_response (exports are streamed)
+UNCACHED_ENDPOINTS = {"metric-get", "export", "export-range"}
+
+
+def _index_name(model, fields):
+    for index in model._meta.indexes:
+        if list(index.fields) == fields:
+            return index.name
+    raise LookupError(f"{model.__name__} has no index on {fields}")
+
+
+def _seed_dataset():
+    rng = random.Random(20230101)
+    grids = []
+    cell_width = (EAST - WEST) / GRID_SIZE
+    cell_height = (NORTH - SOUTH) / GRID_SIZE
+    for index in range(GRID_SIZE * GRID_SIZE):
+        row, column = divmod(index, GRID_SIZE)
+        west = WEST + column * cell_width
+        south = SOUTH + row * cell_height
+        grids.append(
+            CrimeGrid(
+                grid_id=index + 1,
+                center_longitude=west + cell_width / 2,
+                center_latitude=south + cell_height / 2,
+                southwest_lat=south,
+                southwest_lng=west,
+                northeast_lat=south + cell_height,
+                northeast_lng=west + cell_width,
+            )
+        )
+    CrimeGrid.objects.bulk_create(grids)
+
+    # Hot spots stay hot between periods, so rankings overlap like real data
+    base_rate = {grid.grid_id: rng.gammavariate(2.0, 6.0) for grid in grids}
+    for model, count_field, as_float in (
+        (ActualCrime, "actual_crime_count", False),
+        (MLPPrediction, "mlp_crime_count", False),
+        (BaselinePrediction, "baseline_predicted_count", True),
+    ):
+        rows = []
+        for period in PERIODS:
+            counts = {
+                grid_id: rate * rng.uniform(0.6, 1.4)
+                for grid_id, rate in base_rate.items()
+            }
+            ranked = sorted(counts, key=counts.get, reverse=True)
+            for rank, grid_id in enumerate(ranked, 1):
+                count = counts[grid_id]
+                rows.append(
+                    model(
+                        grid_id=grid_id,
+                        target_period=period,
+                        rank=rank,
+                        source_file=f"mapped_{period}.csv",
+                        **{count_field: count if as_float else round(count)},
+                    )
+                )
+        model.objects.bulk_create(rows, batch_size=1000)
+
+    MetricData.objects.bulk_create(
+        [
+            MetricData(
+                model=name,
+                target_period=period,
+                pei_percent=rng.uniform(40, 90),
+                accuracy=rng.uniform(0.2, 0.6),
+            )
+            for period in PERIODS
+            for name in ("MLP", "Lee_Baseline")
+        ]
+    )
+
+    PeriodCatalogProcessor.refresh()
+    MetricDataProcessor.refresh_comparisons()
+    TopPredictionProcessor.refresh()
+    for record_type in ("actual", "mlp", "baseline"):
+        UnifiedPredictionProcessor.sync(record_type)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    UNIFIED_PREDICTION_STORE=False,
+)
+class StoringViewPerformanceTests(TestCase):
+    """
+    Query-count, query-plan and latency budgets for the storing endpoints on
+    their database path. static_data is pointed at an empty directory so no
+    request is answered from a snapshot.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.static_dir = tempfile.mkdtemp()
+        cls.static_override = override_settings(STATIC_DATA_DIR=Path(cls.static_dir))
+        cls.static_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.static_override.disable()
+        shutil.rmtree(cls.static_dir, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        _seed_dataset()
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, url):
+        response = self.client.get(url)
+        if response.streaming:
+            body = b"".join(response.streaming_content)
+        else:
+            body = response.content
+        self.assertEqual(response.status_code, 200, body[:500])
+        return body
+
+    def _explain(self, name, queryset):
+        plan = queryset.explain()
+        if EXPLAIN_DIR:
+            os.makedirs(EXPLAIN_DIR, exist_ok=True)
+            with open(os.path.join(EXPLAIN_DIR, f"{name}.txt"), "w") as file:
+                file.write(f"{queryset.query}\n\n{plan}\n")
+        return plan
+
+    def assertUsesIndex(self, name, queryset, index_name):
+        plan = self._explain(name, queryset)
+        self.assertIn(index_name, plan, f"{name} no longer uses {index_name}:\n{plan}")
+
+    def assertRanked(self, rows, count, period):
+        self.assertEqual([row["rank"] for row in rows], list(range(1, count + 1)))
+        self.assertEqual({row["target_period"] for row in rows}, {period})
+
+    def assertTopPredictions(self, result, period):
+        self.assertEqual(result["period"], period)
+        for model in ("actual", "mlp", "baseline"):
+            self.assertRanked(result["data"][model], 20, period)
+            self.assertEqual(result["counts"][model], 20)
+
+    def assertMovers(self, movers, model):
+        deltas = compute_rank_deltas(model, 202302, 202303).dropna()
+        self.assertEqual(movers["compared"], GRID_SIZE * GRID_SIZE)
+        for key, sign in (("risers", 1), ("fallers", -1)):
+            changes = [row["rank_change"] for row in movers[key]]
+            self.assertEqual(len(changes), 10)
+            self.assertEqual(
+                changes, sorted(changes, key=lambda change: -sign * change)
+            )
+            best = (
+                deltas["rank_change"].max() if sign > 0 else deltas["rank_change"].min()
+            )
+            self.assertEqual(changes[0], best)
+
+    def assertTile(self, tile, aggregated):
+        west, south, east, north = tile["properties"]["bounds"]
+        counts = dict(
+            MLPPrediction.objects.filter(
+                target_period=202303,
+                grid__center_longitude__gte=west,
+                grid__center_longitude__lt=east,
+                grid__center_latitude__gte=south,
+                grid__center_latitude__lt=north,
+            ).values_list("grid_id", "mlp_crime_count")
+        )
+        properties = [feature["properties"] for feature in tile["features"]]
+        self.assertIs(tile["properties"]["aggregated"], aggregated)
+        self.assertEqual(tile["properties"]["grid_count"], len(counts))
+        self.assertGreater(len(counts), 0)
+        self.assertEqual(
+            sum(cell["count"] for cell in properties), sum(counts.values())
+        )
+        if aggregated:
+            self.assertEqual(sum(cell["grids"] for cell in properties), len(counts))
+        else:
+            self.assertEqual(
+                {cell["grid_id"]: cell["count"] for cell in properties}, counts
+            )
+
+    def assertPayload(self, name, body):
+        if name.startswith("export"):
+            rows = [json.loads(line) for line in body.splitlines()]
+            periods = [202303] if name == "export" else PERIODS
+            self.assertEqual(len(rows), GRID_SIZE * GRID_SIZE * len(periods))
+            for index, period in enumerate(periods):
+                first = index * GRID_SIZE * GRID_SIZE
+                self.assertRanked(
+                    rows[first : first + GRID_SIZE * GRID_SIZE],
+                    GRID_SIZE * GRID_SIZE,
+                    period,
+                )
+            return
+
+        payload = json.loads(body)
+        if name.startswith("tile-"):
+            self.assertTile(payload, aggregated=name == "tile-aggregated")
+            return
+
+        self.assertTrue(payload["success"])
+        if name == "top-predictions":
+            self.assertTopPredictions(payload, 202303)
+        elif name == "top-predictions-batch":
+            self.assertEqual(payload["periods"], PERIODS)
+            for result, period in zip(payload["results"], PERIODS):
+                self.assertTopPredictions(result, period)
+        elif name == "metrics-by-period":
+            self.assertEqual(
+                sorted(metric["model"] for metric in payload["metrics"]),
+                ["Baseline", "MLP"],
+            )
+            self.assertIsNotNone(payload["comparison"])
+        elif name == "available-periods":
+            self.assertEqual(payload["periods"], PERIODS)
+        elif name == "metric-get":
+            self.assertEqual(payload["count"], 2 * len(PERIODS))
+        elif name == "grid-history":
+            self.assertEqual(
+                [grid["grid_id"] for grid in payload["grids"]], [1, 57, 210, 399]
+            )
+            for grid in payload["grids"]:
+                self.assertEqual(
+                    [entry["period"] for entry in grid["history"]], PERIODS
+                )
+        elif name == "movers":
+            for model in ("actual", "mlp", "baseline"):
+                self.assertMovers(payload["data"][model], model)
+        else:
+            self.fail(f"No payload check for {name}")
+
+    def test_endpoints_stay_within_query_budget(self):
+        for name, url in ENDPOINTS.items():
+            with self.subTest(endpoint=name):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    body = self._get(url)
+                self.assertPayload(name, body)
+                executed = "\n".join(query["sql"] for query in queries.captured_queries)
+                self.assertLessEqual(
+                    len(queries),
+                    QUERY_BUDGETS[name],
+                    f"{url} ran {len(queries)} queries:\n{executed}",
+                )
+
+    def test_cached_responses_skip_the_database(self):
+        for name, url in ENDPOINTS.items():
+            if name in UNCACHED_ENDPOINTS:
+                continue
+            with self.subTest(endpoint=name):
+                self._get(url)
+                with self.assertNumQueries(0):
+                    self._get(url)
+
+    @skipUnless(
+        os.getenv("STORING_PERF_TESTS") == "1",
+        "wall-clock budgets run only with STORING_PERF_TESTS=1",
+    )
+    def test_endpoints_stay_within_latency_budget(self):
+        for name, url in ENDPOINTS.items():
+            with self.subTest(endpoint=name):
+                self._get(url)  # Warm imports and connection state
+                timings = []
+                for _ in range(LATENCY_RUNS):
+                    cache.clear()
+                    started = time.perf_counter()
+                    self._get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+                budget = LATENCY_BUDGETS_MS[name] * LATENCY_SCALE
+                median = statistics.median(timings)
+                self.assertLessEqual(
+                    median, budget, f"{url} took {median:.1f} ms (budget {budget} ms)"
+                )
+
+    def test_ranked_reads_use_target_period_rank_index(self):
+        for model, table in (
+            ("actual", ActualCrime),
+            ("mlp", MLPPrediction),
+            ("baseline", BaselinePrediction),
+        ):
+            index_name = _index_name(table, ["target_period", "rank"])
+            with self.subTest(model=model):
+                self.assertUsesIndex(
+                    f"{table._meta.db_table}_top",
+                    table_ranked_queryset(model, [202303], 20),
+                    index_name,
+                )
+                self.assertUsesIndex(
+                    f"{table._meta.db_table}_batch",
+                    table_ranked_queryset(model, PERIODS, 20),
+                    index_name,
+                )
+                self.assertUsesIndex(
+                    f"{table._meta.db_table}_unranked",
+                    table_unranked_queryset(model, 202303, 20),
+                    index_name,
+                )
+
+    def test_top_prediction_read_model_uses_period_rank_index(self):
+        self.assertUsesIndex(
+            "top_prediction",
+            read_model_queryset(PERIODS, 20),
+            _index_name(TopPrediction, ["period", "rank", "model"]),
+        )
+
+    def test_unified_store_uses_covering_index(self):
+        index_name = _index_name(
+            Prediction, ["target_period", "rank", "model", "grid", "count"]
+        )
+        self.assertUsesIndex(
+            "prediction", unified_ranked_queryset(PERIODS, 20), index_name
+        )
+        self.assertUsesIndex(
+            "prediction_unranked",
+            unified_unranked_queryset(202303, "mlp", 20),
+            index_name,
+        )
+
+    def test_grid_history_uses_covering_indexes(self):
+        grid_ids = [1, 57, 210, 399]
+        for series, model, count_field in (
+            ("actual", ActualCrime, "actual_crime_count"),
+            ("mlp", MLPPrediction, "mlp_crime_count"),
+            ("baseline", BaselinePrediction, "baseline_predicted_count"),
+        ):
+            with self.subTest(series=series):
+                self.assertUsesIndex(
+                    f"{model._meta.db_table}_history",
+                    _series_queryset(series, grid_ids),
+                    _index_name(model, ["grid", "target_period", "rank", count_field]),
+                )
+
+
+MAPPED_CSV_COLUMNS = {
+    "actual": "Actual_Crime_Count",
+    "mlp": "Predicted_Crime_Count",
+    "baseline": "Crime_T1",
+}
+
+
+def _write_mapped_csv(directory, record_type, rows, name=None):
+    """
+    Write a mapped_*.csv for record_type from (grid_id, period, count, rank)
+    tuples, with geometry derived from the seeded city layout.
+    """
+    path = Path(directory) / (name or f"mapped_{record_type}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            [
+                "grid_id",
+                *GRID_GEOMETRY_FIELDS,
+                "Target_Period",
+                MAPPED_CSV_COLUMNS[record_type],
+                "Rank",
+            ]
+        )
+        for grid_id, period, count, rank in rows:
+            longitude, latitude = _grid_center(grid_id)
+            writer.writerow(
+                [
+                    grid_id,
+                    longitude,
+                    latitude,
+                    latitude - 0.005,
+                    longitude - 0.005,
+                    latitude + 0.005,
+                    longitude + 0.005,
+                    period,
+                    count,
+                    "" if rank is None else rank,
+                ]
+            )
+    return path
+
+
+class ImportTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+
+class BulkImportTests(ImportTestCase):
+    def _fixture(self):
+        # Repeated keys (the last row wins), NULL ranks and an unparseable row
+        rows = [
+            (1, 202301, 4, 1),
+            (2, 202301, 3, None),
+            (1, 202301, 6, 2),
+            (3, 202302, 2, None),
+            (3, 202302, 2, 1),
+        ]
+        path = _write_mapped_csv(self.directory, "mlp", rows)
+        with open(path, "a", newline="", encoding="utf-8") as file:
+            csv.writer(file).writerow([4, *([0.0] * 6), "soon", 5, 1])
+        return path
+
+    def _stored(self):
+        return {
+            "grids": list(
+                CrimeGrid.objects.order_by("grid_id").values_list(
+                    "grid_id", *GRID_GEOMETRY_FIELDS
+                )
+            ),
+            "records": list(
+                MLPPrediction.objects.order_by("grid_id", "target_period").values_list(
+                    "grid_id", "target_period", "mlp_crime_count", "rank", "source_file"
+                )
+            ),
+        }
+
+    def _run(self, importer, path):
+        logs = [importer(path), importer(path)]
+        for log in logs:
+            log["errors"] = len(log["errors"])
+        stored = self._stored()
+        MLPPrediction.objects.all().delete()
+        CrimeGrid.objects.all().delete()
+        return logs, stored
+
+    def test_matches_per_row_importer(self):
+        path = self._fixture()
+        per_row = self._run(CrimeDataProcessor.import_mlp_predictions_csv, path)
+        bulk = self._run(
+            lambda path: CrimeDataProcessor.bulk_import_csv(path, "mlp"), path
+        )
+        self.assertEqual(bulk, per_row)
+        logs, stored = bulk
+        self.assertEqual(logs[0]["records_created"], 3)
+        self.assertEqual(logs[0]["errors"], 1)
+        self.assertEqual(
+            [record[:4] for record in stored["records"]],
+            [(1, 202301, 6, 2), (2, 202301, 3, None), (3, 202302, 2, 1)],
+        )
+
+
+class GridRegistryTests(ImportTestCase):
+    def test_rolled_back_import_does_not_register_grids(self):
+        registry = GridRegistry().load()
+        path = _write_mapped_csv(self.directory, "mlp", [(7, 202301, 3, 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    CrimeDataProcessor.bulk_import_csv(
+                        path, "mlp", grid_registry=registry
+                    )
+                    raise RuntimeError("abort the import")
+        self.assertFalse(CrimeGrid.objects.filter(grid_id=7).exists())
+
+        # The next file must still write the grid instead of skipping it
+        with self.captureOnCommitCallbacks(execute=True):
+            log = CrimeDataProcessor.bulk_import_csv(
+                path, "mlp", grid_registry=registry
+            )
+        self.assertEqual(log["grids_created"], 1)
+        self.assertTrue(MLPPrediction.objects.filter(grid_id=7).exists())
+
+    def test_per_row_import_writes_grids_in_one_batch(self):
+        registry = GridRegistry().load()
+        path = _write_mapped_csv(
+            self.directory,
+            "mlp",
+            [(grid_id, 202301, grid_id, grid_id) for grid_id in range(1, 6)],
+        )
+        with CaptureQueriesContext(connection) as queries:
+            log = CrimeDataProcessor.import_mlp_predictions_csv(
+                path, grid_registry=registry
+            )
+        grid_writes = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].startswith('INSERT INTO "crime_grids"')
+        ]
+        self.assertEqual(len(grid_writes), 1)
+        self.assertEqual(log["grids_created"], 5)
+        self.assertEqual(log["records_created"], 5)
+
+
+class StreamImportCheckpointTests(ImportTestCase):
+    def _rows(self, period, count=10):
+        return [(grid_id, period, grid_id, grid_id) for grid_id in range(1, count + 1)]
+
+    def test_resumes_after_partial_import(self):
+        path = _write_mapped_csv(self.directory, "mlp", self._rows(202301))
+        write_batch = CrimeDataProcessor.write_batch
+        calls = []
+
+        def fail_second_chunk(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return write_batch(*args, **kwargs)
+
+        with mock.patch.object(
+            CrimeDataProcessor, "write_batch", side_effect=fail_second_chunk
+        ):
+            with self.assertRaises(RuntimeError):
+                CrimeDataProcessor.stream_import_csv(path, "mlp", chunk_size=4)
+        self.assertEqual(MLPPrediction.objects.count(), 4)
+
+        log = CrimeDataProcessor.stream_import_csv(path, "mlp", chunk_size=4)
+        self.assertEqual(log["resumed_from_row"], 4)
+        self.assertEqual(log["records_created"], 6)
+        self.assertEqual(MLPPrediction.objects.count(), 10)
+
+        # Completed and unchanged: nothing is read or written again
+        with self.assertNumQueries(1):
+            log = CrimeDataProcessor.stream_import_csv(path, "mlp", chunk_size=4)
+        self.assertTrue(log["already_imported"])
+
+    def test_same_file_name_in_different_periods_has_own_checkpoint(self):
+        first = Path(self.directory) / "202301"
+        second = Path(self.directory) / "202302"
+        first.mkdir()
+        second.mkdir()
+        _write_mapped_csv(first, "mlp", self._rows(202301))
+        _write_mapped_csv(second, "mlp", self._rows(202302))
+
+        for directory in (first, second):
+            log = CrimeDataProcessor.stream_import_csv(
+                directory / "mapped_mlp.csv", "mlp", chunk_size=4
+            )
+            self.assertEqual(log["records_created"], 10)
+        self.assertEqual(ImportCheckpoint.objects.count(), 2)
+        self.assertEqual(MLPPrediction.objects.count(), 20)
+
+    def test_long_paths_sharing_a_prefix_have_own_checkpoints(self):
+        deep = Path(self.directory, *["p" * 100] * 3)
+        paths = []
+        for period in (202301, 202302):
+            directory = deep / str(period)
+            directory.mkdir(parents=True)
+            paths.append(_write_mapped_csv(directory, "mlp", self._rows(period)))
+        self.assertGreater(len(str(paths[0])), 255)
+
+        for path in paths:
+            log = CrimeDataProcessor.stream_import_csv(path, "mlp", chunk_size=4)
+            self.assertEqual(log["records_created"], 10)
+        self.assertEqual(
+            sorted(ImportCheckpoint.objects.values_list("source_file", flat=True)),
+            [str(path) for path in paths],
+        )
+
+    def test_refreshes_period_catalog_once_per_import(self):
+        rows = self._rows(202301, count=5) + self._rows(202302, count=5)
+        path = _write_mapped_csv(self.directory, "mlp", rows)
+        with mock.patch.object(
+            PeriodCatalogProcessor, "refresh", wraps=PeriodCatalogProcessor.refresh
+        ) as refresh:
+            log = CrimeDataProcessor.stream_import_csv(path, "mlp", chunk_size=4)
+        self.assertEqual(log["chunks"], 3)
+        refresh.assert_called_once_with({202301, 202302})
+        self.assertEqual(
+            sorted(PeriodCatalog.objects.values_list("period", "mlp_rows")),
+            [(202301, 5), (202302, 5)],
+        )
+
+    def test_bumps_dataset_version_once_per_import(self):
+        path = _write_mapped_csv(self.directory, "mlp", self._rows(202301))
+        with mock.patch("storing.processing.bump_dataset_version") as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                log = CrimeDataProcessor.stream_import_csv(path, "mlp", chunk_size=4)
+        self.assertEqual(log["chunks"], 3)
+        bump.assert_called_once_with()
+
+
+class ResponseCacheKeyTests(TestCase):
+    def test_default_limit_shares_the_bare_request_entry(self):
+        factory = RequestFactory()
+        defaults = {"limit": "20"}
+
+        def key(params):
+            request = factory.get("/api/top-predictions/", params)
+            return response_cache_key("top-predictions", request, "v1", defaults)
+
+        self.assertEqual(key({"period": 202301}), key({"period": 202301, "limit": 20}))
+        self.assertNotEqual(
+            key({"period": 202301}), key({"period": 202301, "limit": 10})
+        )
+
+
+class StaticSnapshotCacheTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(self.settings(STATIC_DATA_DIR=Path(self.directory)))
+
+    def _write(self, filename, payload):
+        path = Path(self.directory, filename)
+        path.write_text(json.dumps(payload), encoding="utf-8")
+        return path
+
+    def test_returns_private_copies(self):
+        snapshots = StaticSnapshotCache()
+        self._write("periods.json", {"periods": [202301, 202302]})
+
+        payload = snapshots.get("periods.json")
+        payload["periods"].append(202303)
+        payload["extra"] = True
+
+        self.assertEqual(snapshots.get("periods.json"), {"periods": [202301, 202302]})
+        self.assertEqual(snapshots.stats["misses"], 1)
+        self.assertEqual(snapshots.stats["hits"], 1)
+
+    def test_rewritten_file_is_reloaded(self):
+        snapshots = StaticSnapshotCache()
+        path = self._write("periods.json", {"periods": [202301]})
+        self.assertEqual(snapshots.get("periods.json"), {"periods": [202301]})
+
+        # Same size, newer mtime
+        self._write("periods.json", {"periods": [202302]})
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(snapshots.get("periods.json"), {"periods": [202302]})
+
+        # New size, mtime put back to the cached one
+        stat = path.stat()
+        self._write("periods.json", {"periods": [202302, 202303]})
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(snapshots.get("periods.json"), {"periods": [202302, 202303]})
+        self.assertEqual(snapshots.stats["misses"], 3)
+
+        path.unlink()
+        self.assertIsNone(snapshots.get("periods.json"))
+
+    def test_evicts_least_recently_used_file_at_capacity(self):
+        sizes = {
+            name: self._write(f"{name}.json", {"name": name * 40}).stat().st_size
+            for name in ("a", "b", "c")
+        }
+        snapshots = StaticSnapshotCache(max_bytes=sizes["a"] + sizes["b"])
+
+        snapshots.get("a.json")
+        snapshots.get("b.json")
+        snapshots.get("a.json")
+        snapshots.get("c.json")
+        self.assertEqual(snapshots.stats, {"hits": 1, "misses": 3, "evictions": 1})
+
+        snapshots.get("a.json")
+        snapshots.get("c.json")
+        self.assertEqual(snapshots.stats["hits"], 3)
+        snapshots.get("b.json")
+        self.assertEqual(snapshots.stats, {"hits": 3, "misses": 4, "evictions": 2})
+
+    def test_encoded_bodies_count_towards_capacity(self):
+        size = self._write("a.json", {"name": "a" * 40}).stat().st_size
+        self._write("b.json", {"name": "b" * 40})
+        snapshots = StaticSnapshotCache(max_bytes=2 * size)
+        snapshots.get("b.json")
+
+        body = snapshots.get_encoded("a.json")
+
+        self.assertEqual(body, encode_json({"name": "a" * 40}))
+        self.assertEqual(snapshots.stats["evictions"], 1)
+        self.assertIs(snapshots.get_encoded("a.json"), body)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class StaticResponseTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.enterContext(self.settings(STATIC_DATA_DIR=Path(self.directory)))
+        self.addCleanup(static_snapshots.clear)
+        payload = {"success": True, "periods": [202301, 202302], "note": "\u2028"}
+        Path(self.directory, "available_periods.json").write_text(
+            json.dumps(payload, indent=2), encoding="utf-8"
+        )
+        self.body = encode_json(payload)
+        min_path = Path(self.directory, "available_periods.min.json")
+        min_path.write_bytes(self.body)
+        # Other levels than the build uses, so a recompressed body would differ
+        self.precompressed = {
+            "gzip": gzip.compress(self.body, compresslevel=1, mtime=0),
+            "br": brotli.compress(self.body, quality=1),
+        }
+        for encoding, body in self.precompressed.items():
+            Path(f"{min_path}{COMPRESSED_SUFFIXES[encoding]}").write_bytes(body)
+
+    def test_serves_stored_bodies_for_accepted_encoding(self):
+        cases = [
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("gzip, deflate", "gzip"),
+            ("br", "br"),
+            ("gzip, deflate, br", "br"),
+            ("br;q=0, gzip", "gzip"),
+            ("*", "br"),
+        ]
+        for accept_encoding, encoding in cases:
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.client.get(
+                    "/api/get_all_metrics/", HTTP_ACCEPT_ENCODING=accept_encoding
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get("Content-Encoding"), encoding)
+                self.assertIn("Accept-Encoding", response["Vary"])
+                expected = self.precompressed[encoding] if encoding else self.body
+                self.assertEqual(response.content, expected)
+
+    def test_stale_precompressed_file_is_not_served(self):
+        Path(self.directory, "available_periods.min.json").write_bytes(b"{}")
+
+        response = self.client.get("/api/get_all_metrics/", HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertNotEqual(response.content, self.precompressed["gzip"])
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    UNIFIED_PREDICTION_STORE=False,
+)
+class TopPredictionsBatchTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # No static_data snapshots, every period comes from the database
+        self.enterContext(self.settings(STATIC_DATA_DIR=Path(self.directory)))
+
+    def _get(self, url):
+        response = self.client.get(url)
+        return response.status_code, response.json()
+
+    def test_period_range_is_validated_before_it_is_built(self):
+        for query in (
+            "start=0&end=2000000000",
+            "start=202301&end=203301",
+            "start=202304&end=202301",
+            "start=202313&end=202401",
+            "start=202300&end=202302",
+            "start=202301&end=x",
+        ):
+            with self.subTest(query=query):
+                with self.assertNumQueries(0):
+                    status_code, payload = self._get(
+                        f"/api/top-predictions/batch/?{query}"
+                    )
+                self.assertEqual(status_code, 400)
+                self.assertFalse(payload["success"])
+
+        status_code, payload = self._get(
+            "/api/top-predictions/batch/?start=202211&end=202302"
+        )
+        self.assertEqual(status_code, 200)
+        self.assertEqual(payload["periods"], [202211, 202212, 202301, 202302])
+
+    def test_listed_periods_are_validated(self):
+        for periods in (
+            "1,99999999",
+            "202301,99999999",
+            "202301,1",
+            "202300",
+            "202313",
+            "20230",
+            "0202301",
+            "+20230",
+            "2023-1",
+            "202301,x",
+        ):
+            with self.subTest(periods=periods):
+                with self.assertNumQueries(0):
+                    status_code, payload = self._get(
+                        f"/api/top-predictions/batch/?periods={periods}"
+                    )
+                self.assertEqual(status_code, 400)
+                self.assertFalse(payload["success"])
+
+        status_code, payload = self._get(
+            "/api/top-predictions/batch/?periods=202212,,202301,202212"
+        )
+        self.assertEqual(status_code, 200)
+        self.assertEqual(payload["periods"], [202212, 202301])
+
+    def test_database_fallback_matches_single_period_endpoint(self):
+        # Unranked rows, a duplicate rank and a gap around the limit
+        ranks = {1: 1, 2: 1, 3: 3, 4: None, 5: 5}
+        for period in (202301, 202302):
+            path = _write_mapped_csv(
+                self.directory,
+                "mlp",
+                [
+                    (grid_id, period, 10 - grid_id, rank)
+                    for grid_id, rank in ranks.items()
+                ],
+                name=f"mapped_mlp_{period}.csv",
+            )
+            CrimeDataProcessor.bulk_import_csv(path, "mlp")
+
+        def grid_ids(rows):
+            return sorted(row["grid_id"] for row in rows)
+
+        # Skip the read model so both endpoints query the mlp table itself
+        with mock.patch("storing.prediction_store.TOP_PREDICTION_DEPTH", 0):
+            _, batch = self._get(
+                "/api/top-predictions/batch/?periods=202301,202302&limit=3"
+            )
+            for result in batch["results"]:
+                with self.subTest(period=result["period"]):
+                    _, single = self._get(
+                        f"/api/top-predictions/?period={result['period']}&limit=3"
+                    )
+                    self.assertEqual(result["counts"]["mlp"], 3)
+                    self.assertEqual(
+                        grid_ids(result["data"]["mlp"]),
+                        grid_ids(single["data"]["mlp"]),
+                    )
+
+
+class ExportRankingsTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        ranks = [3, 1, None, 2, None, 4]
+        for period in (202301, 202302, 202303):
+            path = _write_mapped_csv(
+                self.directory,
+                "baseline",
+                [
+                    (grid_id, period, grid_id, rank)
+                    for grid_id, rank in enumerate(ranks, 1)
+                ],
+                name=f"mapped_baseline_{period}.csv",
+            )
+            CrimeDataProcessor.bulk_import_csv(path, "baseline")
+
+    def _export(self, query):
+        response = self.client.get(f"/api/export/?model=baseline&{query}")
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_ndjson_streams_every_row_in_rank_order(self):
+        lines = self._export("period=202302").splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual([row["rank"] for row in rows], [1, 2, 3, 4, None, None])
+        self.assertEqual({row["target_period"] for row in rows}, {202302})
+
+    def test_csv_has_one_header_and_a_row_per_record(self):
+        body = self._export("start=202301&end=202303&output=csv")
+        rows = list(csv.DictReader(body.splitlines()))
+        self.assertEqual(len(rows), 18)
+        self.assertEqual(
+            [int(row["target_period"]) for row in rows],
+            [202301] * 6 + [202302] * 6 + [202303] * 6,
+        )
+
+    def test_rejects_invalid_and_oversized_ranges(self):
+        for query in (
+            "period=202313",
+            "start=0&end=2000000000",
+            "start=202303&end=202301",
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/export/?model=baseline&{query}")
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class RankDeltaTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def _import(self, record_type, rows):
+        path = _write_mapped_csv(self.directory, record_type, rows)
+        CrimeDataProcessor.bulk_import_csv(path, record_type)
+
+    def test_compute_rank_deltas(self):
+        # Grid 4 is new in 202302, grid 3 drops out
+        self._import(
+            "mlp",
+            [(1, 202301, 9, 1), (2, 202301, 5, 2), (3, 202301, 1, 3)]
+            + [(1, 202302, 4, 2), (2, 202302, 8, 1), (4, 202302, 2, 3)],
+        )
+        deltas = compute_rank_deltas("mlp", 202301, 202302).set_index("grid_id")
+        self.assertEqual(deltas.loc[1, "rank_change"], -1)
+        self.assertEqual(deltas.loc[1, "count_change"], -5)
+        self.assertEqual(deltas.loc[2, "rank_change"], 1)
+        self.assertTrue(math.isnan(deltas.loc[3, "to_rank"]))
+        self.assertTrue(math.isnan(deltas.loc[4, "rank_change"]))
+
+        movers = top_movers("mlp", 202301, 202302, 10)
+        self.assertEqual(movers["compared"], 2)
+        self.assertEqual([row["grid_id"] for row in movers["risers"]], [2])
+        self.assertEqual([row["grid_id"] for row in movers["fallers"]], [1])
+        self.assertEqual(movers["risers"][0]["rank_change"], 1)
+
+    def test_unranked_periods_have_no_movers(self):
+        self._import(
+            "actual",
+            [
+                (grid_id, period, 3, None)
+                for grid_id in (1, 2)
+                for period in (202301, 202302)
+            ],
+        )
+        deltas = compute_rank_deltas("actual", 202301, 202302)
+        self.assertTrue(deltas["rank_change"].isna().all())
+        self.assertEqual(
+            top_movers("actual", 202301, 202302, 10),
+            {"risers": [], "fallers": [], "compared": 0},
+        )
+
+    def test_caches_only_the_movers(self):
+        self._import("mlp", [(1, 202301, 9, 1), (1, 202302, 4, 1)])
+        movers = top_movers("mlp", 202301, 202302, 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(top_movers("mlp", 202301, 202302, 5), movers)
+        cached = cache.get(_movers_cache_key("mlp", 202301, 202302, 5))
+        self.assertIsInstance(cached, dict)
+
+
+@override_settings(UNIFIED_PREDICTION_STORE=True)
+class UnifiedPredictionStoreTests(ImportTestCase):
+    def _mirrored(self, record_type):
+        return sorted(
+            Prediction.objects.filter(model=record_type).values_list(
+                "grid_id", "target_period", "count", "rank"
+            )
+        )
+
+    def test_per_row_import_upserts_only_the_rows_it_wrote(self):
+        first = [(grid_id, 202301, grid_id, grid_id) for grid_id in range(1, 6)]
+        CrimeDataProcessor.import_mlp_predictions_csv(
+            _write_mapped_csv(self.directory, "mlp", first)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            CrimeDataProcessor.import_mlp_predictions_csv(
+                _write_mapped_csv(self.directory, "mlp", [(2, 202301, 7, 1)])
+            )
+        self.assertFalse(
+            any(
+                query["sql"].startswith('DELETE FROM "prediction"')
+                for query in queries.captured_queries
+            )
+        )
+        self.assertEqual(
+            self._mirrored("mlp"),
+            [(1, 202301, 1, 1), (2, 202301, 7, 1)]
+            + [(grid_id, 202301, grid_id, grid_id) for grid_id in range(3, 6)],
+        )
+
+    def test_rebuild_copies_every_period_and_clears_stale_ones(self):
+        rows = [
+            (grid_id, period, grid_id, grid_id)
+            for grid_id in (1, 2)
+            for period in (202301, 202302)
+        ]
+        CrimeDataProcessor.bulk_import_csv(
+            _write_mapped_csv(self.directory, "baseline", rows), "baseline"
+        )
+        Prediction.objects.create(
+            model="baseline", grid_id=1, target_period=202212, count=1, rank=1
+        )
+
+        call_command(
+            "rebuild_prediction_store", "--models", "baseline", stdout=io.StringIO()
+        )
+        self.assertEqual(
+            self._mirrored("baseline"),
+            sorted((grid_id, period, grid_id, grid_id) for grid_id, period, *_ in rows),
+        )
+
+
+@override_settings(UNIFIED_PREDICTION_STORE=True)
+class PredictionStoreFallbackTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        ranks = {202301: [1, 2, 3, 4], 202302: [1, 2, None, None, None]}
+        rows = [
+            (grid_id, period, 10 - grid_id, rank)
+            for period, period_ranks in ranks.items()
+            for grid_id, rank in enumerate(period_ranks, start=1)
+        ]
+        for record_type in ("actual", "mlp", "baseline"):
+            CrimeDataProcessor.bulk_import_csv(
+                _write_mapped_csv(self.directory, record_type, rows), record_type
+            )
+        call_command("rebuild_prediction_store", stdout=io.StringIO())
+
+    def _read(self, read, periods, limit):
+        with CaptureQueriesContext(connection) as queries:
+            grouped = read(periods, limit)
+        unranked = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "IS NULL" in query["sql"]
+        ]
+        ranks = {
+            period: {
+                model: [row["rank"] for row in rows] for model, rows in by_model.items()
+            }
+            for period, by_model in grouped.items()
+        }
+        return ranks, unranked
+
+    def test_unranked_rows_are_read_only_when_the_range_falls_short(self):
+        models = ("actual", "mlp", "baseline")
+        for read in (top_predictions, table_top_predictions):
+            with self.subTest(read=read.__name__):
+                ranks, unranked = self._read(read, [202301, 202302], 2)
+                self.assertEqual(unranked, [])
+                self.assertEqual(
+                    ranks,
+                    {
+                        period: dict.fromkeys(models, [1, 2])
+                        for period in (202301, 202302)
+                    },
+                )
+
+                ranks, unranked = self._read(read, [202301, 202302], 3)
+                self.assertEqual(len(unranked), len(models))
+                for sql in unranked:
+                    self.assertIn("202302", sql)
+                    self.assertTrue(sql.endswith("LIMIT 1"), sql)
+                self.assertEqual(
+                    ranks,
+                    {
+                        202301: dict.fromkeys(models, [1, 2, 3]),
+                        202302: dict.fromkeys(models, [1, 2, None]),
+                    },
+                )
+
+                ranks, unranked = self._read(read, [202302], 20)
+                self.assertEqual(len(unranked), len(models))
+                for sql in unranked:
+                    self.assertTrue(sql.endswith("LIMIT 18"), sql)
+                self.assertEqual(
+                    ranks[202302], dict.fromkeys(models, [1, 2, None, None, None])
+                )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    UNIFIED_PREDICTION_STORE=False,
+)
+class TopPredictionReadModelTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.enterContext(self.settings(STATIC_DATA_DIR=Path(self.directory)))
+
+    def _import(self, record_type, rows):
+        path = _write_mapped_csv(self.directory, record_type, rows)
+        CrimeDataProcessor.bulk_import_csv(path, record_type)
+
+    def test_unranked_model_falls_back_to_its_table(self):
+        self._import(
+            "mlp", [(grid_id, 202301, grid_id, grid_id) for grid_id in range(1, 4)]
+        )
+        self._import(
+            "actual", [(grid_id, 202301, grid_id, None) for grid_id in range(1, 4)]
+        )
+        self.assertFalse(TopPrediction.objects.filter(model="actual").exists())
+
+        response = self.client.get("/api/top-predictions/?period=202301")
+        payload = response.json()
+        self.assertEqual(payload["counts"], {"actual": 3, "mlp": 3, "baseline": 0})
+        self.assertEqual([row["rank"] for row in payload["data"]["mlp"]], [1, 2, 3])
+        self.assertEqual(
+            sorted(row["grid_id"] for row in payload["data"]["actual"]), [1, 2, 3]
+        )
+
+    def test_check_detects_drift(self):
+        self._import(
+            "mlp", [(grid_id, 202301, grid_id, grid_id) for grid_id in range(1, 4)]
+        )
+        self._import(
+            "baseline", [(grid_id, 202302, grid_id, grid_id) for grid_id in range(1, 4)]
+        )
+        self.assertEqual(TopPredictionProcessor.check(), [])
+
+        # A source row changed behind the read model's back
+        MLPPrediction.objects.filter(grid_id=2, target_period=202301).update(rank=7)
+        # A read model row left over from deleted source rows
+        TopPrediction.objects.filter(model="baseline").update(period=202212)
+        self.assertEqual(
+            TopPredictionProcessor.check(),
+            [(202212, "baseline"), (202301, "mlp"), (202302, "baseline")],
+        )
+        self.assertEqual(TopPredictionProcessor.check([202301]), [(202301, "mlp")])
+
+        TopPredictionProcessor.refresh()
+        self.assertEqual(TopPredictionProcessor.check(), [])
+
+
+class GridTileTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        rows = [
+            (grid_id, 202301, grid_id % 7, grid_id)
+            for grid_id in range(1, GRID_SIZE * GRID_SIZE + 1)
+        ]
+        CrimeDataProcessor.bulk_import_csv(
+            _write_mapped_csv(self.directory, "actual", rows), "actual"
+        )
+
+    def test_aggregated_tile_matches_its_detail_tiles(self):
+        z, x, y = (int(part) for part in _tile(12, *CENTER).split("/"))
+        aggregated = build_tile("actual", 202301, z, x, y)
+        self.assertTrue(aggregated["properties"]["aggregated"])
+
+        # Walk down to the first zoom with per-grid features
+        detail = []
+        tiles = [(z, x, y)]
+        while tiles[0][0] < GRID_DETAIL_MIN_ZOOM:
+            tiles = [
+                (zoom + 1, 2 * column + dx, 2 * row + dy)
+                for zoom, column, row in tiles
+                for dx in (0, 1)
+                for dy in (0, 1)
+            ]
+        for tile in tiles:
+            payload = build_tile("actual", 202301, *tile)
+            self.assertFalse(payload["properties"]["aggregated"])
+            detail.extend(feature["properties"] for feature in payload["features"])
+
+        cells = [feature["properties"] for feature in aggregated["features"]]
+        self.assertGreater(len(detail), 1)
+        self.assertEqual(aggregated["properties"]["grid_count"], len(detail))
+        self.assertEqual(sum(cell["grids"] for cell in cells), len(detail))
+        self.assertEqual(
+            sum(cell["count"] for cell in cells), sum(grid["count"] for grid in detail)
+        )
+        self.assertEqual(
+            min(cell["top_rank"] for cell in cells),
+            min(grid["rank"] for grid in detail),
+        )
+        west, south, east, north = aggregated["properties"]["bounds"]
+        inside = CrimeGrid.objects.filter(
+            center_longitude__gte=west,
+            center_longitude__lt=east,
+            center_latitude__gte=south,
+            center_latitude__lt=north,
+        )
+        self.assertEqual(
+            {grid["grid_id"] for grid in detail},
+            set(inside.values_list("grid_id", flat=True)),
+        )
+
+
+class PipelineManifestTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.input = Path(self.directory, "input.csv")
+        self.input.write_text("a,b\n1,2\n", encoding="utf-8")
+        self.manifest_path = Path(self.directory, "manifest.json")
+
+    def test_fresh_until_input_or_target_changes(self):
+        manifest = PipelineManifest(self.manifest_path)
+        self.assertFalse(manifest.is_fresh("import", "key", [self.input]))
+        manifest.record("import", "key", [self.input], target="db-1")
+        manifest.save()
+
+        reloaded = PipelineManifest(self.manifest_path)
+        self.assertTrue(reloaded.is_fresh("import", "key", [self.input], target="db-1"))
+        self.assertFalse(
+            reloaded.is_fresh("import", "key", [self.input], target="db-2")
+        )
+        self.assertFalse(reloaded.is_fresh("import", "key", [self.input]))
+
+        self.input.write_text("a,b\n1,3\n", encoding="utf-8")
+        self.assertFalse(
+            reloaded.is_fresh("import", "key", [self.input], target="db-1")
+        )
+
+    def test_corrupt_or_missing_manifest_starts_empty(self):
+        for content in (None, "{not json", "[]", '{"version": 0}', b"\xff\xfe"):
+            with self.subTest(content=content):
+                self.manifest_path.unlink(missing_ok=True)
+                if isinstance(content, bytes):
+                    self.manifest_path.write_bytes(content)
+                elif content is not None:
+                    self.manifest_path.write_text(content, encoding="utf-8")
+                manifest = PipelineManifest(self.manifest_path)
+                self.assertEqual(manifest.data["stages"], {})
+                manifest.record("import", "key", [self.input])
+                manifest.save()
+                self.assertTrue(
+                    PipelineManifest(self.manifest_path).is_fresh(
+                        "import", "key", [self.input]
+                    )
+                )
+
+
+class RunDataPipelineImportTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        root = Path(self.directory)
+        self.data_dir = root / "data"
+        self.data_dir.mkdir()
+        self.coordinate_path = root / "coordinate.csv"
+        self.coordinate_path.write_text("grid_id\n", encoding="utf-8")
+        self.period_dir = root / "processed" / "202301"
+        self.period_dir.mkdir(parents=True)
+        self.manifest_path = root / "manifest.json"
+        self._write(count=3)
+
+    def _write(self, count):
+        _write_mapped_csv(self.period_dir, "mlp", [(1, 202301, count, 1)])
+
+    def _run(self, *args):
+        stdout = io.StringIO()
+        call_command(
+            "run_data_pipeline",
+            *args,
+            data_dir=str(self.data_dir),
+            processed_dir=str(self.period_dir.parent),
+            coordinate_path=str(self.coordinate_path),
+            manifest=str(self.manifest_path),
+            skip_mapping=True,
+            no_warm=True,
+            stdout=stdout,
+            stderr=io.StringIO(),
+        )
+        output = stdout.getvalue()
+        return int(output.split("MLP files: ")[1].split()[0]), int(
+            output.split("Files skipped (unchanged): ")[1].split()[0]
+        )
+
+    def test_unchanged_inputs_are_skipped(self):
+        self.assertEqual(self._run(), (1, 0))
+        self.assertEqual(self._run(), (0, 1))
+
+    def test_changed_inputs_are_imported_again(self):
+        self._run()
+        self._write(count=8)
+        self.assertEqual(self._run(), (1, 0))
+        self.assertEqual(
+            MLPPrediction.objects.get(grid_id=1, target_period=202301).mlp_crime_count,
+            8,
+        )
+
+    def test_force_imports_unchanged_inputs(self):
+        self._run()
+        self.assertEqual(self._run("--force"), (1, 0))
+
+    def test_emptied_database_is_imported_again(self):
+        self._run()
+        MLPPrediction.objects.all().delete()
+        PeriodCatalog.objects.all().delete()
+        self.assertEqual(self._run(), (1, 0))
+        self.assertEqual(MLPPrediction.objects.count(), 1)
+
+    def test_other_database_is_imported_again(self):
+        self._run()
+        with mock.patch(
+            "storing.management.commands.run_data_pipeline._database_identity",
+            return_value="mysql://replica:3306/crime@",
+        ):
+            self.assertEqual(self._run(), (1, 0))
@@ -0,0 +1,125 @@
+import math
+
+from .processing import PREDICTION_IMPORT_SPECS
+
+# Below this zoom grids are merged into SUPER_CELL_DIVISIONS^2 cells per tile
+GRID_DETAIL_MIN_ZOOM = 14
+SUPER_CELL_DIVISIONS = 16
+MAX_TILE_ZOOM = 22
+
+
+def tile_bounds(z, x, y):
+    """(west, south, east, north) in degrees of a Web Mercator z/x/y tile."""
+    tiles = 2**z
+
+    def longitude(column):
+        return column / tiles * 360.0 - 180.0
+
+    def latitude(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / tiles))))
+
+    return longitude(x), latitude(y + 1), longitude(x + 1), latitude(y)
+
+
+def _polygon(west, south, east, north):
+    return {
+        "type": "Polygon",
+        "coordinates": [
+            [[west, south], [east, south], [east, north], [west, north], [west, south]]
+        ],
+    }
+
+
+def _super_cells(rows, bounds):
+    west, south, east, north = bounds
+    cell_width = (east - west) / SUPER_CELL_DIVISIONS
+    cell_height = (north - south) / SUPER_CELL_DIVISIONS
+    cells = {}
+    for grid_id, longitude, latitude, *_, count, rank in rows:
+        column = min(int((longitude - west) / cell_width), SUPER_CELL_DIVISIONS - 1)
+        row = min(int((north - latitude) / cell_height), SUPER_CELL_DIVISIONS - 1)
+        cell = cells.setdefault(
+            (column, row), {"count": 0, "grids": 0, "top_rank": None}
+        )
+        cell["count"] += count
+        cell["grids"] += 1
+        if rank is not None and (cell["top_rank"] is None or rank < cell["top_rank"]):
+            cell["top_rank"] = rank
+
+    features = []
+    for (column, row), properties in sorted(cells.items()):
+        cell_west = west + column * cell_width
+        cell_north = north - row * cell_height
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": _polygon(
+                    cell_west,
+                    cell_north - cell_height,
+                    cell_west + cell_width,
+                    cell_north,
+                ),
+                "properties": properties,
+            }
+        )
+    return features
+
+
+def _grid_cells(rows):
+    return [
+        {
+            "type": "Feature",
+            "geometry": _polygon(sw_lng, sw_lat, ne_lng, ne_lat),
+            "properties": {"grid_id": grid_id, "count": count, "rank": rank},
+        }
+        for grid_id, _, _, sw_lat, sw_lng, ne_lat, ne_lng, count, rank in rows
+    ]
+
+
+def build_tile(record_type, period, z, x, y):
+    """
+    GeoJSON FeatureCollection of one model's counts for the grids whose
+    center falls inside tile z/x/y. Below GRID_DETAIL_MIN_ZOOM grids are
+    aggregated into super-cells carrying the summed count, the number of
+    grids and the best rank inside them.
+    """
+    spec = PREDICTION_IMPORT_SPECS[record_type]
+    bounds = tile_bounds(z, x, y)
+    west, south, east, north = bounds
+    rows = list(
+        spec["model"]
+        .objects.filter(
+            target_period=period,
+            grid__center_latitude__gte=south,
+            grid__center_latitude__lt=north,
+            grid__center_longitude__gte=west,
+            grid__center_longitude__lt=east,
+        )
+        .order_by("grid_id")
+        .values_list(
+            "grid_id",
+            "grid__center_longitude",
+            "grid__center_latitude",
+            "grid__southwest_lat",
+            "grid__southwest_lng",
+            "grid__northeast_lat",
+            "grid__northeast_lng",
+            spec["count_field"],
+            "rank",
+        )
+    )
+
+    aggregated = z < GRID_DETAIL_MIN_ZOOM
+    features = _super_cells(rows, bounds) if aggregated else _grid_cells(rows)
+    return {
+        "type": "FeatureCollection",
+        "features": features,
+        "properties": {
+            "model": record_type,
+            "period": period,
+            "tile": {"z": z, "x": x, "y": y},
+            "bounds": list(bounds),
+            "aggregated": aggregated,
+            "grid_count": len(rows),
+        },
+    }
@@ -4,6 +4,19 @@ from . import views
 urlpatterns = [
     path("health/", views.api_health, name="home"),
     path("top-predictions/", views.get_top_predictions, name="get_top_predictions"),
+    path(
+        "top-predictions/batch/",
+        views.get_top_predictions_batch,
+        name="get_top_predictions_batch",
+    ),
+    path(
+        "tiles/<str:model>/<int:period>/<int:z>/<int:x>/<int:y>/",
+        views.get_grid_tile,
+        name="get_grid_tile",
+    ),
+    path("grid-history/", views.get_grid_history, name="get_grid_history"),
+    path("movers/", views.get_rank_movers, name="get_rank_movers"),
+    path("export/", views.export_rankings, name="export_rankings"),
     path("metric-store/", views.import_metrics_from_csv, name="metric-store"),
     path("metric-get/", views.get_all_metrics, name="get_all_metrics"),
     path("metrics-by-period/", views.get_metrics_by_period, name="metrics-by-period"),
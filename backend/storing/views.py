@@ -1,35 +1,69 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from .models import ActualCrime, MLPPrediction, BaselinePrediction, MetricData
-from .serializers import (
-    ActualCrimeSerializer,
-    MLPPredictionSerializer,
-    BaselinePredictionSerializer,
-    SimpleMetricSerializer,
+from .models import (
+    MetricData,
+    ModelComparison,
+    PeriodCatalog,
 )
+from .comparison import COMPARISON_FIELDS, metrics_payload
+from .serializers import SimpleMetricSerializer
 from django.utils import timezone  # Fixed import
 from django.conf import settings
-from django.views.decorators.cache import cache_page
+from django.http import HttpResponse, StreamingHttpResponse
+from .response_cache import cache_response
+from django.utils.cache import patch_vary_headers
+from .static_cache import (
+    COMPRESSORS,
+    JSON_CONTENT_TYPE,
+    encode_json,
+    negotiate_encoding,
+    static_snapshots,
+)
+from .deltas import top_movers
+from .export import EXPORT_FORMATS, PREDICTION_VALUES, stream_export
+from .history import grid_history
+from .prediction_store import ranked_top_predictions
+from .tiles import MAX_TILE_ZOOM, build_tile
 import os
-from pathlib import Path
-import json
-
+from functools import partial
 
-STATIC_DATA_DIR = Path(
-    getattr(settings, "STATIC_DATA_DIR", Path(settings.BASE_DIR) / "static_data")
-)
+TOP_PREDICTIONS_DEFAULT_LIMIT = 20
+TOP_PREDICTIONS_MAX_LIMIT = 20
+LIMIT_DEFAULTS = {"limit": str(TOP_PREDICTIONS_DEFAULT_LIMIT)}
+MAX_BATCH_PERIODS = 120
+MAX_HISTORY_GRIDS = 100
 
 
-def _load_static_json(filename):
-    path = STATIC_DATA_DIR / filename
-    if not path.exists():
-        return None
-    try:
-        with path.open("r", encoding="utf-8") as file:
-            return json.load(file)
-    except (OSError, json.JSONDecodeError):
+def _static_json_response(request, filename, variant=None, transform=None):
+    """
+    Serve a static_data file as pre-encoded (and, if the client accepts it,
+    precompressed) bytes, bypassing DRF rendering.
+    Returns None when the file is missing so the caller can fall back to the DB.
+    """
+    encoding = negotiate_encoding(request)
+    body = static_snapshots.get_encoded(filename, variant, transform, encoding)
+    if body is None:
         return None
+    response = HttpResponse(body, content_type=JSON_CONTENT_TYPE)
+    if encoding:
+        response["Content-Encoding"] = encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def _encoded_json_response(request, payload):
+    """Encode payload once and compress it with the negotiated encoding."""
+    body = encode_json(payload)
+    encoding = negotiate_encoding(request)
+    response = HttpResponse(
+        COMPRESSORS[encoding](body) if encoding else body,
+        content_type=JSON_CONTENT_TYPE,
+    )
+    if encoding:
+        response["Content-Encoding"] = encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
 
 
 def _apply_prediction_limit(payload, limit):
@@ -43,6 +77,88 @@ def _apply_prediction_limit(payload, limit):
     return payload
 
 
+def _parse_limit(request):
+    """
+    Read the top-k limit from the query string, clamped to
+    TOP_PREDICTIONS_MAX_LIMIT. Returns (limit, error response or None).
+    """
+    limit_param = request.GET.get("limit")
+    if limit_param is None:
+        return TOP_PREDICTIONS_DEFAULT_LIMIT, None
+    try:
+        limit = int(limit_param)
+    except ValueError:
+        return None, Response(
+            {"success": False, "error": "Limit must be an integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if limit < 1:
+        return None, Response(
+            {"success": False, "error": "Limit must be at least 1"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return min(limit, TOP_PREDICTIONS_MAX_LIMIT), None
+
+
+def _parse_period(value):
+    """
+    A single YYYYMM period: six digits with a month from 01 to 12.
+    Returns (period, error response or None).
+    """
+    value = value.strip()
+    if len(value) != 6 or not (value.isascii() and value.isdigit()):
+        return None, Response(
+            {"success": False, "error": "Periods must be integers (YYYYMM format)"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    period = int(value)
+    if not 1 <= period % 100 <= 12:
+        return None, Response(
+            {"success": False, "error": "Months must be between 01 and 12 (YYYYMM)"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return period, None
+
+
+def _parse_period_range(start_param, end_param):
+    """
+    Every YYYYMM period from start to end inclusive. Both ends are validated
+    and the span checked against MAX_BATCH_PERIODS before the list is built.
+    Returns (periods, error response or None).
+    """
+    start, error_response = _parse_period(start_param)
+    if error_response:
+        return None, error_response
+    end, error_response = _parse_period(end_param)
+    if error_response:
+        return None, error_response
+
+    start_year, start_month = divmod(start, 100)
+    end_year, end_month = divmod(end, 100)
+    first = start_year * 12 + start_month - 1
+    span = end_year * 12 + end_month - 1 - first
+    if not 0 <= span < MAX_BATCH_PERIODS:
+        return None, Response(
+            {
+                "success": False,
+                "error": f"Between 1 and {MAX_BATCH_PERIODS} periods are allowed",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    periods = []
+    for index in range(first, first + span + 1):
+        year, month = divmod(index, 12)
+        periods.append(year * 100 + month + 1)
+    return periods, None
+
+
+def _with_period(payload, period, limit=None):
+    payload["period"] = period
+    if limit is not None:
+        payload = _apply_prediction_limit(payload, limit)
+    return payload
+
+
 @api_view(["GET"])
 def api_health(request):
     """Health check endpoint for React frontend"""
@@ -55,14 +171,11 @@ def api_health(request):
     )
 
 
-@cache_page(60)
+@cache_response("top-predictions", defaults=LIMIT_DEFAULTS)
 @api_view(["GET"])
 def get_top_predictions(request):
     # Get period from query parameter
     period = request.GET.get("period")
-    limit_param = request.GET.get("limit")
-    default_limit = 20
-    max_limit = 20
 
     if not period:
         return Response(
@@ -81,70 +194,291 @@ def get_top_predictions(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    if limit_param is None:
-        limit = default_limit
+    limit, error_response = _parse_limit(request)
+    if error_response:
+        return error_response
+
+    try:
+        static_response = _static_json_response(
+            request,
+            f"top_predictions_{period_int}.json",
+            limit,
+            partial(_with_period, period=period_int, limit=limit),
+        )
+        if static_response is not None:
+            return static_response
+
+        # Read model first; models it has no rows for come from the tables
+        data = {
+            "actual": [],
+            "mlp": [],
+            "baseline": [],
+            **ranked_top_predictions([period_int], limit)[period_int],
+        }
+
+        # Return exactly what frontend needs
+        return Response(
+            {
+                "success": True,
+                "period": period_int,
+                "data": data,
+                "counts": {key: len(value) for key, value in data.items()},
+            }
+        )
+
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to fetch prediction data",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@cache_response("top-predictions-batch", defaults=LIMIT_DEFAULTS)
+@api_view(["GET"])
+def get_top_predictions_batch(request):
+    """
+    Top predictions for several periods in one response.
+
+    Query params:
+    - periods: comma separated YYYYMM periods (e.g. 202302,202303), or
+    - start and end: an inclusive YYYYMM range
+    - limit: rows per model, same rules as top-predictions
+    """
+    periods_param = request.GET.get("periods")
+    start_param = request.GET.get("start")
+    end_param = request.GET.get("end")
+
+    if periods_param:
+        periods = []
+        for value in periods_param.split(","):
+            if not value:
+                continue
+            period, error_response = _parse_period(value)
+            if error_response:
+                return error_response
+            periods.append(period)
+    elif start_param and end_param:
+        periods, error_response = _parse_period_range(start_param, end_param)
+        if error_response:
+            return error_response
     else:
-        try:
-            limit = int(limit_param)
-        except ValueError:
-            return Response(
-                {"success": False, "error": "Limit must be an integer"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        if limit < 1:
-            return Response(
-                {"success": False, "error": "Limit must be at least 1"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        if limit > max_limit:
-            limit = max_limit
+        return Response(
+            {
+                "success": False,
+                "error": "Either periods (e.g., ?periods=202302,202303) or "
+                "start and end (e.g., ?start=202302&end=202304) are required",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    periods = list(dict.fromkeys(periods))
+    if not periods or len(periods) > MAX_BATCH_PERIODS:
+        return Response(
+            {
+                "success": False,
+                "error": f"Between 1 and {MAX_BATCH_PERIODS} periods are allowed",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    limit, error_response = _parse_limit(request)
+    if error_response:
+        return error_response
 
     try:
-        static_payload = _load_static_json(f"top_predictions_{period_int}.json")
-        if static_payload:
-            static_payload["period"] = period_int
-            static_payload = _apply_prediction_limit(static_payload, limit)
-            return Response(static_payload)
+        results = {}
+        missing = []
+        for period in periods:
+            static_payload = static_snapshots.get(f"top_predictions_{period}.json")
+            if static_payload:
+                results[period] = _with_period(static_payload, period, limit)
+            else:
+                missing.append(period)
+
+        if missing:
+            grouped = ranked_top_predictions(missing, limit)
+
+            for period in missing:
+                data = {"actual": [], "mlp": [], "baseline": [], **grouped[period]}
+                results[period] = {
+                    "success": True,
+                    "period": period,
+                    "data": data,
+                    "counts": {key: len(value) for key, value in data.items()},
+                }
 
-        # Get top ranked predictions for each model for this period
-        # ACTUAL CRIME
-        actual_data = (
-            ActualCrime.objects.filter(target_period=period_int)
-            .select_related("grid")
-            .order_by("rank")[:limit]
+        return Response(
+            {
+                "success": True,
+                "periods": periods,
+                "results": [results[period] for period in periods],
+                "count": len(periods),
+            }
         )
 
-        # MLP PREDICTIONS
-        mlp_data = (
-            MLPPrediction.objects.filter(target_period=period_int)
-            .select_related("grid")
-            .order_by("rank")[:limit]
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to fetch prediction data",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-        # BASELINE PREDICTIONS
-        baseline_data = (
-            BaselinePrediction.objects.filter(target_period=period_int)
-            .select_related("grid")
-            .order_by("rank")[:limit]
+
+@cache_response("grid-tiles")
+@api_view(["GET"])
+def get_grid_tile(request, model, period, z, x, y):
+    """
+    GeoJSON heatmap tile for one model and period.
+
+    Path: tiles/<model>/<period>/<z>/<x>/<y>/ where model is actual, mlp or
+    baseline and z/x/y are Web Mercator tile coordinates. Low zoom tiles
+    aggregate grids into super-cells (see storing.tiles).
+    """
+    if model not in ("actual", "mlp", "baseline"):
+        return Response(
+            {"success": False, "error": "Model must be actual, mlp or baseline"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if z > MAX_TILE_ZOOM or x >= 2**z or y >= 2**z:
+        return Response(
+            {"success": False, "error": f"Invalid tile {z}/{x}/{y}"},
+            status=status.HTTP_400_BAD_REQUEST,
         )
-        actual_serializer = ActualCrimeSerializer(actual_data, many=True)
-        mlp_serializer = MLPPredictionSerializer(mlp_data, many=True)
-        baseline_serializer = BaselinePredictionSerializer(baseline_data, many=True)
 
-        # Return exactly what frontend needs
+    try:
+        return _encoded_json_response(request, build_tile(model, period, z, x, y))
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to build tile",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@cache_response("grid-history")
+@api_view(["GET"])
+def get_grid_history(request):
+    """
+    Actual vs MLP vs baseline counts and ranks across every period for one
+    or more grids.
+
+    Query params:
+    - grids: comma separated grid ids (e.g. 1299,1876), at most MAX_HISTORY_GRIDS
+    """
+    grids_param = request.GET.get("grids") or request.GET.get("grid")
+    if not grids_param:
+        return Response(
+            {
+                "success": False,
+                "error": "Grids parameter is required (e.g., ?grids=1299,1876)",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        grid_ids = list(
+            dict.fromkeys(int(value) for value in grids_param.split(",") if value)
+        )
+    except ValueError:
+        return Response(
+            {"success": False, "error": "Grid ids must be integers"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not grid_ids or len(grid_ids) > MAX_HISTORY_GRIDS:
+        return Response(
+            {
+                "success": False,
+                "error": f"Between 1 and {MAX_HISTORY_GRIDS} grids are allowed",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        history = grid_history(grid_ids)
         return Response(
             {
                 "success": True,
-                "period": period_int,
+                "grids": [
+                    {"grid_id": grid_id, "history": history[grid_id]}
+                    for grid_id in grid_ids
+                ],
+                "count": len(grid_ids),
+            }
+        )
+
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to fetch grid history",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@cache_response("movers", defaults=LIMIT_DEFAULTS)
+@api_view(["GET"])
+def get_rank_movers(request):
+    """
+    Grids that rose and fell furthest in rank between two periods.
+
+    Query params:
+    - from and to: YYYYMM periods to compare
+    - model: actual, mlp or baseline (default: all three)
+    - limit: risers and fallers per model, same rules as top-predictions
+    """
+    from_param = request.GET.get("from")
+    to_param = request.GET.get("to")
+    if not from_param or not to_param:
+        return Response(
+            {
+                "success": False,
+                "error": "From and to parameters are required "
+                "(e.g., ?from=202302&to=202303)",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        from_period = int(from_param)
+        to_period = int(to_param)
+    except ValueError:
+        return Response(
+            {"success": False, "error": "Periods must be integers (YYYYMM format)"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    model_param = request.GET.get("model")
+    if model_param and model_param not in ("actual", "mlp", "baseline"):
+        return Response(
+            {"success": False, "error": "Model must be actual, mlp or baseline"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    models = [model_param] if model_param else ["actual", "mlp", "baseline"]
+
+    limit, error_response = _parse_limit(request)
+    if error_response:
+        return error_response
+
+    try:
+        return Response(
+            {
+                "success": True,
+                "from_period": from_period,
+                "to_period": to_period,
                 "data": {
-                    "actual": actual_serializer.data,
-                    "mlp": mlp_serializer.data,
-                    "baseline": baseline_serializer.data,
-                },
-                "counts": {
-                    "actual": len(actual_serializer.data),
-                    "mlp": len(mlp_serializer.data),
-                    "baseline": len(baseline_serializer.data),
+                    model: top_movers(model, from_period, to_period, limit)
+                    for model in models
                 },
             }
         )
@@ -154,12 +488,64 @@ def get_top_predictions(request):
             {
                 "success": False,
                 "error": str(e),
-                "message": "Failed to fetch prediction data",
+                "message": "Failed to compute rank movers",
             },
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+@api_view(["GET"])
+def export_rankings(request):
+    """
+    Stream the full ranking of one model as NDJSON or CSV.
+
+    Query params:
+    - model: actual, mlp or baseline
+    - period: YYYYMM, or start and end for an inclusive range
+    - output: ndjson (default) or csv (DRF reserves ?format= for renderers)
+    """
+    model = request.GET.get("model")
+    if model not in PREDICTION_VALUES:
+        return Response(
+            {"success": False, "error": "Model must be actual, mlp or baseline"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    export_format = request.GET.get("output", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {"success": False, "error": "Output must be ndjson or csv"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    period_param = request.GET.get("period")
+    start_param = request.GET.get("start")
+    end_param = request.GET.get("end")
+    if period_param:
+        # A single period is a range of one, validated the same way
+        start_param = end_param = period_param
+    if not start_param or not end_param:
+        return Response(
+            {
+                "success": False,
+                "error": "Either period (e.g., ?period=202302) or start and "
+                "end (e.g., ?start=202302&end=202304) are required",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    periods, error_response = _parse_period_range(start_param, end_param)
+    if error_response:
+        return error_response
+
+    response = StreamingHttpResponse(
+        stream_export(model, periods, export_format),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    filename = f"{model}_{periods[0]}_{periods[-1]}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 @api_view(["POST"])
 def import_metrics_from_csv(request):
     """
@@ -231,7 +617,7 @@ def get_all_metrics(request):
         )
 
 
-@cache_page(60)
+@cache_response("metrics-by-period")
 @api_view(["GET"])
 def get_metrics_by_period(request):
     """
@@ -267,108 +653,21 @@ def get_metrics_by_period(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        static_payload = _load_static_json(f"metrics_{period_int}.json")
-        if static_payload:
-            static_payload["period"] = period_int
-            return Response(static_payload)
-
-        # Get all metrics for the specified period
-        metrics = MetricData.objects.filter(target_period=period_int).order_by("model")
-        try:
-            # If your database actually stores integers with commas, you might need to filter differently
-            # This is a workaround if the database stores formatted strings
-            metrics = MetricData.objects.filter(
-                target_period__icontains=str(period_int)
-            ).order_by("model")
-        except:
-            pass
-        # Separate MLP and Baseline metrics
-        mlp_metrics = metrics.filter(model__icontains="mlp").first()
-        baseline_metrics = metrics.filter(model__icontains="Lee Algorithm").first()
-
-        # Prepare response data
-        metrics_data = []
-
-        if mlp_metrics:
-            metrics_data.append(
-                {
-                    "model": "MLP",
-                    "model_display": "MLP Predictions",
-                    "pei_percent": mlp_metrics.pei_percent,
-                    "accuracy": mlp_metrics.accuracy,
-                    "target_period": mlp_metrics.target_period,
-                    "color": "#4ECDC4",  # Teal color from your frontend
-                    "icon": "🧠",  # Brain emoji for MLP
-                }
-            )
-
-        if baseline_metrics:
-            metrics_data.append(
-                {
-                    "model": "Baseline",
-                    "model_display": "Baseline Predictions",
-                    "pei_percent": baseline_metrics.pei_percent,
-                    "accuracy": baseline_metrics.accuracy,
-                    "target_period": baseline_metrics.target_period,
-                    "color": "#FFD166",  # Yellow color from your frontend
-                    "icon": "📊",  # Chart emoji for Baseline
-                }
-            )
-
-        # If we have both models, calculate the winner
-        comparison = None
-        if len(metrics_data) == 2:
-            mlp_data = (
-                metrics_data[0]
-                if metrics_data[0]["model"] == "MLP"
-                else metrics_data[1]
-            )
-            baseline_data = (
-                metrics_data[0]
-                if metrics_data[0]["model"] == "Baseline"
-                else metrics_data[1]
-            )
-
-            # Compare PEI
-            pei_winner = (
-                "MLP"
-                if mlp_data["pei_percent"] > baseline_data["pei_percent"]
-                else "Baseline"
-            )
-            pei_difference = abs(mlp_data["pei_percent"] - baseline_data["pei_percent"])
-
-            # Compare Accuracy
-            accuracy_winner = (
-                "MLP"
-                if mlp_data["accuracy"] > baseline_data["accuracy"]
-                else "Baseline"
-            )
-            accuracy_difference = abs(mlp_data["accuracy"] - baseline_data["accuracy"])
-
-            comparison = {
-                "pei": {
-                    "winner": pei_winner,
-                    "difference": round(pei_difference, 2),
-                    "mlp_value": mlp_data["pei_percent"],
-                    "baseline_value": baseline_data["pei_percent"],
-                },
-                "accuracy": {
-                    "winner": accuracy_winner,
-                    "difference": round(accuracy_difference, 2),
-                    "mlp_value": mlp_data["accuracy"],
-                    "baseline_value": baseline_data["accuracy"],
-                },
-            }
-
-        return Response(
-            {
-                "success": True,
-                "period": period_int,
-                "metrics": metrics_data,
-                "comparison": comparison,
-                "count": len(metrics_data),
-            }
+        static_response = _static_json_response(
+            request,
+            f"metrics_{period_int}.json",
+            transform=partial(_with_period, period=period_int),
         )
+        if static_response is not None:
+            return static_response
+
+        # Precomputed by MetricDataProcessor.import_metrics_csv
+        values = (
+            ModelComparison.objects.filter(pk=period_int)
+            .values(*COMPARISON_FIELDS)
+            .first()
+        )
+        return Response(metrics_payload(period_int, values))
 
     except Exception as e:
         return Response(
@@ -381,7 +680,7 @@ def get_metrics_by_period(request):
         )
 
 
-@cache_page(60)
+@cache_response("available-periods")
 @api_view(["GET"])
 def get_available_periods(request):
     """
@@ -389,70 +688,23 @@ def get_available_periods(request):
     Useful for populating the period selector in frontend
     """
     try:
-        static_payload = _load_static_json("available_periods.json")
-        if static_payload:
-            return Response(static_payload)
-
-        # Get all unique periods from the MetricData table
-        periods = MetricData.objects.all().order_by("target_period")
-        unique_periods = set()
-        for metric in periods:
-            period_value = metric.target_period
-
-            # If it's a string with a comma, convert to integer
-            if isinstance(period_value, str):
-                try:
-                    # Remove comma and convert to int
-                    period_clean = int(period_value.replace(",", ""))
-                    unique_periods.add(period_clean)
-                except ValueError:
-                    # If conversion fails, try as is
-                    try:
-                        unique_periods.add(int(period_value))
-                    except:
-                        pass
-            else:
-                # Already an integer
-                unique_periods.add(period_value)
+        static_response = _static_json_response(request, "available_periods.json")
+        if static_response is not None:
+            return static_response
 
-        # Sort periods
-        sorted_periods = sorted(list(unique_periods))
-        # Also get the model names for each period
+        # Maintained by the importers, see PeriodCatalogProcessor.refresh
+        catalog = PeriodCatalog.objects.filter(metric_rows__gt=0).order_by("period")
+        sorted_periods = []
         periods_with_models = []
-        for period in sorted_periods:
-            period_str = str(period)
-            period_with_comma = (
-                f"{period_str[:3]},{period_str[3:]}"
-                if len(period_str) == 6
-                else period_str
-            )
-
-            # Try to find metrics with this period (handling both formats)
-            models_in_period = []
-
-            # Try exact match
-            exact_match = MetricData.objects.filter(target_period=period)
-            if exact_match.exists():
-                models_in_period = list(
-                    exact_match.values_list("model", flat=True).distinct()
-                )
-            else:
-                # Try string match for comma format
-                str_match = MetricData.objects.filter(
-                    target_period__contains=str(period)
-                )
-                if str_match.exists():
-                    models_in_period = list(
-                        str_match.values_list("model", flat=True).distinct()
-                    )
-
+        for period, models_in_period in catalog.values_list(
+            "period", "available_models"
+        ):
+            sorted_periods.append(period)
             periods_with_models.append(
                 {
                     "period": period,
-                    "available_models": list(
-                        set(models_in_period)
-                    ),  # Remove duplicates
-                    "period_label": f"Period {period_str}",
+                    "available_models": models_in_period,
+                    "period_label": f"Period {period}",
                 }
             )
 
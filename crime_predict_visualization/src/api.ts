@@ -43,6 +43,52 @@ export interface ApiResponse {
   message?: string;
 }
 
+export interface BatchApiResponse {
+  success: boolean;
+  periods: number[];
+  results: ApiResponse[];
+  count: number;
+  error?: string;
+  message?: string;
+}
+
+export interface GridHistoryPeriod {
+  period: number;
+  actual_count: number | null;
+  actual_rank: number | null;
+  mlp_count: number | null;
+  mlp_rank: number | null;
+  baseline_count: number | null;
+  baseline_rank: number | null;
+}
+
+export interface GridHistoryResponse {
+  success: boolean;
+  grids: { grid_id: number; history: GridHistoryPeriod[] }[];
+  count: number;
+  error?: string;
+  message?: string;
+}
+
+export interface RankMover {
+  grid_id: number;
+  from_count: number;
+  to_count: number;
+  count_change: number;
+  from_rank: number;
+  to_rank: number;
+  rank_change: number;
+}
+
+export interface RankMoversResponse {
+  success: boolean;
+  from_period: number;
+  to_period: number;
+  data: Partial<Record<ModelType, { risers: RankMover[]; fallers: RankMover[]; compared: number }>>;
+  error?: string;
+  message?: string;
+}
+
 // Metric data interfaces - ADDED
 export interface MetricData {
   id: number;
@@ -113,6 +159,81 @@ export const fetchTopPredictions = async (period: number): Promise<ApiResponse>
   }
 };
 
+// Fetch top predictions for several periods in one request
+export const fetchTopPredictionsBatch = async (periods: number[]): Promise<BatchApiResponse> => {
+  try {
+    const API_URL = buildApiUrl('/api/top-predictions/batch/');
+    const response = await fetch(`${API_URL}?periods=${periods.join(',')}`);
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const data = await response.json();
+    return data;
+  } catch (error) {
+    console.error('Error fetching batch predictions:', error);
+    throw error;
+  }
+};
+
+// URL template ({z}/{x}/{y}) of the GeoJSON heatmap tiles for one model and period
+export const getGridTileUrlTemplate = (model: ModelType, period: number): string =>
+  buildApiUrl(`/api/tiles/${model}/${period}/{z}/{x}/{y}/`);
+
+// Download URL for a full ranking export of one model over a period range
+export const getRankingExportUrl = (
+  model: ModelType,
+  start: number,
+  end: number = start,
+  output: 'ndjson' | 'csv' = 'csv'
+): string =>
+  `${buildApiUrl('/api/export/')}?model=${model}&start=${start}&end=${end}&output=${output}`;
+
+// Fetch actual vs predicted history across all periods for one or more grids
+export const fetchGridHistory = async (gridIds: number[]): Promise<GridHistoryResponse> => {
+  try {
+    const API_URL = buildApiUrl('/api/grid-history/');
+    const response = await fetch(`${API_URL}?grids=${gridIds.join(',')}`);
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const data = await response.json();
+    return data;
+  } catch (error) {
+    console.error('Error fetching grid history:', error);
+    throw error;
+  }
+};
+
+// Fetch the grids that rose and fell furthest in rank between two periods
+export const fetchRankMovers = async (
+  fromPeriod: number,
+  toPeriod: number,
+  model?: ModelType,
+  limit: number = 10
+): Promise<RankMoversResponse> => {
+  try {
+    const API_URL = buildApiUrl('/api/movers/');
+    const modelParam = model ? `&model=${model}` : '';
+    const response = await fetch(
+      `${API_URL}?from=${fromPeriod}&to=${toPeriod}&limit=${limit}${modelParam}`
+    );
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const data = await response.json();
+    return data;
+  } catch (error) {
+    console.error('Error fetching rank movers:', error);
+    throw error;
+  }
+};
+
 // Fetch metrics for a specific period - ADDED
 export const fetchMetricsByPeriod = async (period: number): Promise<MetricsResponse> => {
   try {